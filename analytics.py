@@ -0,0 +1,226 @@
+import numpy as np
+
+from daily_tasks import STATUSES
+
+# ============================================================
+# COMPLETION ANALYTICS (vectorized)
+# ============================================================
+# A user's daily_task_status history is loaded once into flat arrays
+# (one entry per row):
+#   offsets   int32  days since history.start
+#   habits    int32  index into history.habit_ids
+#   codes     int8   status code, see STATUS_CODES (0 = no row)
+# Every metric below is a bincount / cumsum over those arrays, so a
+# 5-year history of 50 habits is a few hundred thousand array elements
+# and no per-row Python loop.
+#
+# Rates are completed / (completed + missed): Skipped days and days
+# that are still Pending do not count for or against a habit.
+
+# 1-based, in the order of the status ENUM
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES, start=1)}
+COMPLETED = STATUS_CODES["Completed"]
+MISSED = STATUS_CODES["Missed"]
+
+# Status -> code in SQL. A CASE instead of MySQL's `status + 0` (ENUM
+# index) so the same query runs on SQLite, where status is plain text.
+STATUS_CODE_SQL = "CASE status " + " ".join(
+    f"WHEN '{status}' THEN {code}" for status, code in STATUS_CODES.items()
+) + " ELSE 0 END"
+
+ROLLING_WINDOWS = (7, 30)
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+class History:
+    def __init__(self, start, end, habit_ids, offsets, habits, codes, habit_info):
+        self.start = start
+        self.end = end
+        self.n_days = (end - start).days + 1
+        self.habit_ids = habit_ids        # int64 array, sorted
+        self.offsets = offsets
+        self.habits = habits
+        self.codes = codes
+        self.habit_info = habit_info      # {habit_id: {"habit_name", "category_id", "category_name"}}
+
+    @property
+    def n_habits(self):
+        return len(self.habit_ids)
+
+    def completed(self):
+        return self.codes == COMPLETED
+
+    def decided(self):
+        return (self.codes == COMPLETED) | (self.codes == MISSED)
+
+
+def load_history(cursor, user_id, start, end):
+    # One query for the status rows (already reduced to integers by the
+    # database), one for the names of the habits that appear in them.
+    cursor.execute(f"""
+        SELECT habit_id, DATEDIFF(everyday_date, %s), {STATUS_CODE_SQL}
+        FROM daily_task_status
+        WHERE user_id = %s AND everyday_date BETWEEN %s AND %s
+    """, (start, user_id, start, end))
+    rows = cursor.fetchall()
+
+    data = np.array(rows, dtype=np.int64).reshape(-1, 3)
+    habit_ids, habits = np.unique(data[:, 0], return_inverse=True)
+
+    habit_info = {}
+    if len(habit_ids):
+        placeholders = ", ".join(["%s"] * len(habit_ids))
+        cursor.execute(f"""
+            SELECT h.habit_id, COALESCE(ush.custom_name, h.habit_name), h.category_id, c.category_name
+            FROM habits h
+            JOIN categories c ON c.category_id = h.category_id
+            LEFT JOIN user_selected_habits ush
+              ON ush.habit_id = h.habit_id AND ush.user_id = %s
+            WHERE h.habit_id IN ({placeholders})
+        """, (user_id, *habit_ids.tolist()))
+        for habit_id, habit_name, category_id, category_name in cursor.fetchall():
+            habit_info[habit_id] = {
+                "habit_name": habit_name,
+                "category_id": category_id,
+                "category_name": category_name
+            }
+
+    return History(
+        start, end, habit_ids,
+        offsets=data[:, 1].astype(np.int32),
+        habits=habits.astype(np.int32),
+        codes=data[:, 2].astype(np.int8),
+        habit_info=habit_info
+    )
+
+
+def _ratio(numerator, denominator, digits=4):
+    # Element-wise ratio with None where there is nothing to divide by
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.round(numerator / denominator, digits)
+    return np.where(denominator > 0, ratio, np.nan)
+
+
+def _to_json(values):
+    # numpy array (any shape) -> nested lists with NaN as None
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+# ---------------------------
+# metrics
+# ---------------------------
+
+def daily_counts(history):
+    # (completed, decided) per day, as arrays of length n_days
+    completed = np.bincount(history.offsets, weights=history.completed(), minlength=history.n_days)
+    decided = np.bincount(history.offsets, weights=history.decided(), minlength=history.n_days)
+    return completed, decided
+
+
+def rolling_rates(history, window):
+    # Completion rate over the `window` days ending on each day
+    completed, decided = daily_counts(history)
+    completed_sum = np.cumsum(completed)
+    decided_sum = np.cumsum(decided)
+    completed_sum[window:] = completed_sum[window:] - completed_sum[:-window]
+    decided_sum[window:] = decided_sum[window:] - decided_sum[:-window]
+    return _ratio(completed_sum, decided_sum)
+
+
+def weekday_heatmap(history):
+    # Completion rate per (habit, weekday) plus the all-habits row
+    weekdays = (history.offsets + history.start.weekday()) % 7
+    cells = history.habits * 7 + weekdays
+    size = history.n_habits * 7
+    completed = np.bincount(cells, weights=history.completed(), minlength=size).reshape(-1, 7)
+    decided = np.bincount(cells, weights=history.decided(), minlength=size).reshape(-1, 7)
+    return _ratio(completed, decided), _ratio(completed.sum(axis=0), decided.sum(axis=0))
+
+
+def category_ratios(history):
+    # {category_id: (completed, decided)} via the habit -> category mapping
+    habit_categories = np.array([
+        history.habit_info.get(int(habit_id), {}).get("category_id") or 0
+        for habit_id in history.habit_ids
+    ], dtype=np.int64)
+    row_categories = habit_categories[history.habits]
+    category_ids, index = np.unique(row_categories, return_inverse=True)
+    completed = np.bincount(index, weights=history.completed(), minlength=len(category_ids))
+    decided = np.bincount(index, weights=history.decided(), minlength=len(category_ids))
+    return category_ids, completed, decided
+
+
+def consistency_scores(history):
+    # Per habit, 0-100: mean weekly completion rate, discounted by how much
+    # the weekly rate swings. Only weeks with decided days count.
+    weeks = (history.offsets + history.start.weekday()) // 7
+    n_weeks = (history.n_days - 1 + history.start.weekday()) // 7 + 1
+    cells = history.habits * n_weeks + weeks
+    size = history.n_habits * n_weeks
+    completed = np.bincount(cells, weights=history.completed(), minlength=size).reshape(-1, n_weeks)
+    decided = np.bincount(cells, weights=history.decided(), minlength=size).reshape(-1, n_weeks)
+
+    counted = decided > 0
+    n_counted = counted.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weekly = np.where(counted, completed / decided, 0.0)
+        mean = weekly.sum(axis=1) / n_counted
+        spread = np.sqrt((np.where(counted, weekly - mean[:, None], 0.0) ** 2).sum(axis=1) / n_counted)
+    # std of values in [0, 1] is at most 0.5
+    score = np.round(100 * mean * (1 - 2 * spread), 1)
+    rate = _ratio(completed.sum(axis=1), decided.sum(axis=1))
+    return score, rate
+
+
+# ---------------------------
+# report
+# ---------------------------
+
+def analyze(history):
+    # Everything /api/stats/analytics returns, JSON ready
+    heatmap, weekday_overall = weekday_heatmap(history)
+    scores, rates = consistency_scores(history)
+    category_ids, category_completed, category_decided = category_ratios(history)
+    category_names = {
+        info["category_id"]: info["category_name"] for info in history.habit_info.values()
+    }
+
+    habits = []
+    for index, habit_id in enumerate(history.habit_ids.tolist()):
+        info = history.habit_info.get(habit_id, {})
+        habits.append({
+            "habit_id": habit_id,
+            "habit_name": info.get("habit_name"),
+            "category_id": info.get("category_id"),
+            "completion_rate": _to_json(rates[index]),
+            "consistency": _to_json(scores[index]),
+            "weekday_rates": _to_json(heatmap[index])
+        })
+    habits.sort(key=lambda habit: -(habit["consistency"] or 0))
+
+    categories = []
+    for category_id, completed, decided in zip(category_ids.tolist(), category_completed, category_decided):
+        categories.append({
+            "category_id": category_id,
+            "category_name": category_names.get(category_id),
+            "completed": int(completed),
+            "decided": int(decided),
+            "completion_rate": _to_json(_ratio(completed, decided))
+        })
+
+    return {
+        "start": history.start.isoformat(),
+        "end": history.end.isoformat(),
+        "days": history.n_days,
+        "rows": int(history.codes.size),
+        "weekdays": list(WEEKDAYS),
+        "weekday_rates": _to_json(weekday_overall),
+        "rolling": {
+            str(window): _to_json(rolling_rates(history, window)) for window in ROLLING_WINDOWS
+        },
+        "habits": habits,
+        "categories": categories
+    }
@@ -1,9 +1,41 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
-from flask_mysqldb import MySQL
-from werkzeug.security import generate_password_hash, check_password_hash
-import MySQLdb.cursors
-from datetime import datetime, date
+from flask import (
+    Flask, render_template, request, redirect, url_for, session, flash, jsonify, make_response,
+    Response, g, stream_with_context
+)
+from datetime import datetime, date, timedelta
+import base64
+import hashlib
+import hmac
+import io
+import json
+import os
 import re
+import time
+from functools import wraps
+
+import click
+
+from storage import Storage
+from instrumentation import Instrumentation, render_prometheus
+from passwords import HasherBusy, PasswordHasher
+from availability import RateLimiter, UsernameAvailability
+from assets import Assets
+from catalog import CatalogCache, category_habits, load_catalog
+from migrations import LATEST_VERSION, check_query_plans, current_version, upgrade
+from daily_tasks import (
+    DEFAULT_CHUNK_SIZE, STATUSES, MaterializedDays, apply_status_updates, materialize_user_day,
+    materialize_day, mark_missed, selected_habit_ids
+)
+from write_behind import WriteBehindBuffer
+from streaks import rebuild_all_streaks, rebuild_streaks, user_streaks
+from rollups import habit_days, rebuild_all_rollups, rebuild_rollups, refresh_user_days
+from analytics import analyze, load_history
+from export import EXPORT_FORMATS, export_stream
+from importer import DEFAULT_IMPORT_CHUNK, CSVImportError, import_csv
+from view_cache import bump_all_generations, bump_generation, create_view_cache, current_generation, write_version
+from http_cache import deploy_fingerprint, is_not_modified, last_modified_for, page_etag, set_validators
+from history import history_item, history_page, iter_history, parse_history_args
+from stats import category_stats, daily_stats, heatmap_year, parse_iso_date, parse_page_args, period_stats
 
 # ----------------------
 # APP SETUP
@@ -12,107 +44,179 @@ app = Flask(__name__)
 app.secret_key = "your-secret-key"  # required for session login
 
 # ---------- DATABASE CONFIG ----------
+app.config['DB_BACKEND'] = 'mysql'  # 'mysql' or 'sqlite' (single node, see SQLITE_PATH)
 app.config['MYSQL_HOST'] = 'localhost'
 app.config['MYSQL_USER'] = 'Aman'
 app.config['MYSQL_PASSWORD'] = 'Aman123'
 app.config['MYSQL_DB'] = 'habit_tracker_db'
+app.config['DB_AUTO_MIGRATE'] = False  # upgrade the schema on boot instead of only warning (see `flask db`)
+
+# ---------- CONNECTION POOL ----------
+app.config['MYSQL_POOL_SIZE'] = 5          # connections kept open per worker
+app.config['MYSQL_POOL_MAX_OVERFLOW'] = 10  # extra connections under bursts
+app.config['MYSQL_POOL_TIMEOUT'] = 30       # seconds to wait for a free connection
+app.config['MYSQL_POOL_RECYCLE'] = 3600     # reopen connections older than this
+
+# ---------- SQLITE (DB_BACKEND = 'sqlite') ----------
+app.config['SQLITE_PATH'] = os.path.join(app.instance_path, 'habit_tracker.sqlite3')
+app.config['SQLITE_POOL_SIZE'] = 8           # pooled connections (WAL: readers run in parallel)
+app.config['SQLITE_BUSY_TIMEOUT'] = 10       # seconds a writer waits for the write lock
+
+# ---------- WRITE-BEHIND (status clicks) ----------
+app.config['WRITE_BEHIND_ENABLED'] = False      # acknowledge clicks at once, write them in batches
+app.config['WRITE_BEHIND_INTERVAL'] = 2.0       # seconds between batch flushes
+app.config['WRITE_BEHIND_MAX_PENDING'] = 10000  # buffered keys before falling back to direct writes
+app.config['WRITE_BEHIND_FSYNC'] = True         # fsync the journal before acknowledging
+app.config['WRITE_BEHIND_JOURNAL_DIR'] = os.path.join(app.instance_path, "write_behind")
+
+# ---------- UPLOADS ----------
+app.config['MAX_CONTENT_LENGTH'] = 32 * 1024 * 1024  # largest accepted upload (history import)
+
+# ---------- ADMIN ----------
+app.config['ADMIN_USERNAMES'] = []  # usernames allowed to see /admin/* pages
+app.config['METRICS_TOKEN'] = None  # bearer token for scraping /metrics without a session
+
+# ---------- INSTRUMENTATION ----------
+app.config['INSTRUMENTATION_ENABLED'] = True  # per-request timing + SQL counters
+app.config['N_PLUS_ONE_THRESHOLD'] = 10       # same statement this often in one request = N+1
+app.config['SLOW_REQUEST_SECONDS'] = 1.0      # log requests slower than this
+
+# ---------- CATALOG CACHE ----------
+app.config['CATALOG_TTL'] = 300  # seconds before the predefined catalog is reloaded
+
+# ---------- PASSWORD HASHING ----------
+app.config['PASSWORD_HASH_METHOD'] = 'scrypt:32768:8:1'  # werkzeug method; older hashes are upgraded on login
+app.config['PASSWORD_HASH_WORKERS'] = 4       # hashes computed at the same time per worker process
+app.config['PASSWORD_HASH_MAX_QUEUE'] = 32    # waiting hashes before logins get a 503
+app.config['PASSWORD_HASH_TIMEOUT'] = 10      # seconds a request waits for its hash
+
+# ---------- USERNAME AVAILABILITY ----------
+app.config['USERNAME_FILTER_CAPACITY'] = 100000   # accounts the Bloom filter is sized for
+app.config['USERNAME_FILTER_ERROR_RATE'] = 0.01    # share of free names that still need a DB lookup
+app.config['USERNAME_LRU_SIZE'] = 2048             # recent DB lookups kept per worker
+app.config['USERNAME_REFRESH_INTERVAL'] = 60       # seconds between loads of accounts made elsewhere
+app.config['USERNAME_CHECK_RATE'] = 5              # /check_username calls per second per client
+app.config['USERNAME_CHECK_BURST'] = 20            # ... allowing short bursts of this many
+
+# ---------- VIEW CACHE ----------
+app.config['VIEW_CACHE_BACKEND'] = 'memory'           # 'memory' (per worker), 'sqlite' (shared per host) or None
+app.config['VIEW_CACHE_MAX_BYTES'] = 32 * 1024 * 1024  # cached views kept before the least recently used go
+app.config['VIEW_CACHE_PATH'] = os.path.join(app.instance_path, "view_cache.sqlite3")  # 'sqlite' backend file
+
+# ---------- HTTP CACHING ----------
+app.config['HTTP_CACHE_ENABLED'] = True  # ETag / 304 for logged-in pages (see http_cache.py)
+
+# ---------- STATIC ASSETS ----------
+app.config['ASSETS_BUILD_DIR'] = os.path.join(app.instance_path, "assets")  # fingerprinted bundles (see assets.py)
+app.config['ASSETS_MAX_AGE'] = 365 * 24 * 3600  # seconds browsers keep a bundle
+
+# ---------- ENVIRONMENT OVERRIDES ----------
+# Any key above can be overridden with FLASK_<KEY>, e.g.
+# FLASK_MYSQL_HOST=127.0.0.1 FLASK_MYSQL_PORT=3307 (values are parsed as JSON when possible)
+app.config.from_prefixed_env()
+
+db = Storage(app)
+instrumentation = Instrumentation(app, db)
+catalog_cache = CatalogCache(lambda: load_catalog(db.connection), ttl=app.config['CATALOG_TTL'])
+password_hasher = PasswordHasher(
+    method=app.config['PASSWORD_HASH_METHOD'],
+    workers=app.config['PASSWORD_HASH_WORKERS'],
+    max_queue=app.config['PASSWORD_HASH_MAX_QUEUE'],
+    timeout=app.config['PASSWORD_HASH_TIMEOUT']
+)
+username_availability = UsernameAvailability(
+    lambda: db.connection,
+    capacity=app.config['USERNAME_FILTER_CAPACITY'],
+    error_rate=app.config['USERNAME_FILTER_ERROR_RATE'],
+    lru_size=app.config['USERNAME_LRU_SIZE'],
+    refresh_interval=app.config['USERNAME_REFRESH_INTERVAL']
+)
+username_check_limiter = RateLimiter(app.config['USERNAME_CHECK_RATE'], app.config['USERNAME_CHECK_BURST'])
+view_cache = create_view_cache(app.config)
+materialized_days = MaterializedDays()
+assets = Assets(app)
+# Templates / static files of this release, part of every page ETag
+DEPLOY_FINGERPRINT = deploy_fingerprint(os.path.join(app.root_path, app.template_folder), app.static_folder)
+
+
+def cached_view(cursor, user_id, view, args, build):
+    # build() (re)computes the view; it is reused until the user writes
+    # again (see view_cache.py). Always built when the cache is off.
+    if view_cache is None:
+        return build()
+    generation = g.get("user_generation")
+    if generation is None:
+        generation = current_generation(cursor, user_id)
+    return view_cache.get_or_build(view_cache.key(user_id, generation, view, *args), build)
+
+def conditional_page(view=None, prepare=None):
+    # Logged-in GET pages: answer If-None-Match with 304 before the view
+    # runs (see http_cache.py). Skipped while flash messages are pending,
+    # they are part of the page and shown only once.
+    #
+    # prepare(cursor, user_id, day, generation) runs before the ETag is
+    # taken, for pages whose view writes (my_habits creates today's rows):
+    # it returns the generation after its writes, so the ETag describes
+    # the page as the view will render it.
+    if view is None:
+        return lambda view: conditional_page(view, prepare)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if (not app.config["HTTP_CACHE_ENABLED"] or request.method != "GET"
+                or "loggedin" not in session or "_flashes" in session):
+            return view(*args, **kwargs)
+
+        user_id = session["user_id"]
+        today = date.today()
+        cursor = db.connection.cursor()
+        version = write_version(cursor, user_id)
+        if version is not None and prepare is not None:
+            if prepare(cursor, user_id, today, version[0]) != version[0]:
+                version = write_version(cursor, user_id)
+        cursor.close()
+        if version is None:
+            return view(*args, **kwargs)
+        generation, last_write_at = version
+        g.user_generation = generation    # reused by cached_view
+
+        # Clicks not yet flushed by the write-behind buffer are not in
+        # data_generation yet but already shown
+        pending = sorted(status_buffer.pending_for(user_id, today).items()) if status_buffer else []
+        etag = page_etag(user_id, session["username"], generation, request.endpoint, sorted(kwargs.items()),
+                         request.query_string, today.isoformat(), catalog_cache.get().version,
+                         DEPLOY_FINGERPRINT, pending)
+        last_modified = last_modified_for(last_write_at, today)
+        if is_not_modified(etag):
+            return set_validators(Response(status=304), etag, last_modified)
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200 and "_flashes" not in session:
+            set_validators(response, etag, last_modified)
+        return response
+    return wrapper
 
-mysql = MySQL(app)
 
 # ============================================================
 # DATABASE INITIALIZATION + SEEDING
 # ============================================================
-def create_tables_and_seed():
-    cursor = mysql.connection.cursor()
-
-    # users table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        user_id INT AUTO_INCREMENT PRIMARY KEY,
-        first_name VARCHAR(255),
-        last_name VARCHAR(255),
-        username VARCHAR(255) UNIQUE,
-        dob DATE,
-        gender VARCHAR(20),
-        mobile VARCHAR(50),
-        email VARCHAR(255) UNIQUE,
-        password VARCHAR(255),
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-
-    # categories table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS categories (
-        category_id INT AUTO_INCREMENT PRIMARY KEY,
-        category_name VARCHAR(255) NOT NULL,
-        is_custom BOOLEAN DEFAULT FALSE,
-        user_id INT NULL,
-        FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-    )
-    """)
+# Schema changes and seeding only run through `flask db init` /
+# `flask db seed`. A booting worker just compares the stamped schema
+# version (one SELECT) and never issues DDL unless DB_AUTO_MIGRATE is set
+# (DATABASE CONFIG).
 
-    # habits table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS habits (
-        habit_id INT AUTO_INCREMENT PRIMARY KEY,
-        category_id INT,
-        user_id INT NULL,
-        habit_name VARCHAR(255),
-        is_custom TINYINT(1) DEFAULT 0,
-        is_active BOOLEAN DEFAULT TRUE,
-        created_at DATETIME,
-        FOREIGN KEY (category_id) REFERENCES categories(category_id),
-        FOREIGN KEY (user_id) REFERENCES users(user_id)
-    )
-    """)
-
-    # user_selected_habits table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS user_selected_habits (
-        entry_id INT AUTO_INCREMENT PRIMARY KEY,
-        user_id INT,
-        habit_id INT,
-        date_added DATE,
-        custom_name VARCHAR(255),
-        is_daily_task BOOLEAN DEFAULT FALSE,
-        order_position INT,
-        FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
-        FOREIGN KEY (habit_id) REFERENCES habits(habit_id) ON DELETE CASCADE
-    )
-    """)
-
-    # daily_task_status table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS daily_task_status (
-        task_id INT AUTO_INCREMENT PRIMARY KEY,
-        user_id INT NOT NULL,
-        habit_id INT NOT NULL,
-        everyday_date DATE NOT NULL,
-        status ENUM('Completed', 'Missed', 'Skipped', 'Pending') DEFAULT 'Pending',
-        marked_time DATETIME DEFAULT NULL,
-        UNIQUE KEY unique_user_habit_date (user_id, habit_id, everyday_date),
-        FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
-        FOREIGN KEY (habit_id) REFERENCES habits(habit_id) ON DELETE CASCADE
-    )
-    """)
-
-    mysql.connection.commit()
-    cursor.close()
+def create_tables_and_seed():
+    # Tables and indexes are defined as versioned migrations (migrations.py)
+    upgrade(db.connection)
+    seed_default_habits()
     #print("Tables created/verified.")
 
-with app.app_context():
-    try:
-        create_tables_and_seed()
-    except Exception as e:
-        print("Warning (DB init failed):", e)
-
 
 # ============================================================
 # DEFAULT CATEGORIES + HABITS SEEDING
 # ============================================================
 def seed_default_habits():
-    cursor = mysql.connection.cursor()
+    cursor = db.connection.cursor()
 
     categories_with_habits = {
         "Health & Wellness": [
@@ -162,44 +266,93 @@ def seed_default_habits():
         ]
     }
 
+    # Existing predefined categories and habits in two queries
+    cursor.execute("SELECT category_name, category_id FROM categories WHERE is_custom = 0")
+    category_ids = dict(cursor.fetchall())
+
+    cursor.execute("SELECT category_id, habit_name FROM habits WHERE is_custom = 0")
+    existing_habits = set(cursor.fetchall())
+
+    new_habits = []
     for category_name, habits in categories_with_habits.items():
         # insert category if not exists
-        cursor.execute("SELECT category_id FROM categories WHERE category_name=%s", (category_name,))
-        category = cursor.fetchone()
-
-        if category:
-            category_id = category[0]
-        else:
+        if category_name not in category_ids:
             cursor.execute("INSERT INTO categories (category_name, is_custom) VALUES (%s, %s)", (category_name, False))
-            mysql.connection.commit()
-            category_id = cursor.lastrowid
+            category_ids[category_name] = cursor.lastrowid
 
-        # insert habits for this category
+        category_id = category_ids[category_name]
         for habit_name in habits:
-            cursor.execute("""
-                SELECT habit_id FROM habits 
-                WHERE habit_name=%s AND category_id=%s
-            """, (habit_name, category_id))
-            habit = cursor.fetchone()
-
-            if not habit:
-                cursor.execute("""
-                    INSERT INTO habits (category_id, habit_name, is_custom, is_active, created_at)
-                    VALUES (%s, %s, %s, %s, NOW())
-                """, (category_id, habit_name, False, True))
+            if (category_id, habit_name) not in existing_habits:
+                new_habits.append((category_id, habit_name, False, True))
 
-    mysql.connection.commit()
+    # insert all missing habits in one batch
+    if new_habits:
+        cursor.executemany("""
+            INSERT INTO habits (category_id, habit_name, is_custom, is_active, created_at)
+            VALUES (%s, %s, %s, %s, NOW())
+        """, new_habits)
+
+    db.connection.commit()
     cursor.close()
+    catalog_cache.invalidate()
     #print("Default categories & habits seeded.")
 
 
-# Run DB setup + seeding
+# Boot: version-stamp check only
+def check_schema_version():
+    cursor = db.connection.cursor()
+    version = current_version(cursor)
+    cursor.close()
+
+    if version < LATEST_VERSION:
+        if not app.config["DB_AUTO_MIGRATE"]:
+            app.logger.warning("Database schema is at version %s, latest is %s. Run `flask db init`.", version, LATEST_VERSION)
+            return
+        create_tables_and_seed()
+
+    # Load the shared predefined catalog once per worker
+    catalog_cache.get()
+
 with app.app_context():
     try:
-        create_tables_and_seed()
-        seed_default_habits()
+        check_schema_version()
     except Exception as e:
-        print("Warning (DB init/seed failed):", e)
+        app.logger.warning("DB version check failed: %s", e)
+
+
+# ============================================================
+# HABIT STATUS WRITES
+# ============================================================
+# Every status change (single click, batch check-in, write-behind flush)
+# ends up in daily_tasks.apply_status_updates().
+
+def write_status_rows(rows):
+    # Flush target of the write-behind buffer; runs outside any request
+    with app.app_context():
+        cursor = db.connection.cursor()
+        apply_status_updates(cursor, rows)
+        db.connection.commit()
+        cursor.close()
+
+status_buffer = None
+if app.config["WRITE_BEHIND_ENABLED"]:
+    status_buffer = WriteBehindBuffer(
+        write_status_rows,
+        app.config["WRITE_BEHIND_JOURNAL_DIR"],
+        interval=app.config["WRITE_BEHIND_INTERVAL"],
+        max_pending=app.config["WRITE_BEHIND_MAX_PENDING"],
+        fsync=app.config["WRITE_BEHIND_FSYNC"]
+    )
+
+
+def record_status_updates(cursor, rows):
+    # Buffer the rows when write-behind is on, otherwise write + commit now.
+    # Rows the (full) buffer refuses are written directly.
+    if status_buffer:
+        rows = [row for row in rows if not status_buffer.put(*row)]
+    if rows:
+        apply_status_updates(cursor, rows)
+        db.connection.commit()
 
 
 # ============================================================
@@ -275,14 +428,8 @@ def create_account():
             errors["username"] = "Only alphabets and numeral values are allowed*"
         elif not (re.search("[A-Za-z]", username) and re.search("[0-9]", username)):
             errors["username"] = "Username should be alphanumeric"
-        else:
-            # Check uniqueness in DB
-            cursor = mysql.connection.cursor()
-            cursor.execute("SELECT * FROM users WHERE username = %s", (username,))
-            existing_user = cursor.fetchone()
-            cursor.close()
-            if existing_user:
-                errors["username"] = "Username already taken"
+        elif username_availability.is_taken(username, fresh=True):
+            errors["username"] = "Username already taken"
 
 
         # -------------------------
@@ -345,9 +492,9 @@ def create_account():
                     "At least 5 characters before @, and domain must be common (e.g., gmail.com)."
                 )
             else:
-                username = email.split('@')[0]
+                local_part = email.split('@')[0]
                 # Check if all characters are the same (e.g., aaaaa, 11111)
-                if re.fullmatch(r'(.)\1+', username):
+                if re.fullmatch(r'(.)\1+', local_part):
                     errors["email"] = "Username part cannot have all repeated characters."
         else:
             errors["email"] = "Required field*"
@@ -388,9 +535,18 @@ def create_account():
         # -------------------------
         # If no errors → insert into DB
         # -------------------------
-        hashed_password = generate_password_hash(password)
+        try:
+            hashed_password = password_hasher.hash(password)
+        except HasherBusy:
+            errors["password"] = "Too many sign-ups right now, please try again in a moment."
+            return render_template(
+                "create_acc.html",
+                data=data,
+                errors=errors,
+                today_date=today.strftime("%Y-%m-%d")
+            ), 503
 
-        cursor = mysql.connection.cursor()
+        cursor = db.connection.cursor()
         cursor.execute("""
             INSERT INTO users(first_name, last_name, username, dob, gender, mobile, email, password)
             VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
@@ -404,8 +560,9 @@ def create_account():
             email,
             hashed_password
         ))
-        mysql.connection.commit()
+        db.connection.commit()
         cursor.close()
+        username_availability.add(username)
 
         flash("Account Created Successfully!", "success")
         return redirect(url_for("home"))
@@ -427,6 +584,12 @@ def create_account():
 
 @app.route("/check_username", methods=["POST"])
 def check_username():
+    # Called on every keystroke: throttle per client before anything else
+    if not username_check_limiter.allow(request.remote_addr):
+        response = jsonify(status="error", message="Too many checks, please slow down")
+        response.headers["Retry-After"] = str(username_check_limiter.retry_after())
+        return response, 429
+
     username = request.form.get("username", "").strip()
     response = {"status": "ok", "message": ""}
 
@@ -439,14 +602,9 @@ def check_username():
     elif len(re.findall(r'\d', username)) < 2:
         response["status"] = "error"
         response["message"] = "Username should be alphanumeric"
-    else:
-        cursor = mysql.connection.cursor()
-        cursor.execute("SELECT * FROM users WHERE username = %s", (username,))
-        existing_user = cursor.fetchone()
-        cursor.close()
-        if existing_user:
-            response["status"] = "error"
-            response["message"] = "Username already taken"
+    elif username_availability.is_taken(username):
+        response["status"] = "error"
+        response["message"] = "Username already taken"
 
     return jsonify(response)
 
@@ -472,21 +630,47 @@ def login():
         if error_username or error_password:
             return render_template("login.html",error_username=error_username,error_password=error_password)
 
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-        cursor.execute("""
-            SELECT * FROM users WHERE email=%s OR username=%s
-        """, (email_or_username, email_or_username))
+        # Usernames are alphanumeric, so an "@" means email. Each branch is
+        # a lookup on one unique index (an OR across both is not).
+        if "@" in email_or_username:
+            lookup_sql = "SELECT user_id, username, password FROM users WHERE email = %s"
+            email_or_username = email_or_username.lower()
+        else:
+            lookup_sql = "SELECT user_id, username, password FROM users WHERE username = %s"
+
+        cursor = db.connection.cursor("dict")
+        cursor.execute(lookup_sql, (email_or_username,))
         user = cursor.fetchone()
-        cursor.close()
 
         if not user:
+            cursor.close()
             error_username = "User not found*"
             return render_template("login.html",error_username=error_username,error_password=error_password)
 
-        if not check_password_hash(user['password'], password):
+        # Hashing runs on the bounded password pool, not on this thread
+        try:
+            valid = password_hasher.verify(user['password'], password)
+        except HasherBusy:
+            cursor.close()
+            error_password = "Too many sign-ins right now, please try again in a moment."
+            return render_template("login.html",error_username=error_username,error_password=error_password), 503
+
+        if not valid:
+            cursor.close()
             error_password = "Wrong Password*"
             return render_template("login.html",error_username=error_username,error_password=error_password)
 
+        # Stored with older hash parameters: upgrade it now that we know the
+        # password. Best effort, a full pool just leaves it for the next login.
+        try:
+            new_hash = password_hasher.rehash(user['password'], password)
+        except HasherBusy:
+            new_hash = None
+        if new_hash:
+            cursor.execute("UPDATE users SET password = %s WHERE user_id = %s", (new_hash, user['user_id']))
+            db.connection.commit()
+        cursor.close()
+
         # Successful login
         session['loggedin'] = True
         session['user_id'] = user['user_id']
@@ -501,517 +685,58 @@ def login():
 # Dashboard
 # ---------------------------
 @app.route("/dashboard")
+@conditional_page
 def dashboard():
     if "loggedin" not in session:
         return redirect(url_for("login"))
 
-    user_id = session["user_id"]
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
-    # Predefined categories (shared for all users)
-    cursor.execute("SELECT * FROM categories WHERE is_custom=0")
-    predefined_categories = cursor.fetchall()
-
-    # Custom categories created by the user
-    cursor.execute("SELECT * FROM categories WHERE is_custom=1 AND user_id=%s", (user_id,))
-    custom_categories = cursor.fetchall()
-
-    cursor.close()
-    return render_template(
-        "dashboard.html",
-        username=session["username"],
-        predefined_categories=predefined_categories,
-        custom_categories=custom_categories
-    )
-
-
-#-------------------------------------------------
-# Habit Categories Routes
-#-------------------------------------------------
-#-------------------------------------------------
-# Health and Wellness
-#-------------------------------------------------
-
-@app.route("/health_wellness")
-def health_wellness():
-    if "loggedin" not in session:
-        return redirect(url_for("login"))
-
-    user_id = session["user_id"]
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
-    # Get category_id
-    cursor.execute(
-        "SELECT category_id FROM categories WHERE category_name = %s",
-        ("Health & Wellness",)
-    )
-    category = cursor.fetchone()
-    if not category:
-        cursor.close()
-        return "Category 'Health & Wellness' not found in DB"
-
-    category_id = category["category_id"]
-
-    # Fetch all habits
-    cursor.execute("""
-        SELECT h.habit_id,
-               h.habit_name,
-               ush.custom_name,
-               CASE 
-                   WHEN ush.habit_id IS NOT NULL THEN 1 
-                   ELSE 0 
-               END AS in_user_habits
-        FROM habits h
-        LEFT JOIN user_selected_habits ush
-            ON h.habit_id = ush.habit_id AND ush.user_id = %s
-        WHERE h.category_id = %s
-    """, (user_id, category_id))
-
-    habits = cursor.fetchall()
-    cursor.close()
-
-    # Pass the name to display: custom_name if exists, else default habit_name
-    for habit in habits:
-        habit['display_name'] = habit['custom_name'] if habit['custom_name'] else habit['habit_name']
-        habit['added'] = habit['in_user_habits']  # 1 if added, 0 if not
-
-    return render_template(
-        "health_wellness.html",
-        username=session["username"],
-        habits=habits,
-        category=category
-    )
-
-
-#-------------------------------------------------
-# Remove Button for Health & Wellness
-#-------------------------------------------------
-
-@app.route("/remove_health_habit/<int:habit_id>", methods=["POST"])
-def remove_health_habit(habit_id):
-    if "loggedin" not in session:
-        flash("Not logged in", "error")
-        return redirect(url_for("login"))
-
-    user_id = session["user_id"]
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
-    # Fetch habit info
-    cursor.execute("""
-        SELECT * FROM habits h
-        LEFT JOIN user_selected_habits ush
-        ON h.habit_id = ush.habit_id AND ush.user_id = %s
-        WHERE h.habit_id = %s
-    """, (user_id, habit_id))
-    habit = cursor.fetchone()
-
-    if not habit:
-        cursor.close()
-        flash("Habit not found", "error")
-        return redirect(url_for("health_wellness"))
-
-    # Case 1: Custom habit
-    if habit["is_custom"]:
-        # Delete from user_selected_habits and habits
-        cursor.execute("DELETE FROM user_selected_habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        cursor.execute("DELETE FROM habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        message = "Custom habit removed successfully"
-
-    # Case 2: Predefined habit edited
-    elif habit.get("custom_name"):
-        # Remove from user habits & reset edited name
-        cursor.execute("DELETE FROM user_selected_habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        message = "Habit Reverted to predefined one."
-
-    # Case 3: Predefined habit untouched
-    else:
-        # Remove from user habits only
-        cursor.execute("DELETE FROM user_selected_habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        message = "Habit removed from my habits"
-
-    mysql.connection.commit()
-    cursor.close()
-
-    flash(message, "success")
-    return redirect(url_for("health_wellness"))
-
-
-
-#-------------------------------------------------
-# Learning and Growth
-#-------------------------------------------------
-
-
-@app.route("/learning_growth")
-def learning_growth():
-    if "loggedin" not in session:
-        return redirect(url_for("login"))
-
-    user_id = session["user_id"]
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
-    # Get category_id
-    cursor.execute(
-        "SELECT category_id FROM categories WHERE category_name = %s",
-        ("Learning & Growth",)
-    )
-    category = cursor.fetchone()
-    if not category:
-        cursor.close()
-        return "Category 'Learning & Growth' not found in DB"
-
-    category_id = category["category_id"]
-
-    # Fetch all habits
-    cursor.execute("""
-        SELECT h.habit_id,
-               h.habit_name,
-               ush.custom_name,
-               CASE 
-                   WHEN ush.habit_id IS NOT NULL THEN 1 
-                   ELSE 0 
-               END AS in_user_habits
-        FROM habits h
-        LEFT JOIN user_selected_habits ush
-            ON h.habit_id = ush.habit_id AND ush.user_id = %s
-        WHERE h.category_id = %s
-    """, (user_id, category_id))
-
-    habits = cursor.fetchall()
-    cursor.close()
-
-    # Pass the name to display: custom_name if exists, else default habit_name
-    for habit in habits:
-        habit['display_name'] = habit['custom_name'] if habit['custom_name'] else habit['habit_name']
-        habit['added'] = habit['in_user_habits']  # 1 if added, 0 if not
-
-    return render_template(
-        "learning_growth.html",
-        username=session["username"],
-        habits=habits,
-        category=category
-    )
-
-#-------------------------------------------------
-# Remove Button for Learning & Growth
-#-------------------------------------------------
-
-@app.route("/remove_learning_habit/<int:habit_id>", methods=["POST"])
-def remove_learning_habit(habit_id):
-    if "loggedin" not in session:
-        flash("Not logged in", "error")
-        return redirect(url_for("login"))
-
-    user_id = session["user_id"]
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
-    # Fetch habit info
-    cursor.execute("""
-        SELECT * FROM habits h
-        LEFT JOIN user_selected_habits ush
-        ON h.habit_id = ush.habit_id AND ush.user_id = %s
-        WHERE h.habit_id = %s
-    """, (user_id, habit_id))
-    habit = cursor.fetchone()
-
-    if not habit:
-        cursor.close()
-        flash("Habit not found", "error")
-        return redirect(url_for("learning_growth"))
-
-    # Case 1: Custom habit
-    if habit["is_custom"]:
-        # Delete from user_selected_habits and habits
-        cursor.execute("DELETE FROM user_selected_habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        cursor.execute("DELETE FROM habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        message = "Custom habit removed successfully"
-
-    # Case 2: Predefined habit edited
-    elif habit.get("custom_name"):
-        # Remove from user habits & reset edited name
-        cursor.execute("DELETE FROM user_selected_habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        message = "Habit Reverted to predefined one."
-
-    # Case 3: Predefined habit untouched
-    else:
-        # Remove from user habits only
-        cursor.execute("DELETE FROM user_selected_habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        message = "Habit removed from my habits"
-
-    mysql.connection.commit()
-    cursor.close()
-
-    flash(message, "success")
-    return redirect(url_for("learning_growth"))
-
-
-
-#-------------------------------------------------
-# Productivity
-#-------------------------------------------------
-
-
-@app.route("/productivity")
-def productivity():
-    if "loggedin" not in session:
-        return redirect(url_for("login"))
-
-    user_id = session["user_id"]
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
-    # Get category_id
-    cursor.execute(
-        "SELECT category_id FROM categories WHERE category_name = %s",
-        ("Productivity",)
-    )
-    category = cursor.fetchone()
-    if not category:
-        cursor.close()
-        return "Category 'Productivity' not found in DB"
-
-    category_id = category["category_id"]
-
-    # Fetch all habits
-    cursor.execute("""
-        SELECT h.habit_id,
-               h.habit_name,
-               ush.custom_name,
-               CASE 
-                   WHEN ush.habit_id IS NOT NULL THEN 1 
-                   ELSE 0 
-               END AS in_user_habits
-        FROM habits h
-        LEFT JOIN user_selected_habits ush
-            ON h.habit_id = ush.habit_id AND ush.user_id = %s
-        WHERE h.category_id = %s
-    """, (user_id, category_id))
-
-    habits = cursor.fetchall()
-    cursor.close()
-
-    # Pass the name to display: custom_name if exists, else default habit_name
-    for habit in habits:
-        habit['display_name'] = habit['custom_name'] if habit['custom_name'] else habit['habit_name']
-        habit['added'] = habit['in_user_habits']  # 1 if added, 0 if not
-
-    return render_template(
-        "productivity.html",
-        username=session["username"],
-        habits=habits,
-        category=category
-    )
-
-
-#-------------------------------------------------
-# Remove Button for Productivity
-#-------------------------------------------------
-
-@app.route("/remove_productivity_habit/<int:habit_id>", methods=["POST"])
-def remove_productivity_habit(habit_id):
-    if "loggedin" not in session:
-        flash("Not logged in", "error")
-        return redirect(url_for("login"))
-
-    user_id = session["user_id"]
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
-    # Fetch habit info
-    cursor.execute("""
-        SELECT * FROM habits h
-        LEFT JOIN user_selected_habits ush
-        ON h.habit_id = ush.habit_id AND ush.user_id = %s
-        WHERE h.habit_id = %s
-    """, (user_id, habit_id))
-    habit = cursor.fetchone()
-
-    if not habit:
-        cursor.close()
-        flash("Habit not found", "error")
-        return redirect(url_for("productivity"))
-
-    # Case 1: Custom habit
-    if habit["is_custom"]:
-        # Delete from user_selected_habits and habits
-        cursor.execute("DELETE FROM user_selected_habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        cursor.execute("DELETE FROM habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        message = "Custom habit removed successfully"
-
-    # Case 2: Predefined habit edited
-    elif habit.get("custom_name"):
-        # Remove from user habits & reset edited name
-        cursor.execute("DELETE FROM user_selected_habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        message = "Habit Reverted to predefined one."
-
-    # Case 3: Predefined habit untouched
-    else:
-        # Remove from user habits only
-        cursor.execute("DELETE FROM user_selected_habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        message = "Habit removed from my habits"
-
-    mysql.connection.commit()
-    cursor.close()
-
-    flash(message, "success")
-    return redirect(url_for("productivity"))
-
-#-------------------------------------------------
-# Finance & Discipline
-#-------------------------------------------------
-
-
-@app.route("/finance_discipline")
-def finance_discipline():
-    if "loggedin" not in session:
-        return redirect(url_for("login"))
-
-    user_id = session["user_id"]
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
-    # Get category_id
-    cursor.execute(
-        "SELECT category_id FROM categories WHERE category_name = %s",
-        ("Finance & Discipline",)
-    )
-    category = cursor.fetchone()
-    if not category:
-        cursor.close()
-        return "Category 'Finance & Discipline' not found in DB"
-
-    category_id = category["category_id"]
-
-    # Fetch all habits
-    cursor.execute("""
-        SELECT h.habit_id,
-               h.habit_name,
-               ush.custom_name,
-               CASE 
-                   WHEN ush.habit_id IS NOT NULL THEN 1 
-                   ELSE 0 
-               END AS in_user_habits
-        FROM habits h
-        LEFT JOIN user_selected_habits ush
-            ON h.habit_id = ush.habit_id AND ush.user_id = %s
-        WHERE h.category_id = %s
-    """, (user_id, category_id))
-
-    habits = cursor.fetchall()
-    cursor.close()
-
-    # Pass the name to display: custom_name if exists, else default habit_name
-    for habit in habits:
-        habit['display_name'] = habit['custom_name'] if habit['custom_name'] else habit['habit_name']
-        habit['added'] = habit['in_user_habits']  # 1 if added, 0 if not
-
-    return render_template(
-        "finance_discipline.html",
-        username=session["username"],
-        habits=habits,
-        category=category
-    )
-
-
-#-------------------------------------------------
-# Remove Button for Finance & Discipline
-#-------------------------------------------------
-
-@app.route("/remove_finance_habit/<int:habit_id>", methods=["POST"])
-def remove_finance_habit(habit_id):
-    if "loggedin" not in session:
-        flash("Not logged in", "error")
-        return redirect(url_for("login"))
-
-    user_id = session["user_id"]
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
-
-    # Fetch habit info
-    cursor.execute("""
-        SELECT * FROM habits h
-        LEFT JOIN user_selected_habits ush
-        ON h.habit_id = ush.habit_id AND ush.user_id = %s
-        WHERE h.habit_id = %s
-    """, (user_id, habit_id))
-    habit = cursor.fetchone()
-
-    if not habit:
-        cursor.close()
-        flash("Habit not found", "error")
-        return redirect(url_for("finance_discipline"))
-
-    # Case 1: Custom habit
-    if habit["is_custom"]:
-        # Delete from user_selected_habits and habits
-        cursor.execute("DELETE FROM user_selected_habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        cursor.execute("DELETE FROM habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        message = "Custom habit removed successfully"
-
-    # Case 2: Predefined habit edited
-    elif habit.get("custom_name"):
-        # Remove from user habits & reset edited name
-        cursor.execute("DELETE FROM user_selected_habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        message = "Habit Reverted to predefined one."
+    user_id = session["user_id"]
+    cursor = db.connection.cursor("dict")
 
-    # Case 3: Predefined habit untouched
-    else:
-        # Remove from user habits only
-        cursor.execute("DELETE FROM user_selected_habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
-        message = "Habit removed from my habits"
+    # Predefined categories (shared for all users, cached per worker)
+    predefined_categories = catalog_cache.get().categories
+
+    # Custom categories created by the user
+    cursor.execute("SELECT * FROM categories WHERE is_custom=1 AND user_id=%s", (user_id,))
+    custom_categories = cursor.fetchall()
 
-    mysql.connection.commit()
     cursor.close()
+    return render_template(
+        "dashboard.html",
+        username=session["username"],
+        predefined_categories=predefined_categories,
+        custom_categories=custom_categories
+    )
 
-    flash(message, "success")
-    return redirect(url_for("finance_discipline"))
 
 #-------------------------------------------------
-# Personal & Lifestyle
+# Habit Categories Routes
 #-------------------------------------------------
+# Every predefined category is served by the same two views, looked up
+# by slug ("health_wellness") or id in the cached catalog.
 
-
-@app.route("/personal_lifestyle")
-def personal_lifestyle():
+@app.route("/category/<category_ref>")
+@conditional_page
+def category_page(category_ref):
     if "loggedin" not in session:
         return redirect(url_for("login"))
 
     user_id = session["user_id"]
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+    catalog = catalog_cache.get()
 
-    # Get category_id
-    cursor.execute(
-        "SELECT category_id FROM categories WHERE category_name = %s",
-        ("Personal & Lifestyle",)
-    )
-    category = cursor.fetchone()
+    category = catalog.resolve(category_ref)
     if not category:
-        cursor.close()
-        return "Category 'Personal & Lifestyle' not found in DB"
-
-    category_id = category["category_id"]
-
-    # Fetch all habits
-    cursor.execute("""
-        SELECT h.habit_id,
-               h.habit_name,
-               ush.custom_name,
-               CASE 
-                   WHEN ush.habit_id IS NOT NULL THEN 1 
-                   ELSE 0 
-               END AS in_user_habits
-        FROM habits h
-        LEFT JOIN user_selected_habits ush
-            ON h.habit_id = ush.habit_id AND ush.user_id = %s
-        WHERE h.category_id = %s
-    """, (user_id, category_id))
+        return f"Category '{category_ref}' not found in DB", 404
 
-    habits = cursor.fetchall()
+    cursor = db.connection.cursor("dict")
+    habits = cached_view(
+        cursor, user_id, "category", (category["category_id"], catalog.version),
+        lambda: category_habits(catalog, cursor, user_id, category["category_id"])
+    )
     cursor.close()
 
-    # Pass the name to display: custom_name if exists, else default habit_name
-    for habit in habits:
-        habit['display_name'] = habit['custom_name'] if habit['custom_name'] else habit['habit_name']
-        habit['added'] = habit['in_user_habits']  # 1 if added, 0 if not
-
     return render_template(
-        "personal_lifestyle.html",
+        "predefined_category.html",
         username=session["username"],
         habits=habits,
         category=category
@@ -1019,17 +744,23 @@ def personal_lifestyle():
 
 
 #-------------------------------------------------
-# Remove Button for Personal & Lifestyle
+# Remove Button for predefined categories
 #-------------------------------------------------
 
-@app.route("/remove_lifestyle_habit/<int:habit_id>", methods=["POST"])
-def remove_lifestyle_habit(habit_id):
+@app.route("/category/<category_ref>/remove/<int:habit_id>", methods=["POST"])
+def remove_category_habit(category_ref, habit_id):
     if "loggedin" not in session:
         flash("Not logged in", "error")
         return redirect(url_for("login"))
 
+    category = catalog_cache.get().resolve(category_ref)
+    if not category:
+        flash("Category not found", "error")
+        return redirect(url_for("dashboard"))
+
+    category_url = url_for("category_page", category_ref=category["slug"])
     user_id = session["user_id"]
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+    cursor = db.connection.cursor("dict")
 
     # Fetch habit info
     cursor.execute("""
@@ -1043,13 +774,18 @@ def remove_lifestyle_habit(habit_id):
     if not habit:
         cursor.close()
         flash("Habit not found", "error")
-        return redirect(url_for("personal_lifestyle"))
+        return redirect(category_url)
 
     # Case 1: Custom habit
     if habit["is_custom"]:
+        # The habit's history goes with it (rollups need a tuple cursor)
+        rollup_cursor = db.connection.cursor()
+        days = habit_days(rollup_cursor, user_id, habit_id)
         # Delete from user_selected_habits and habits
         cursor.execute("DELETE FROM user_selected_habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
         cursor.execute("DELETE FROM habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
+        refresh_user_days(rollup_cursor, days, removed=True)
+        rollup_cursor.close()
         message = "Custom habit removed successfully"
 
     # Case 2: Predefined habit edited
@@ -1064,11 +800,33 @@ def remove_lifestyle_habit(habit_id):
         cursor.execute("DELETE FROM user_selected_habits WHERE habit_id=%s AND user_id=%s", (habit_id, user_id))
         message = "Habit removed from my habits"
 
-    mysql.connection.commit()
+    bump_generation(cursor, user_id)
+    db.connection.commit()
     cursor.close()
 
     flash(message, "success")
-    return redirect(url_for("personal_lifestyle"))
+    return redirect(category_url)
+
+
+#-------------------------------------------------
+# Old per-category URLs
+#-------------------------------------------------
+# page endpoint / URL -> remove endpoint, kept so bookmarks and
+# url_for('health_wellness') keep working.
+LEGACY_CATEGORY_ROUTES = {
+    "health_wellness": "remove_health_habit",
+    "learning_growth": "remove_learning_habit",
+    "productivity": "remove_productivity_habit",
+    "finance_discipline": "remove_finance_habit",
+    "personal_lifestyle": "remove_lifestyle_habit",
+}
+
+for slug, remove_endpoint in LEGACY_CATEGORY_ROUTES.items():
+    app.add_url_rule(f"/{slug}", endpoint=slug, view_func=category_page,
+                     defaults={"category_ref": slug})
+    app.add_url_rule(f"/{remove_endpoint}/<int:habit_id>", endpoint=remove_endpoint,
+                     view_func=remove_category_habit, methods=["POST"],
+                     defaults={"category_ref": slug})
 
 
 # ---------------------------
@@ -1080,7 +838,7 @@ def add_habit(habit_id):
         return redirect(url_for("login"))
 
     user_id = session["user_id"]
-    cursor = mysql.connection.cursor()
+    cursor = db.connection.cursor()
 
     # Insert into user_selected_habits (if not already added)
     cursor.execute("""
@@ -1093,7 +851,8 @@ def add_habit(habit_id):
             INSERT INTO user_selected_habits (user_id, habit_id, date_added)
             VALUES (%s, %s, CURDATE())
         """, (user_id, habit_id))
-        mysql.connection.commit()
+        bump_generation(cursor, user_id)
+        db.connection.commit()
 
     cursor.close()
     flash("Habit added successfully", "success")
@@ -1111,11 +870,13 @@ def add_custom_habit(category_name):
     user_id = session["user_id"]
     habit_name = request.form["habit_name"]
 
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+    cursor = db.connection.cursor("dict")
 
-    # Get category_id for this category
-    cursor.execute("SELECT category_id FROM categories WHERE category_name=%s", (category_name,))
-    category = cursor.fetchone()
+    # Get category_id for this category (predefined ones are cached)
+    category = catalog_cache.get().category(category_name)
+    if not category:
+        cursor.execute("SELECT category_id FROM categories WHERE category_name=%s", (category_name,))
+        category = cursor.fetchone()
     if not category:
         cursor.close()
         flash("Category not found", "danger")
@@ -1128,7 +889,7 @@ def add_custom_habit(category_name):
         INSERT INTO habits (category_id, user_id, habit_name, is_custom, is_active, created_at)
         VALUES (%s, %s, %s, %s, %s, NOW())
     """, (category_id, user_id, habit_name, True, True))
-    mysql.connection.commit()
+    db.connection.commit()
     habit_id = cursor.lastrowid
 
     # Insert into user_selected_habits
@@ -1136,7 +897,8 @@ def add_custom_habit(category_name):
         INSERT INTO user_selected_habits (user_id, habit_id, date_added, custom_name)
         VALUES (%s, %s, CURDATE(), %s)
     """, (user_id, habit_id, habit_name))
-    mysql.connection.commit()
+    bump_generation(cursor, user_id)
+    db.connection.commit()
 
     cursor.close()
     flash("Custom habit added successfully", "success")
@@ -1146,7 +908,24 @@ def add_custom_habit(category_name):
 # ---------------------------
 # My Habits Page 
 # ---------------------------
+def ensure_day_rows(cursor, user_id, day, generation=None):
+    # Ensure the day's records exist in daily_task_status (one INSERT ...
+    # SELECT for all selected habits, one commit), unless this worker
+    # already did so at the current generation. Returns the generation
+    # after it, the one that describes the day as it is now.
+    if generation is None:
+        generation = current_generation(cursor, user_id)
+    if materialized_days.is_current(user_id, day, generation):
+        return generation
+    if materialize_user_day(cursor, user_id, day):
+        generation = current_generation(cursor, user_id)
+    db.connection.commit()
+    materialized_days.remember(user_id, day, generation)
+    return generation
+
+
 @app.route("/my_habits")
+@conditional_page(prepare=ensure_day_rows)
 def my_habits():
     if "loggedin" not in session:
         return redirect(url_for("login"))
@@ -1154,42 +933,31 @@ def my_habits():
     user_id = session["user_id"]
     today = date.today()
 
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+    cursor = db.connection.cursor("dict")
+    # Before the generation is used as cache key: creating today's rows bumps it
+    g.user_generation = ensure_day_rows(cursor, user_id, today, g.get("user_generation"))
+    habits_with_status = cached_view(
+        cursor, user_id, "today", (today.isoformat(),),
+        lambda: load_today(cursor, user_id, today)
+    )
+    cursor.close()
 
-    # STEP 1: Fetch all user-selected habits (predefined + custom)
-    cursor.execute("""
-        SELECT ush.entry_id,
-               h.habit_id, 
-               h.habit_name, 
-               ush.custom_name, 
-               c.category_name, 
-               ush.date_added
-        FROM user_selected_habits ush
-        JOIN habits h ON ush.habit_id = h.habit_id
-        JOIN categories c ON h.category_id = c.category_id
-        WHERE ush.user_id = %s
-        ORDER BY ush.date_added DESC
-    """, (user_id,))
-    user_habits = cursor.fetchall()
+    # Show clicks that are still waiting in the write-behind buffer
+    if status_buffer:
+        buffered = status_buffer.pending_for(user_id, today)
+        for habit in habits_with_status:
+            habit["status"] = buffered.get(habit["habit_id"], habit["status"])
+
+    return render_template(
+        "my_habits.html",
+        username=session["username"],
+        habits=habits_with_status,
+        today=today.strftime("%d %B, %Y")
+    )
 
-    # STEP 2: Ensure today's records exist in daily_task_status
-    for habit in user_habits:
-        habit_id = habit["habit_id"]
 
-        cursor.execute("""
-            SELECT * FROM daily_task_status
-            WHERE user_id = %s AND habit_id = %s AND everyday_date = %s
-        """, (user_id, habit_id, today))
-        existing = cursor.fetchone()
-
-        if not existing:
-            cursor.execute("""
-                INSERT INTO daily_task_status (user_id, habit_id, everyday_date, status)
-                VALUES (%s, %s, %s, 'Pending')
-            """, (user_id, habit_id, today))
-            mysql.connection.commit()
-
-    # STEP 3: Fetch habits with today's daily status
+def load_today(cursor, user_id, today):
+    # Fetch habits with today's daily status (rows made by ensure_day_rows)
     cursor.execute("""
         SELECT h.habit_id,
                h.habit_name,
@@ -1206,16 +974,7 @@ def my_habits():
         WHERE ush.user_id = %s
         ORDER BY ush.date_added DESC
     """, (today, user_id))
-    habits_with_status = cursor.fetchall()
-
-    cursor.close()
-
-    return render_template(
-        "my_habits.html",
-        username=session["username"],
-        habits=habits_with_status,
-        today=today.strftime("%d %B, %Y")
-    )
+    return list(cursor.fetchall())
 
 # ---------------------------
 # Update Habit Status (AJAX)
@@ -1225,75 +984,277 @@ def update_habit_status():
     if "loggedin" not in session:
         return jsonify(success=False, message="Not logged in"), 401
 
-    data = request.get_json()
-    habit_id = data.get("habit_id")
+    data = request.get_json(silent=True) or {}
     status = data.get("status")
     user_id = session["user_id"]
 
-    cursor = mysql.connection.cursor()
-    cursor.execute("""
-        UPDATE daily_task_status
-        SET status = %s, marked_time = NOW()
-        WHERE user_id = %s AND habit_id = %s AND everyday_date = CURDATE()
-    """, (status, user_id, habit_id))
-    mysql.connection.commit()
+    try:
+        habit_id = int(data.get("habit_id"))
+    except (TypeError, ValueError):
+        return jsonify(success=False, message="Invalid habit_id"), 400
+    if status not in STATUSES:
+        return jsonify(success=False, message=f"Status must be one of {', '.join(STATUSES)}"), 400
+
+    cursor = db.connection.cursor()
+    if habit_id not in selected_habit_ids(cursor, user_id, [habit_id]):
+        cursor.close()
+        return jsonify(success=False, message="Habit is not in your habits"), 404
+
+    record_status_updates(cursor, [(user_id, habit_id, date.today(), status, datetime.now())])
     cursor.close()
 
     return jsonify(success=True, message=f"Status updated to {status}")
 
+# ---------------------------
+# Bulk Check-in (AJAX / offline sync)
+# ---------------------------
+# Body: {"updates": [{"habit_id": 3, "status": "Completed", "date": "2025-01-31"}, ...]}
+# "date" is optional and defaults to today. Valid items are written in one
+# transaction; the response carries a result per item, in request order.
+MAX_BATCH_UPDATES = 500
+
+@app.route("/update_habit_status/batch", methods=["POST"])
+def update_habit_status_batch():
+    if "loggedin" not in session:
+        return jsonify(success=False, message="Not logged in"), 401
+
+    data = request.get_json(silent=True)
+    items = data.get("updates") if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify(success=False, message="A non-empty list of updates is required"), 400
+    if len(items) > MAX_BATCH_UPDATES:
+        return jsonify(success=False, message=f"At most {MAX_BATCH_UPDATES} updates per request"), 400
+
+    user_id = session["user_id"]
+    today = date.today()
+    now = datetime.now()
+
+    # Validate the shape of every item first
+    results = []
+    valid = []
+    for index, item in enumerate(items):
+        result = {"index": index, "success": False}
+        results.append(result)
+
+        if not isinstance(item, dict):
+            result["message"] = "Update must be an object"
+            continue
+
+        try:
+            habit_id = int(item.get("habit_id"))
+        except (TypeError, ValueError):
+            result["message"] = "Invalid habit_id"
+            continue
+        result["habit_id"] = habit_id
+
+        status = item.get("status")
+        if status not in STATUSES:
+            result["message"] = f"Status must be one of {', '.join(STATUSES)}"
+            continue
+        result["status"] = status
+
+        day = parse_iso_date(item.get("date")) if item.get("date") else today
+        if not day:
+            result["message"] = "Invalid date (expected YYYY-MM-DD)"
+            continue
+        if day > today:
+            result["message"] = "Date cannot be in the future"
+            continue
+        result["date"] = day.isoformat()
+
+        valid.append((result, habit_id, day, status))
+
+    cursor = db.connection.cursor()
+
+    # Only habits the user has selected can be checked in
+    owned = selected_habit_ids(cursor, user_id, sorted({habit_id for _, habit_id, _, _ in valid}))
+
+    rows = []
+    for result, habit_id, day, status in valid:
+        if habit_id not in owned:
+            result["message"] = "Habit is not in your habits"
+            continue
+        rows.append((user_id, habit_id, day, status, now))
+        result["success"] = True
+
+    record_status_updates(cursor, rows)
+    cursor.close()
+
+    return jsonify(success=True, applied=len(rows), results=results)
+
 #----------------------------
 # My Stats (of habits)
 #----------------------------
 
 @app.route("/my_stats")
+@conditional_page
 def my_stats():
     if "loggedin" not in session:
         return redirect(url_for("login"))
 
     user_id = session["user_id"]
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+    start = parse_iso_date(request.args.get("start"))
+    end = parse_iso_date(request.args.get("end"))
+    page, per_page = parse_page_args(request.args)
 
-    # Get all distinct dates
-    cursor.execute("""
-        SELECT DISTINCT everyday_date FROM daily_task_status 
-        WHERE user_id=%s ORDER BY everyday_date DESC
-    """, (user_id,))
-    dates = cursor.fetchall()
+    # One grouped query for the visible window instead of 3 queries per date
+    cursor = db.connection.cursor("dict")
+    stats = daily_stats(cursor, user_id, start=start, end=end, page=page, per_page=per_page)
 
-    days = []
-    for d in dates:
-        date_val = d['everyday_date']
+    # Streaks come from the habit_streaks summary, no history scan
+    streaks = user_streaks(cursor, user_id, date.today())
+    cursor.close()
 
-        # Total habits
-        cursor.execute("""
-            SELECT COUNT(*) as total_habits FROM daily_task_status 
-            WHERE user_id=%s AND everyday_date=%s
-        """, (user_id, date_val))
-        total_habits = cursor.fetchone()['total_habits']
+    return render_template(
+        "my_stats.html",
+        days=stats["days"],
+        stats=stats,
+        streaks=streaks,
+        today=date.today()
+    )
 
-        # Completed habits
-        cursor.execute("""
-            SELECT COUNT(*) as completed_habits FROM daily_task_status 
-            WHERE user_id=%s AND everyday_date=%s AND status='Completed'
-        """, (user_id, date_val))
-        completed = cursor.fetchone()['completed_habits']
 
-        # Skipped habits
-        cursor.execute("""
-            SELECT COUNT(*) as skipped_habits FROM daily_task_status 
-            WHERE user_id=%s AND everyday_date=%s AND status='Skipped'
-        """, (user_id, date_val))
-        skipped = cursor.fetchone()['skipped_habits']
-
-        days.append({
-            "date": date_val,
-            "total_habits": total_habits,
-            "completed_habits": completed,
-            "skipped_habits": skipped
-        })
+MAX_SUMMARY_DAYS = 3660  # ~10 years per /api/stats/summary request
+
+
+def _json_dates(row):
+    return {key: value.isoformat() if isinstance(value, date) else value for key, value in row.items()}
+
+
+@app.route("/api/stats/summary")
+def stats_summary():
+    # Completion counts for a date range, read from the coarsest rollups
+    # that fit (a calendar year is 12 month rows).
+    if "loggedin" not in session:
+        return jsonify(success=False, message="Not logged in"), 401
 
+    end = parse_iso_date(request.args.get("end")) or date.today()
+    start = parse_iso_date(request.args.get("start")) or end - timedelta(days=29)
+    if start > end:
+        return jsonify(success=False, message="start must not be after end"), 400
+    if (end - start).days + 1 > MAX_SUMMARY_DAYS:
+        return jsonify(success=False, message=f"At most {MAX_SUMMARY_DAYS} days per request"), 400
+
+    user_id = session["user_id"]
+    cursor = db.connection.cursor("dict")
+    summary = period_stats(cursor, user_id, start, end)
+    categories = category_stats(cursor, user_id, start, end) if request.args.get("categories") == "1" else None
+    cursor.close()
+
+    response = {
+        "success": True,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "rows_read": summary["rows_read"],
+        "totals": summary["totals"],
+        "periods": [_json_dates(period) for period in summary["periods"]]
+    }
+    if categories is not None:
+        response["categories"] = categories
+    return jsonify(response)
+
+
+@app.route("/api/stats/analytics")
+def stats_analytics():
+    # Rolling completion rates, weekday heatmap, category ratios and
+    # consistency scores over the last `days` days (numpy, see analytics.py)
+    if "loggedin" not in session:
+        return jsonify(success=False, message="Not logged in"), 401
+
+    try:
+        days = int(request.args.get("days", 365))
+    except ValueError:
+        return jsonify(success=False, message="days must be a number"), 400
+    days = min(max(days, 1), MAX_SUMMARY_DAYS)
+
+    end = date.today()
+    cursor = db.connection.cursor()
+    history = load_history(cursor, session["user_id"], end - timedelta(days=days - 1), end)
+    cursor.close()
+
+    return jsonify(success=True, **analyze(history))
+
+
+@app.route("/api/stats/heatmap")
+def stats_heatmap():
+    # One uint8 per day of `year` (0-100 = completion %, 255 = no data).
+    # encoding=raw sends the bytes as they are, the start date travels in
+    # the X-Heatmap-Start header; encoding=base64 (default) wraps them in JSON.
+    if "loggedin" not in session:
+        return jsonify(success=False, message="Not logged in"), 401
+
+    try:
+        year = int(request.args.get("year", date.today().year))
+        date(year, 1, 1)
+    except ValueError:
+        return jsonify(success=False, message="Invalid year"), 400
+    encoding = request.args.get("encoding", "base64")
+    if encoding not in ("base64", "raw"):
+        return jsonify(success=False, message="encoding must be base64 or raw"), 400
+
+    cursor = db.connection.cursor("dict")
+    start, values = heatmap_year(cursor, session["user_id"], year)
+    cursor.close()
+
+    if encoding == "raw":
+        response = make_response(values)
+        response.mimetype = "application/octet-stream"
+        response.headers["X-Heatmap-Start"] = start.isoformat()
+    else:
+        response = jsonify(
+            success=True,
+            start=start.isoformat(),
+            days=len(values),
+            encoding="base64",
+            data=base64.b64encode(values).decode("ascii")
+        )
+
+    # Past years only change on back-fills, so they may be cached longer
+    max_age = 60 if year >= date.today().year else 3600
+    response.headers["Cache-Control"] = f"private, max-age={max_age}"
+    response.set_etag(hashlib.sha1(encoding.encode() + start.isoformat().encode() + values).hexdigest())
+    return response.make_conditional(request)
+
+
+#----------------------------
+# Habit history API
+#----------------------------
+
+@app.route("/api/history")
+def api_history():
+    # Keyset-paginated daily_task_status rows, newest first.
+    #   ?habit_id= &category_id= &status= &start= &end=   filters
+    #   ?limit=N&cursor=<next_cursor of the previous page>
+    #   ?format=ndjson   stream every matching row (from cursor on)
+    if "loggedin" not in session:
+        return jsonify(success=False, message="Not logged in"), 401
+
+    filters, after, limit, error = parse_history_args(request.args)
+    if error:
+        return jsonify(success=False, message=error), 400
+
+    user_id = session["user_id"]
+
+    if request.args.get("format") == "ndjson":
+        def generate():
+            cursor = db.connection.cursor("dict")
+            try:
+                for row in iter_history(cursor, user_id, filters, after):
+                    yield json.dumps(history_item(row)) + "\n"
+            finally:
+                cursor.close()
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    cursor = db.connection.cursor("dict")
+    rows, next_cursor = history_page(cursor, user_id, filters, after, limit)
     cursor.close()
-    return render_template("my_stats.html", days=days)
+
+    return jsonify(
+        success=True,
+        items=[history_item(row) for row in rows],
+        next_cursor=next_cursor
+    )
 
 
 
@@ -1310,7 +1271,7 @@ def edit_habit():
     habit_id = request.form["habit_id"]
     custom_name = request.form["custom_name"]
 
-    cursor = mysql.connection.cursor()
+    cursor = db.connection.cursor()
 
     # Check if the habit is already in user_selected_habits
     cursor.execute("""
@@ -1333,7 +1294,8 @@ def edit_habit():
             VALUES (%s, %s, CURDATE(), %s)
         """, (user_id, habit_id, custom_name))
 
-    mysql.connection.commit()
+    bump_generation(cursor, user_id)
+    db.connection.commit()
     cursor.close()
 
     flash("Habit edited and added successfully", "success")
@@ -1345,7 +1307,7 @@ def edit_habit():
 #----------------------------
 @app.route('/remove_habit/<int:habit_id>', methods=['POST'])
 def remove_habit(habit_id):
-    cursor = mysql.connection.cursor()
+    cursor = db.connection.cursor()
 
     # Step 1: Remove from user_selected_habits (always do this)
     cursor.execute("""
@@ -1364,9 +1326,13 @@ def remove_habit(habit_id):
     if habit and habit[0] == 1 and habit[1] == session['user_id']:  
         # habit[0] → is_custom (1 if custom)  
         # habit[1] → user_id (who created it)  
+        # The habit's history goes with it
+        days = habit_days(cursor, session['user_id'], habit_id)
         cursor.execute("DELETE FROM habits WHERE habit_id = %s", (habit_id,))
+        refresh_user_days(cursor, days, removed=True)
 
-    mysql.connection.commit()
+    bump_generation(cursor, session['user_id'])
+    db.connection.commit()
     cursor.close()
 
     flash("Habit removed successfully", "success")
@@ -1387,13 +1353,14 @@ def create_category():
     category_name = data["category_name"].strip()
     user_id = session["user_id"]
 
-    cursor = mysql.connection.cursor()
+    cursor = db.connection.cursor()
     cursor.execute("""
         INSERT INTO categories (category_name, is_custom, user_id)
         VALUES (%s, %s, %s)
     """, (category_name, True, user_id))
-    mysql.connection.commit()
     category_id = cursor.lastrowid
+    bump_generation(cursor, user_id)
+    db.connection.commit()
     cursor.close()
 
 
@@ -1407,22 +1374,35 @@ def create_category():
 # Route to open custom category page
 #----------------------------
 @app.route("/custom_category/<int:category_id>")
+@conditional_page
 def open_custom_category(category_id):
     if "loggedin" not in session:
         return redirect(url_for("login"))
 
     user_id = session["user_id"]
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+    cursor = db.connection.cursor("dict")
+    view = cached_view(cursor, user_id, "custom_category", (category_id,),
+                       lambda: load_custom_category(cursor, user_id, category_id))
+    cursor.close()
+
+    if not view:
+        return "Category not found or not authorized"
+
+    return render_template("custom_category.html",
+                           category=view["category"],
+                           habits=view["habits"],
+                           username=session["username"])
 
+
+def load_custom_category(cursor, user_id, category_id):
     # Verify category belongs to user
     cursor.execute("""
-        SELECT * FROM categories 
+        SELECT category_id, category_name, is_custom, user_id FROM categories 
         WHERE category_id=%s AND user_id=%s AND is_custom=1
     """, (category_id, user_id))
     category = cursor.fetchone()
     if not category:
-        cursor.close()
-        return "Category not found or not authorized"
+        return None
 
     # Fetch habits of this category
     cursor.execute("""
@@ -1432,16 +1412,12 @@ def open_custom_category(category_id):
             ON h.habit_id = ush.habit_id AND ush.user_id = %s
         WHERE h.category_id = %s
     """, (user_id, category_id))
-    habits = cursor.fetchall()
-    cursor.close()
+    habits = list(cursor.fetchall())
 
     for habit in habits:
         habit["display_name"] = habit["custom_name"] if habit["custom_name"] else habit["habit_name"]
 
-    return render_template("custom_category.html",
-                           category=category,
-                           habits=habits,
-                           username=session["username"])
+    return {"category": category, "habits": habits}
 
 
 #----------------------------
@@ -1455,14 +1431,14 @@ def add_custom_category_habit(category_id):
     user_id = session["user_id"]
     habit_name = request.form["habit_name"]
 
-    cursor = mysql.connection.cursor()
+    cursor = db.connection.cursor()
 
     # Insert into habits
     cursor.execute("""
         INSERT INTO habits (category_id, user_id, habit_name, is_custom, is_active, created_at)
         VALUES (%s, %s, %s, %s, %s, NOW())
     """, (category_id, user_id, habit_name, True, True))
-    mysql.connection.commit()
+    db.connection.commit()
     habit_id = cursor.lastrowid
 
     # Insert into user_selected_habits
@@ -1470,7 +1446,8 @@ def add_custom_category_habit(category_id):
         INSERT INTO user_selected_habits (user_id, habit_id, date_added, custom_name)
         VALUES (%s, %s, CURDATE(), %s)
     """, (user_id, habit_id, habit_name))
-    mysql.connection.commit()
+    bump_generation(cursor, user_id)
+    db.connection.commit()
 
     cursor.close()
     flash("Habit added successfully", "success")
@@ -1487,7 +1464,7 @@ def remove_custom_habit(category_id, habit_id):
         return redirect(url_for("login"))
 
     user_id = session["user_id"]
-    cursor = mysql.connection.cursor()
+    cursor = db.connection.cursor()
 
     # Verify habit belongs to user & category
     cursor.execute("""
@@ -1501,6 +1478,9 @@ def remove_custom_habit(category_id, habit_id):
         flash("Habit not found or unauthorized", "error")
         return redirect(url_for("open_custom_category", category_id=category_id))
 
+    # The habit's history goes with it
+    days = habit_days(cursor, user_id, habit_id)
+
     # Delete from user_selected_habits
     cursor.execute("""
         DELETE FROM user_selected_habits 
@@ -1513,7 +1493,10 @@ def remove_custom_habit(category_id, habit_id):
         WHERE habit_id=%s AND user_id=%s
     """, (habit_id, user_id))
 
-    mysql.connection.commit()
+    refresh_user_days(cursor, days, removed=True)
+
+    bump_generation(cursor, user_id)
+    db.connection.commit()
     cursor.close()
 
     flash("Habit removed successfully", "success")
@@ -1525,12 +1508,13 @@ def remove_custom_habit(category_id, habit_id):
 #----------------------------
 
 @app.route("/profile")
+@conditional_page
 def profile():
     if "loggedin" not in session:
         return redirect(url_for("login"))
 
     user_id = session["user_id"]
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+    cursor = db.connection.cursor("dict")
     cursor.execute("SELECT username, first_name, last_name, mobile, dob, email FROM users WHERE user_id=%s", (user_id,))
     user = cursor.fetchone()
     cursor.close()
@@ -1541,6 +1525,60 @@ def profile():
     return render_template("profile.html", user=user, errors=errors, current_date=current_date)
 
 
+@app.route("/profile/export")
+def export_data():
+    # Download all of the user's habit data as CSV or NDJSON (?gzip=1).
+    # The body is generated while it is being sent; see export.py.
+    if "loggedin" not in session:
+        return redirect(url_for("login"))
+
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        flash("Unknown export format", "error")
+        return redirect(url_for("profile"))
+    gzip = request.args.get("gzip") == "1"
+
+    filename = f"track-it-{session['username']}-{date.today().isoformat()}.{fmt}"
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    if gzip:
+        filename += ".gz"
+        mimetype = "application/gzip"
+
+    body = export_stream(db.connection, session["user_id"], fmt, gzip=gzip)
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@app.route("/profile/import", methods=["POST"])
+def import_data():
+    # Import check-ins from another tracker (CSV with date, habit, status
+    # and optionally category columns); see importer.py.
+    if "loggedin" not in session:
+        return redirect(url_for("login"))
+
+    upload = request.files.get("file")
+    if not upload or not upload.filename:
+        flash("Choose a CSV file to import", "error")
+        return redirect(url_for("profile"))
+
+    lines = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+    try:
+        summary = import_csv(db.connection, session["user_id"], lines, catalog_cache.get())
+    except (CSVImportError, UnicodeDecodeError) as e:
+        flash(f"Import failed: {e}", "error")
+        return redirect(url_for("profile"))
+
+    flash(
+        f"Imported {summary['imported']} of {summary['rows']} row(s), "
+        f"{summary['habits_created']} new habit(s)"
+        + (f"; skipped {summary['skipped']} ({'; '.join(summary['errors'][:3])})" if summary["skipped"] else ""),
+        "success" if summary["imported"] else "error"
+    )
+    return redirect(url_for("profile"))
+
+
 @app.route("/update_profile", methods=["POST"])
 def update_profile():
     if "loggedin" not in session:
@@ -1602,7 +1640,7 @@ def update_profile():
                 
     # If validation fails — return profile page with errors
     if errors:
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        cursor = db.connection.cursor("dict")
         cursor.execute("SELECT username, first_name, last_name, mobile, dob, email FROM users WHERE user_id=%s", (user_id,))
         user = cursor.fetchone()
         cursor.close()
@@ -1612,13 +1650,14 @@ def update_profile():
 
 
     # If everything is fine — update DB
-    cursor = mysql.connection.cursor()
+    cursor = db.connection.cursor()
     cursor.execute("""
         UPDATE users 
         SET first_name=%s, last_name=%s, mobile=%s, dob=%s, email=%s 
         WHERE user_id=%s
     """, (first_name, last_name, mobile, dob, email, user_id))
-    mysql.connection.commit()
+    bump_generation(cursor, user_id)
+    db.connection.commit()
     cursor.close()
 
     flash("Profile updated successfully", "success")
@@ -1648,6 +1687,54 @@ def update_profile():
             errors["email"] = "Username part cannot have all repeated characters"
 
 
+#----------------------------
+# Admin: connection pool metrics
+#----------------------------
+def is_admin():
+    return "loggedin" in session and session.get("username") in app.config["ADMIN_USERNAMES"]
+
+
+@app.route("/admin/pool_stats")
+def pool_stats():
+    if not is_admin():
+        return jsonify(success=False, message="Not authorized"), 403
+
+    return jsonify(db.pool.stats())
+
+
+@app.route("/admin/write_behind_stats")
+def write_behind_stats():
+    if not is_admin():
+        return jsonify(success=False, message="Not authorized"), 403
+
+    return jsonify(status_buffer.stats() if status_buffer else {"enabled": False})
+
+
+@app.route("/metrics")
+def metrics():
+    # Prometheus text format. Admins can open it in the browser; a scraper
+    # sends "Authorization: Bearer <METRICS_TOKEN>".
+    token = app.config["METRICS_TOKEN"]
+    authorized = is_admin() or (token and hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}"))
+    if not authorized:
+        return jsonify(success=False, message="Not authorized"), 403
+
+    gauges = {
+        "db_pool": db.pool.stats(),
+        "catalog_cache": {"hits": catalog_cache.hits, "loads": catalog_cache.loads},
+        "password_hasher": password_hasher.stats(),
+        "username_availability": dict(username_availability.stats(), throttled=username_check_limiter.limited)
+    }
+    if status_buffer:
+        gauges["write_behind"] = status_buffer.stats()
+    if view_cache:
+        gauges["view_cache"] = view_cache.stats()
+
+    body = render_prometheus(instrumentation.metrics, gauges)
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+
 #----------------------------
 # About Us
 #----------------------------
@@ -1666,6 +1753,200 @@ def logout():
     session.clear()
     return redirect(url_for("home"))
 
+# ============================================================
+# CLI COMMANDS
+# ============================================================
+
+def run_daily_materializer(day, chunk_size):
+    connection = db.connection
+
+    # Yesterday's leftovers become Missed before today's rows are created
+    missed = mark_missed(connection, day - timedelta(days=1), chunk_size)
+    click.echo(f"{day - timedelta(days=1)}: {missed} Pending row(s) marked Missed")
+
+    def report(chunks, last_key, inserted):
+        click.echo(f"{day}: chunk {chunks} done (entry_id <= {last_key}, {inserted} row(s) created)")
+
+    inserted, chunks = materialize_day(connection, day, chunk_size, progress=report)
+    click.echo(f"{day}: {inserted} Pending row(s) created in {chunks} chunk(s)")
+
+
+@app.cli.command("materialize-daily")
+@click.option("--date", "run_date", default=None, help="Day to materialize (YYYY-MM-DD). Defaults to today.")
+@click.option("--chunk-size", default=DEFAULT_CHUNK_SIZE, show_default=True, help="user_selected_habits entries per transaction.")
+@click.option("--loop", is_flag=True, help="Keep running and repeat shortly after every midnight.")
+def materialize_daily_command(run_date, chunk_size, loop):
+    """Pre-create today's Pending rows and mark yesterday's leftovers Missed."""
+    day = parse_iso_date(run_date) if run_date else date.today()
+    if run_date and not day:
+        raise click.BadParameter("expected YYYY-MM-DD", param_hint="--date")
+
+    run_daily_materializer(day, chunk_size)
+
+    while loop:
+        # Sleep until a minute past the next midnight, then run in a fresh
+        # app context so we never hold one connection for a whole day.
+        tomorrow = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+        time.sleep(max((tomorrow - datetime.now()).total_seconds() + 60, 1))
+        with app.app_context():
+            run_daily_materializer(date.today(), chunk_size)
+
+
+@app.cli.command("import-history")
+@click.argument("csv_file", type=click.File("r", encoding="utf-8-sig"))
+@click.option("--user", "username", required=True, help="Username to import into.")
+@click.option("--chunk-size", default=DEFAULT_IMPORT_CHUNK, show_default=True, help="Rows per transaction.")
+def import_history_command(csv_file, username, chunk_size):
+    """Import a CSV of habit check-ins for one user."""
+    cursor = db.connection.cursor()
+    cursor.execute("SELECT user_id FROM users WHERE username = %s", (username,))
+    row = cursor.fetchone()
+    cursor.close()
+    if not row:
+        raise click.BadParameter(f"no such user: {username}", param_hint="--user")
+
+    def report(rows, imported):
+        click.echo(f"{rows} row(s) read, {imported} imported")
+
+    started = time.perf_counter()
+    try:
+        summary = import_csv(db.connection, row[0], csv_file, catalog_cache.get(),
+                             chunk_size=chunk_size, progress=report)
+    except CSVImportError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(
+        f"Done in {time.perf_counter() - started:.1f}s: {summary['imported']} imported, "
+        f"{summary['skipped']} skipped, {summary['habits_created']} habit(s) and "
+        f"{summary['categories_created']} category(ies) created"
+    )
+    for error in summary["errors"]:
+        click.echo(error, err=True)
+
+
+@app.cli.group("db")
+def db_cli():
+    """Database schema commands."""
+
+
+@db_cli.command("init")
+def db_init_command():
+    """Create/upgrade all tables and seed the default catalog."""
+    applied = upgrade(db.connection, echo=click.echo)
+    seed_default_habits()
+    click.echo(f"Schema at version {LATEST_VERSION} ({len(applied)} migration(s) applied), default habits seeded")
+
+
+@db_cli.command("seed")
+def db_seed_command():
+    """Insert any missing default categories and habits."""
+    seed_default_habits()
+    click.echo("Default categories & habits seeded")
+
+
+@db_cli.command("upgrade")
+def db_upgrade_command():
+    """Apply pending schema migrations."""
+    applied = upgrade(db.connection, echo=click.echo)
+    if not applied:
+        click.echo(f"Schema already at version {LATEST_VERSION}")
+
+
+@db_cli.command("version")
+def db_version_command():
+    """Show the applied and the latest schema version."""
+    cursor = db.connection.cursor()
+    click.echo(f"applied: {current_version(cursor)}, latest: {LATEST_VERSION}")
+    cursor.close()
+
+
+@db_cli.command("check-plans")
+def db_check_plans_command():
+    """EXPLAIN the hot queries and fail on full table scans."""
+    problems = check_query_plans(db.connection)
+    for problem in problems:
+        click.echo(problem, err=True)
+    if problems:
+        raise SystemExit(1)
+    click.echo("All hot queries use an index")
+
+
+@app.cli.group("assets")
+def assets_cli():
+    """Static asset bundle commands."""
+
+
+@assets_cli.command("build")
+def assets_build_command():
+    """Build the fingerprinted bundles and list them."""
+    for name, filename in assets.build().items():
+        click.echo(f"{name:20} {filename}")
+    if assets.missing:
+        raise click.ClickException("Vendor assets missing: " + ", ".join(sorted(assets.missing.values()))
+                                   + " (run `flask assets vendor`)")
+
+
+@assets_cli.command("vendor")
+@click.option("--source", default=None,
+              help="Mirror URL with the CDN's layout, or a local folder / npm tarball holding the files "
+                   "(default: the public CDN).")
+def assets_vendor_command(source):
+    """Copy pinned third-party assets (Bootstrap) into static/vendor."""
+    if source and not source.startswith(("http://", "https://")) and not os.path.exists(source):
+        raise click.BadParameter(f"{source} does not exist", param_hint="--source")
+    try:
+        fetched = assets.vendor(source, echo=click.echo)
+    except (OSError, ValueError) as e:
+        raise click.ClickException(str(e))
+    assets.build()
+    click.echo(f"{len(fetched)} file(s) vendored" if fetched else "All vendor files present")
+
+
+@app.cli.group("stats")
+def stats_cli():
+    """Maintenance of derived stats tables."""
+
+
+@stats_cli.command("rebuild-streaks")
+@click.option("--user", "user_id", type=int, default=None, help="Only rebuild this user_id.")
+def rebuild_streaks_command(user_id):
+    """Recompute habit_streaks from daily_task_status."""
+    cursor = db.connection.cursor()
+    if user_id:
+        count = rebuild_streaks(cursor, user_id)
+        bump_generation(cursor, user_id)
+        click.echo(f"user {user_id}: {count} habit streak(s) rebuilt")
+    else:
+        def report(done, total):
+            if done % 100 == 0 or done == total:
+                click.echo(f"{done}/{total} users")
+                db.connection.commit()
+        rebuild_all_streaks(cursor, progress=report)
+        bump_all_generations(cursor)
+    db.connection.commit()
+    cursor.close()
+
+
+@stats_cli.command("rebuild-rollups")
+@click.option("--user", "user_id", type=int, default=None, help="Only rebuild this user_id.")
+def rebuild_rollups_command(user_id):
+    """Recompute the day/week/month stats rollups from daily_task_status."""
+    cursor = db.connection.cursor()
+    if user_id:
+        days = rebuild_rollups(cursor, user_id)
+        bump_generation(cursor, user_id)
+        click.echo(f"user {user_id}: {days} day(s) rolled up")
+    else:
+        def report(done, total):
+            if done % 100 == 0 or done == total:
+                click.echo(f"{done}/{total} users")
+                db.connection.commit()
+        rebuild_all_rollups(cursor, progress=report)
+        bump_all_generations(cursor)
+    db.connection.commit()
+    cursor.close()
+
+
 # ============================================================
 # RUN APP
 # ============================================================
@@ -0,0 +1,234 @@
+import base64
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import tarfile
+import urllib.request
+
+from flask import abort, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:    # gzip variants only
+    brotli = None
+
+# ============================================================
+# STATIC ASSET BUNDLES
+# ============================================================
+# Page CSS / JS lives in static/css and static/js. At startup the files
+# of each bundle below are concatenated into ASSETS_BUILD_DIR as
+# "<name>.<content hash>.<ext>", next to precompressed .gz (and .br when
+# the Brotli package is installed) copies. Templates link them with
+# asset_url("dashboard.css"); since a changed file gets a new name, they
+# are served with a one-year "immutable" Cache-Control and browsers only
+# download them again after a deploy that changes them.
+#
+# Third-party files (Bootstrap) are served the same way, never from a
+# CDN. `flask assets vendor` copies them once into static/vendor, pinned
+# by their subresource-integrity hash; that is a required deploy step
+# and `flask assets build` fails while any of them is missing. The
+# source is the public CDN, a mirror with the same layout or, without
+# network access, a local folder or npm tarball holding the files.
+
+BUNDLES = {
+    "base.css": ["css/base.css"],
+    "base.js": ["js/base.js"],
+    "about_us.css": ["css/about_us.css"],
+    "predefined_category.css": ["css/category.css"],
+    "predefined_category.js": ["js/predefined_category.js"],
+    "custom_category.css": ["css/category.css", "css/custom_category.css"],
+    "custom_category.js": ["js/custom_category.js"],
+    "dashboard.css": ["css/dashboard.css"],
+    "dashboard.js": ["js/dashboard.js"],
+    "my_habits.css": ["css/my_habits.css"],
+    "my_habits.js": ["js/my_habits.js"],
+    "my_stats.css": ["css/my_stats.css"],
+    "my_stats.js": ["js/stats_analytics.js", "js/stats_heatmap.js"],
+    "profile.css": ["css/profile.css"],
+    "profile.js": ["js/profile.js"],
+    "login.css": ["css/login.css"],
+    "create_account.css": ["css/create_account.css"],
+    "create_account.js": ["js/create_account.js"],
+    "bootstrap.css": ["vendor/bootstrap/bootstrap.min.css"],
+    "bootstrap.js": ["vendor/bootstrap/bootstrap.bundle.min.js"],
+}
+
+VENDOR_MIRROR = "https://cdn.jsdelivr.net/npm"
+
+# static path -> (npm package path, SRI hash)
+VENDOR = {
+    "vendor/bootstrap/bootstrap.min.css": (
+        "bootstrap@5.3.0/dist/css/bootstrap.min.css",
+        "sha384-9ndCyUaIbzAi2FUVXJi0CjmCapSmO7SnpJef0486qhLnuZ2cdeRhO02iuK6FUUVM"
+    ),
+    "vendor/bootstrap/bootstrap.bundle.min.js": (
+        "bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js",
+        "sha384-geWF76RCwLtnZ8qwWowPQNguL3RmwHVBC9FhGdlKrxdiJJigb/j/68SIy3Te4Bkz"
+    ),
+}
+
+# The maps are not shipped; the comment would only produce 404s
+_SOURCE_MAP = re.compile(rb"^\s*(/\*# sourceMappingURL=.*?\*/|//# sourceMappingURL=\S+)\s*$", re.MULTILINE)
+
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _write_atomic(path, data):
+    # Workers starting together may build the same file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def sri_hash(data):
+    return "sha384-" + base64.b64encode(hashlib.sha384(data).digest()).decode("ascii")
+
+
+def _local_candidates(source, filename):
+    # Contents of every file called `filename` in a folder (an unpacked
+    # npm package, Bootstrap's dist zip, ...) or an npm tarball
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            if filename in files:
+                with open(os.path.join(root, filename), "rb") as f:
+                    yield f.read()
+        return
+    with tarfile.open(source) as archive:
+        for member in archive.getmembers():
+            if member.isfile() and os.path.basename(member.name) == filename:
+                yield archive.extractfile(member).read()
+
+
+class Assets:
+    def __init__(self, app=None):
+        self.manifest = {}     # bundle name -> built file name
+        self.encodings = {}    # built file name -> {"br": ".br", ...}
+        self.missing = {}      # bundle name -> static path of a vendor file not fetched yet
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("ASSETS_BUILD_DIR", os.path.join(app.instance_path, "assets"))
+        app.config.setdefault("ASSETS_URL_PATH", "/assets")
+        app.config.setdefault("ASSETS_MAX_AGE", 365 * 24 * 3600)
+
+        self.app = app
+        self.source_dir = app.static_folder
+        self.build_dir = app.config["ASSETS_BUILD_DIR"]
+        self.max_age = app.config["ASSETS_MAX_AGE"]
+        self.build()
+        if self.missing:
+            app.logger.error("Vendor assets missing, pages will lack them: %s (run `flask assets vendor`)",
+                             ", ".join(sorted(self.missing.values())))
+
+        app.add_url_rule(f"{app.config['ASSETS_URL_PATH']}/<path:filename>", endpoint="assets", view_func=self.serve)
+        app.jinja_env.globals["asset_url"] = self.url
+
+    # ---------------------------
+    # building
+    # ---------------------------
+    def _bundle_content(self, name, sources):
+        parts = []
+        for source in sources:
+            path = os.path.join(self.source_dir, source)
+            if not os.path.exists(path):
+                if source in VENDOR and len(sources) == 1:
+                    return None
+                raise FileNotFoundError(f"Asset bundle {name!r}: {path} is missing")
+            with open(path, "rb") as f:
+                parts.append(_SOURCE_MAP.sub(b"", f.read()).rstrip() + b"\n")
+        return b"\n".join(parts)
+
+    def build(self):
+        os.makedirs(self.build_dir, exist_ok=True)
+        manifest, encodings, missing = {}, {}, {}
+        for name, sources in BUNDLES.items():
+            content = self._bundle_content(name, sources)
+            if content is None:
+                missing[name] = sources[0]
+                continue
+
+            stem, ext = os.path.splitext(name)
+            filename = f"{stem}.{hashlib.sha256(content).hexdigest()[:16]}{ext}"
+            path = os.path.join(self.build_dir, filename)
+            # Content-addressed: an existing file is already right
+            if not os.path.exists(path):
+                _write_atomic(path, content)
+            if not os.path.exists(path + ".gz"):
+                # mtime=0: the same input always gives the same bytes
+                _write_atomic(path + ".gz", gzip.compress(content, 9, mtime=0))
+            if brotli is not None and not os.path.exists(path + ".br"):
+                _write_atomic(path + ".br", brotli.compress(content, quality=11))
+
+            manifest[name] = filename
+            encodings[filename] = {
+                encoding: suffix for encoding, suffix in ENCODINGS
+                if os.path.exists(path + suffix) and os.path.getsize(path + suffix) < len(content)
+            }
+        self.manifest, self.encodings, self.missing = manifest, encodings, missing
+        return manifest
+
+    def vendor(self, source=None, echo=print):
+        # Copy third-party files into static/vendor from `source`: a mirror
+        # URL (default: the public CDN), a local folder or an npm tarball.
+        # Anything whose hash differs from the pinned one is refused.
+        source = source or VENDOR_MIRROR
+        remote = source.startswith(("http://", "https://"))
+        fetched = []
+        for static_path, (package_path, integrity) in VENDOR.items():
+            path = os.path.join(self.source_dir, static_path)
+            if os.path.exists(path):
+                continue
+            if remote:
+                origin = f"{source.rstrip('/')}/{package_path}"
+                with urllib.request.urlopen(origin, timeout=30) as response:
+                    data = response.read()
+                if sri_hash(data) != integrity:
+                    raise ValueError(f"{origin} does not match {integrity}")
+            else:
+                origin = source
+                try:
+                    data = next((candidate for candidate in _local_candidates(source, os.path.basename(package_path))
+                                 if sri_hash(candidate) == integrity), None)
+                except tarfile.TarError:
+                    raise ValueError(f"{source} is neither a folder nor a readable tarball")
+                if data is None:
+                    raise ValueError(f"No {package_path} matching {integrity} in {source}")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_atomic(path, data)
+            echo(f"{static_path} <- {origin}")
+            fetched.append(static_path)
+        return fetched
+
+    # ---------------------------
+    # serving
+    # ---------------------------
+    def url(self, name):
+        filename = self.manifest.get(name)
+        if filename is None:
+            # Not vendored: where `flask assets vendor` will put it
+            return url_for("static", filename=self.missing[name])
+        return url_for("assets", filename=filename)
+
+    def serve(self, filename):
+        encodings = self.encodings.get(filename)
+        if encodings is None:
+            abort(404)
+
+        served, content_encoding = filename, None
+        for encoding, suffix in ENCODINGS:
+            if encoding in encodings and request.accept_encodings[encoding]:
+                served, content_encoding = filename + suffix, encoding
+                break
+
+        response = send_from_directory(self.build_dir, served, mimetype=mimetypes.guess_type(filename)[0],
+                                       max_age=self.max_age)
+        if content_encoding:
+            response.headers["Content-Encoding"] = content_encoding
+        response.vary.add("Accept-Encoding")
+        response.cache_control.immutable = True
+        return response
@@ -0,0 +1,236 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+# ============================================================
+# USERNAME AVAILABILITY
+# ============================================================
+# /check_username is called on every keystroke of the sign-up form.
+# Each worker keeps every taken username in a Bloom filter:
+#   not in the filter   -> certainly free, answered from memory
+#   in the filter       -> probably taken; confirmed with an indexed
+#                          existence query, the answer is kept in a
+#                          small LRU so repeated keystrokes do not
+#                          query again
+#
+# The filter is filled once from users and then refreshed
+# incrementally: accounts created by this worker are added right away,
+# accounts created elsewhere are picked up by loading user_id > last
+# seen (at most every `refresh_interval` seconds, and always before
+# create_account decides). Usernames are compared case-insensitively,
+# like MySQL's default collation does; SQLite is told to (NOCASE).
+
+USERNAME_TAKEN_SQL = {
+    "mysql": "SELECT 1 FROM users WHERE username = %s LIMIT 1",
+    "sqlite": "SELECT 1 FROM users WHERE username = %s COLLATE NOCASE LIMIT 1",
+}
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing over one 128-bit digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key, count=True):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        if count:
+            self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class UsernameAvailability:
+    def __init__(self, connection, capacity=100000, error_rate=0.01, lru_size=2048, refresh_interval=60):
+        self._connection = connection    # callable returning the request's DB connection
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.lru_size = lru_size
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()    # one load at a time; lookups keep using the filter
+        self._filter = None
+        self._last_user_id = 0
+        self._refreshed_at = 0.0
+        self._recent = OrderedDict()     # lowercased username -> taken (bool)
+
+        # metrics
+        self.checks = 0
+        self.filter_negatives = 0
+        self.lru_hits = 0
+        self.db_lookups = 0
+        self.false_positives = 0
+        self.loaded_rows = 0
+        self.rebuilds = 0
+
+    # ---------------------------
+    # filter maintenance
+    # ---------------------------
+    def _load_new(self, rebuild=False):
+        started = time.monotonic()
+        cursor = self._connection().cursor()
+        after = 0 if rebuild else self._last_user_id
+        cursor.execute("""
+            SELECT user_id, username FROM users
+            WHERE user_id > %s
+            ORDER BY user_id
+        """, (after,))
+        rows = cursor.fetchall()
+        cursor.close()
+
+        with self._lock:
+            if rebuild:
+                # Sized for twice the accounts we have, so it stays accurate for a while
+                capacity = max(self.capacity, 2 * len(rows))
+                self._filter = BloomFilter(capacity, self.error_rate)
+                self._recent.clear()
+                self.rebuilds += 1
+            for user_id, username in rows:
+                if username:
+                    name = username.lower()
+                    self._filter.add(name)
+                    if name in self._recent:
+                        self._recent[name] = True
+                self._last_user_id = max(self._last_user_id, user_id)
+            self.loaded_rows += len(rows)
+            self._refreshed_at = started
+
+    def _pending_load(self, force, since):
+        # "rebuild", "load" or None. `since` is when the caller looked: a
+        # load that started reading after that already covers a forced refresh.
+        if self._filter is None or self._filter.count > self._filter.capacity:
+            return "rebuild"
+        if force and self._refreshed_at <= since:
+            return "load"
+        if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            return "load"
+        return None
+
+    def refresh(self, force=False):
+        since = time.monotonic()
+        if self._pending_load(force, since) is None:
+            return
+        with self._refresh_lock:
+            # Another thread may have loaded while this one waited
+            pending = self._pending_load(force, since)
+            if pending is not None:
+                self._load_new(rebuild=pending == "rebuild")
+
+    def add(self, username):
+        # Account created by this worker. Not counted: its row is counted
+        # when the next incremental load reads it.
+        name = username.lower()
+        self.refresh()
+        with self._lock:
+            self._filter.add(name, count=False)
+            self._remember(name, True)
+
+    def _remember(self, name, taken):
+        self._recent[name] = taken
+        self._recent.move_to_end(name)
+        while len(self._recent) > self.lru_size:
+            self._recent.popitem(last=False)
+
+    # ---------------------------
+    # lookups
+    # ---------------------------
+    def is_taken(self, username, fresh=False):
+        # fresh=True first loads accounts created since the last refresh
+        # (create_account: the answer must not lag behind other workers)
+        name = username.lower()
+        self.refresh(force=fresh)
+
+        with self._lock:
+            self.checks += 1
+            if name not in self._filter:
+                self.filter_negatives += 1
+                return False
+            if name in self._recent:
+                self.lru_hits += 1
+                self._recent.move_to_end(name)
+                return self._recent[name]
+
+        connection = self._connection()
+        cursor = connection.cursor()
+        cursor.execute(USERNAME_TAKEN_SQL[connection.dialect], (name,))
+        taken = cursor.fetchone() is not None
+        cursor.close()
+
+        with self._lock:
+            self.db_lookups += 1
+            if not taken:
+                self.false_positives += 1
+            self._remember(name, taken)
+        return taken
+
+    def stats(self):
+        with self._lock:
+            bloom = self._filter
+            return {
+                "names": bloom.count if bloom else 0,
+                "filter_capacity": bloom.capacity if bloom else self.capacity,
+                "filter_bytes": len(bloom.bits) if bloom else 0,
+                "lru_entries": len(self._recent),
+                "checks": self.checks,
+                "filter_negatives": self.filter_negatives,
+                "lru_hits": self.lru_hits,
+                "db_lookups": self.db_lookups,
+                "false_positives": self.false_positives,
+                "loaded_rows": self.loaded_rows,
+                "rebuilds": self.rebuilds
+            }
+
+
+# ============================================================
+# PER-CLIENT THROTTLING
+# ============================================================
+# Token bucket per client key (the remote address): `rate` requests per
+# second on average, bursts of up to `burst`. Only the most recently
+# seen `max_clients` keys are tracked.
+
+class RateLimiter:
+    def __init__(self, rate=5.0, burst=20, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()    # key -> [tokens, last refill]
+        self.limited = 0
+
+    def allow(self, key):
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now]
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] < 1:
+                self.limited += 1
+                return False
+            bucket[0] -= 1
+            return True
+
+    def retry_after(self):
+        # Whole seconds until one token is back
+        return max(1, math.ceil(1 / self.rate))
@@ -0,0 +1,224 @@
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import click
+import numpy as np
+
+from app import app, catalog_cache, db, instrumentation
+from instrumentation import Metrics
+
+from bench.seed import PASSWORD
+
+# ============================================================
+# BENCHMARK RUNNER
+# ============================================================
+# Drives the real routes through the Flask test client: every virtual
+# user logs in as one of the seeded bench_* accounts and repeats a
+# scenario (my_habits, status click, my_stats, a category page,
+# dashboard). Latencies are measured around each call; SQL statements
+# per request come from the instrumentation layer (instrumentation.py).
+#
+# Results go to bench/results/<timestamp>-<commit>.json. With
+# --baseline an earlier result file is compared route by route and the
+# run fails when a p95 got slower than --max-regression.
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_accounts(limit):
+    # Seeded usernames with their selected habit ids
+    with app.app_context():
+        cursor = db.connection.cursor()
+        cursor.execute("""
+            SELECT u.username, ush.habit_id
+            FROM users u
+            JOIN user_selected_habits ush ON ush.user_id = u.user_id
+            WHERE u.username LIKE 'bench!_%' ESCAPE '!'
+            ORDER BY u.username
+        """)
+        accounts = {}
+        for username, habit_id in cursor.fetchall():
+            accounts.setdefault(username, []).append(habit_id)
+        cursor.close()
+        slugs = [category["slug"] for category in catalog_cache.get().categories]
+    return list(accounts.items())[:limit], slugs
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}   # label -> [seconds]
+        self.errors = {}      # label -> count
+
+    def call(self, label, send, expected=(200, 302)):
+        started = time.perf_counter()
+        response = send()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.latencies.setdefault(label, []).append(elapsed)
+            if response.status_code not in expected:
+                self.errors[label] = self.errors.get(label, 0) + 1
+        return response
+
+
+def virtual_user(recorder, username, habit_ids, slugs, iterations, seed):
+    rng = random.Random(seed)
+    client = app.test_client()
+    recorder.call("POST /login", lambda: client.post(
+        "/login", data={"email_or_username": username, "password": PASSWORD}))
+
+    for _ in range(iterations):
+        recorder.call("GET /my_habits", lambda: client.get("/my_habits"))
+        habit_id = rng.choice(habit_ids)
+        status = rng.choice(["Completed", "Skipped", "Missed", "Pending"])
+        recorder.call("POST /update_habit_status", lambda: client.post(
+            "/update_habit_status", json={"habit_id": habit_id, "status": status}))
+        recorder.call("GET /my_stats", lambda: client.get("/my_stats"))
+        slug = rng.choice(slugs)
+        recorder.call("GET /category/<slug>", lambda: client.get(f"/category/{slug}"))
+        recorder.call("GET /dashboard", lambda: client.get("/dashboard"))
+
+
+def summarize(recorder, metrics, wall, meta):
+    snapshot = metrics.snapshot()
+    routes = {}
+    for label, samples in sorted(recorder.latencies.items()):
+        values = np.array(samples) * 1000
+        routes[label] = {
+            "count": len(samples),
+            "errors": recorder.errors.get(label, 0),
+            "mean_ms": round(float(values.mean()), 3),
+            "p50_ms": round(float(np.percentile(values, 50)), 3),
+            "p95_ms": round(float(np.percentile(values, 95)), 3),
+            "p99_ms": round(float(np.percentile(values, 99)), 3)
+        }
+
+    # Per endpoint SQL numbers from the instrumentation histograms
+    endpoints = {}
+    for endpoint, histogram in snapshot["sql_queries"].items():
+        count = histogram.total or 1
+        endpoints[endpoint] = {
+            "requests": histogram.total,
+            "queries_per_request": round(histogram.sum / count, 2),
+            "sql_ms_per_request": round(snapshot["sql_seconds"][endpoint].sum * 1000 / count, 3),
+            "rows_per_request": round(snapshot["rows_fetched"][endpoint].sum / count, 1)
+        }
+
+    total = sum(route["count"] for route in routes.values())
+    meta.update(
+        total_requests=total,
+        wall_seconds=round(wall, 3),
+        throughput_rps=round(total / wall, 1) if wall else None,
+        n_plus_one_requests=sum(snapshot["n_plus_one"].values())
+    )
+    return {"meta": meta, "routes": routes, "endpoints": endpoints}
+
+
+def compare(result, baseline, max_regression):
+    # Returns the labels whose p95 regressed beyond the allowed ratio
+    regressions = []
+    click.echo(f"\n{'route':<28}{'base p95':>10}{'p95':>10}{'change':>9}")
+    for label, route in result["routes"].items():
+        before = baseline["routes"].get(label)
+        if not before or not before["p95_ms"]:
+            continue
+        change = route["p95_ms"] / before["p95_ms"] - 1
+        flag = ""
+        if change > max_regression:
+            regressions.append(label)
+            flag = "  <-- slower"
+        click.echo(f"{label:<28}{before['p95_ms']:>10.2f}{route['p95_ms']:>10.2f}{change:>+9.1%}{flag}")
+    return regressions
+
+
+@click.command()
+@click.option("--users", default=20, show_default=True, help="Virtual users (one seeded account each).")
+@click.option("--threads", default=4, show_default=True, help="Virtual users running at the same time.")
+@click.option("--iterations", default=20, show_default=True, help="Scenario loops per virtual user.")
+@click.option("--seed", "random_seed", default=1, show_default=True, help="Random seed for the scenario.")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Result file (default: bench/results/).")
+@click.option("--baseline", type=click.Path(exists=True, dir_okay=False), default=None, help="Earlier result to compare with.")
+@click.option("--max-regression", default=0.20, show_default=True, help="Allowed p95 slowdown vs the baseline (0.2 = 20%).")
+def main(users, threads, iterations, random_seed, output, baseline, max_regression):
+    """Run the route benchmark against the seeded database."""
+    accounts, slugs = load_accounts(users)
+    if not accounts:
+        raise click.ClickException("No bench_* users found. Run `python -m bench.seed` first.")
+
+    recorder = Recorder()
+    instrumentation.metrics = Metrics()    # count only this run
+    queue = list(enumerate(accounts))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if not queue:
+                    return
+                number, (username, habit_ids) = queue.pop(0)
+            virtual_user(recorder, username, habit_ids, slugs, iterations, random_seed + number)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(min(threads, len(accounts)))]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    meta = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "database": app.config.get("DB_BACKEND", "mysql"),
+        "users": len(accounts),
+        "threads": threads,
+        "iterations": iterations,
+        "seed": random_seed
+    }
+    result = summarize(recorder, instrumentation.metrics, wall, meta)
+
+    click.echo(f"{'route':<28}{'count':>7}{'err':>5}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for label, route in result["routes"].items():
+        click.echo(f"{label:<28}{route['count']:>7}{route['errors']:>5}"
+                   f"{route['p50_ms']:>9.2f}{route['p95_ms']:>9.2f}{route['p99_ms']:>9.2f}")
+    click.echo(f"\n{'endpoint':<28}{'queries/req':>12}{'sql ms/req':>12}{'rows/req':>10}")
+    for endpoint, numbers in sorted(result["endpoints"].items()):
+        click.echo(f"{endpoint:<28}{numbers['queries_per_request']:>12}"
+                   f"{numbers['sql_ms_per_request']:>12}{numbers['rows_per_request']:>10}")
+    click.echo(f"\n{meta['total_requests']} requests in {meta['wall_seconds']}s "
+               f"= {meta['throughput_rps']} req/s")
+
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{meta['commit']}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    click.echo(f"Results written to {output}")
+
+    if baseline:
+        with open(baseline, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), max_regression)
+        if regressions:
+            click.echo(f"\np95 regression in: {', '.join(regressions)}", err=True)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+from datetime import date, timedelta
+
+import click
+import numpy as np
+from werkzeug.security import generate_password_hash
+
+from app import app, catalog_cache, create_tables_and_seed, db
+from rollups import rebuild_all_rollups
+from streaks import rebuild_all_streaks
+
+# ============================================================
+# BENCHMARK DATA SEEDER
+# ============================================================
+# Creates synthetic accounts bench_0000 ... with a mix of predefined and
+# custom habits and a multi-year daily_task_status history, then builds
+# the derived tables (streaks, rollups). Re-running replaces the
+# previous bench_* accounts. Everything is driven by --seed, so two runs
+# with the same options produce the same data.
+#
+# Point the app at the bench database first, e.g. with the container
+# from bench/docker-compose.yml:
+#   export FLASK_MYSQL_HOST=127.0.0.1 FLASK_MYSQL_PORT=3307
+#   export FLASK_MYSQL_USER=bench FLASK_MYSQL_PASSWORD=bench FLASK_MYSQL_DB=habit_tracker_bench
+# or run everything in-process on an SQLite file, no server needed:
+#   export FLASK_DB_BACKEND=sqlite FLASK_SQLITE_PATH=bench/results/bench.sqlite3
+
+USER_PREFIX = "bench_"
+PASSWORD = "bench-password"
+INSERT_CHUNK = 10000
+
+# Completed / Missed / Skipped for past days; today stays Pending
+STATUS_WEIGHTS = (0.62, 0.28, 0.10)
+
+
+def remove_bench_users(cursor):
+    cursor.execute("SELECT user_id FROM users WHERE username LIKE 'bench!_%' ESCAPE '!'")
+    user_ids = [row[0] for row in cursor.fetchall()]
+    if not user_ids:
+        return 0
+    placeholders = ", ".join(["%s"] * len(user_ids))
+    # Custom habits reference users without ON DELETE CASCADE
+    cursor.execute(f"DELETE FROM habits WHERE user_id IN ({placeholders})", user_ids)
+    cursor.execute(f"DELETE FROM users WHERE user_id IN ({placeholders})", user_ids)
+    return len(user_ids)
+
+
+def seed(users, habits_per_user, custom_per_user, years, random_seed, echo):
+    rng = np.random.default_rng(random_seed)
+    connection = db.connection
+    cursor = connection.cursor()
+
+    create_tables_and_seed()
+    removed = remove_bench_users(cursor)
+    connection.commit()
+    if removed:
+        echo(f"Removed {removed} previous bench user(s)")
+
+    catalog = catalog_cache.get()
+    predefined = [habit["habit_id"] for c in catalog.categories for habit in catalog.habits_of(c["category_id"])]
+    habits_per_user = min(habits_per_user, len(predefined))
+
+    # Accounts (one hash for all: hashing is not what we measure)
+    password_hash = generate_password_hash(PASSWORD, app.config["PASSWORD_HASH_METHOD"])
+    today = date.today()
+    first_day = today - timedelta(days=365 * years)
+    cursor.executemany("""
+        INSERT INTO users (first_name, last_name, username, dob, gender, mobile, email, password)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, [
+        ("Bench", "User", f"{USER_PREFIX}{n:04d}", date(1990, 1, 1), "Other",
+         "9000000000", f"{USER_PREFIX}{n:04d}@example.com", password_hash)
+        for n in range(users)
+    ])
+    cursor.execute("SELECT user_id FROM users WHERE username LIKE 'bench!_%' ESCAPE '!' ORDER BY username")
+    user_ids = [row[0] for row in cursor.fetchall()]
+
+    days = (today - first_day).days + 1
+    day_list = [first_day + timedelta(days=d) for d in range(days)]
+    pending = []
+    total_rows = 0
+
+    def flush():
+        nonlocal total_rows
+        if pending:
+            cursor.executemany("""
+                INSERT INTO daily_task_status (user_id, habit_id, everyday_date, status)
+                VALUES (%s, %s, %s, %s)
+            """, pending)
+            connection.commit()
+            total_rows += len(pending)
+            pending.clear()
+
+    for number, user_id in enumerate(user_ids, start=1):
+        # Custom category + habits of this user
+        cursor.execute("""
+            INSERT INTO categories (category_name, is_custom, user_id) VALUES (%s, %s, %s)
+        """, ("Bench", True, user_id))
+        category_id = cursor.lastrowid
+        habit_ids = [int(h) for h in rng.choice(predefined, size=habits_per_user, replace=False)]
+        for n in range(custom_per_user):
+            cursor.execute("""
+                INSERT INTO habits (category_id, user_id, habit_name, is_custom, is_active, created_at)
+                VALUES (%s, %s, %s, %s, %s, NOW())
+            """, (category_id, user_id, f"Bench habit {n + 1}", True, True))
+            habit_ids.append(cursor.lastrowid)
+
+        cursor.executemany("""
+            INSERT INTO user_selected_habits (user_id, habit_id, date_added)
+            VALUES (%s, %s, %s)
+        """, [(user_id, habit_id, first_day) for habit_id in habit_ids])
+
+        # Each habit gets its own completion tendency
+        for habit_id in habit_ids:
+            bias = rng.uniform(-0.2, 0.2)
+            weights = np.clip(np.array(STATUS_WEIGHTS) + [bias, -bias, 0], 0.01, None)
+            statuses = rng.choice(["Completed", "Missed", "Skipped"], size=days, p=weights / weights.sum())
+            statuses[-1] = "Pending"
+            pending.extend((user_id, habit_id, day, status) for day, status in zip(day_list, statuses.tolist()))
+            if len(pending) >= INSERT_CHUNK:
+                flush()
+
+        if number % 10 == 0 or number == len(user_ids):
+            echo(f"{number}/{len(user_ids)} users seeded")
+
+    flush()
+
+    echo("Building streaks and rollups")
+    rebuild_all_streaks(cursor)
+    rebuild_all_rollups(cursor)
+    connection.commit()
+    cursor.close()
+    return len(user_ids), total_rows
+
+
+@click.command()
+@click.option("--users", default=50, show_default=True, help="Synthetic accounts to create.")
+@click.option("--habits", "habits_per_user", default=12, show_default=True, help="Predefined habits per user.")
+@click.option("--custom", "custom_per_user", default=2, show_default=True, help="Custom habits per user.")
+@click.option("--years", default=3, show_default=True, help="Years of history per habit.")
+@click.option("--seed", "random_seed", default=42, show_default=True, help="Random seed.")
+def main(users, habits_per_user, custom_per_user, years, random_seed):
+    """Seed the configured database with benchmark users and history."""
+    with app.app_context():
+        created, rows = seed(users, habits_per_user, custom_per_user, years, random_seed, click.echo)
+    click.echo(f"Seeded {created} user(s) and {rows} status row(s); password: {PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import hashlib
+import re
+import threading
+import time
+
+# ============================================================
+# PREDEFINED CATALOG CACHE
+# ============================================================
+# The default categories and their habits are shared by every user and
+# only change when `flask db seed` runs. Each worker keeps one copy in
+# memory; it is reloaded after `ttl` seconds or when invalidate() is
+# called, so a re-seed reaches every worker within one TTL.
+
+DEFAULT_TTL = 300
+
+
+def slugify(name):
+    # "Health & Wellness" -> "health_wellness"
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+class Catalog:
+    def __init__(self, categories, habits):
+        for category in categories:
+            category["slug"] = slugify(category["category_name"])
+
+        self.categories = categories                  # list of category rows
+        self.by_id = {c["category_id"]: c for c in categories}
+        self.by_name = {c["category_name"]: c for c in categories}
+        self.by_slug = {c["slug"]: c for c in categories}
+        self.habits = {c["category_id"]: [] for c in categories}
+        for habit in habits:
+            self.habits.setdefault(habit["category_id"], []).append(habit)
+
+        # Short fingerprint of the contents; changes when a re-seed does,
+        # so anything cached on top of the catalog can include it in its key
+        content = repr([(c["category_id"], c["category_name"]) for c in categories]
+                       + [(h["habit_id"], h["category_id"], h["habit_name"]) for h in habits])
+        self.version = hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+
+    def category(self, name):
+        return self.by_name.get(name)
+
+    def resolve(self, ref):
+        # Look a predefined category up by slug or numeric id
+        if isinstance(ref, int) or str(ref).isdigit():
+            return self.by_id.get(int(ref))
+        return self.by_slug.get(ref)
+
+    def habits_of(self, category_id):
+        return self.habits.get(category_id, [])
+
+
+def load_catalog(connection):
+    cursor = connection.cursor("dict")
+
+    cursor.execute("""
+        SELECT category_id, category_name, is_custom, user_id
+        FROM categories
+        WHERE is_custom = 0
+        ORDER BY category_id
+    """)
+    categories = list(cursor.fetchall())
+
+    cursor.execute("""
+        SELECT habit_id, category_id, habit_name
+        FROM habits
+        WHERE is_custom = 0
+        ORDER BY habit_id
+    """)
+    habits = list(cursor.fetchall())
+
+    cursor.close()
+    return Catalog(categories, habits)
+
+
+class CatalogCache:
+    def __init__(self, loader, ttl=DEFAULT_TTL):
+        self._loader = loader
+        self.ttl = ttl
+        self._catalog = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+        # metrics
+        self.hits = 0
+        self.loads = 0
+
+    def get(self):
+        catalog = self._catalog
+        if catalog is not None and time.monotonic() - self._loaded_at < self.ttl:
+            self.hits += 1
+            return catalog
+
+        with self._lock:
+            # Another thread may have reloaded while we waited
+            if self._catalog is None or time.monotonic() - self._loaded_at >= self.ttl:
+                self._catalog = self._loader()
+                self._loaded_at = time.monotonic()
+                self.loads += 1
+            return self._catalog
+
+    def invalidate(self):
+        with self._lock:
+            self._catalog = None
+            self._loaded_at = 0.0
+
+
+# ============================================================
+# CATEGORY SERVICE
+# ============================================================
+
+def category_habits(catalog, cursor, user_id, category_id):
+    # Habits shown on a predefined category page. The predefined habits
+    # come from the cached catalog; the user's state (selections, renamed
+    # habits and their own custom habits) is read in one query.
+    cursor.execute("""
+        SELECT h.habit_id, h.habit_name, ush.custom_name
+        FROM user_selected_habits ush
+        JOIN habits h ON h.habit_id = ush.habit_id
+        WHERE ush.user_id = %s AND h.category_id = %s
+    """, (user_id, category_id))
+    selected = {row["habit_id"]: row for row in cursor.fetchall()}
+
+    habits = []
+    for habit in catalog.habits_of(category_id):
+        entry = selected.pop(habit["habit_id"], None)
+        habits.append({
+            "habit_id": habit["habit_id"],
+            "habit_name": habit["habit_name"],
+            "custom_name": entry["custom_name"] if entry else None,
+            "in_user_habits": 1 if entry else 0
+        })
+
+    # Whatever is left are the user's custom habits in this category
+    for entry in selected.values():
+        habits.append({
+            "habit_id": entry["habit_id"],
+            "habit_name": entry["habit_name"],
+            "custom_name": entry["custom_name"],
+            "in_user_habits": 1
+        })
+    habits.sort(key=lambda habit: habit["habit_id"])
+
+    # Pass the name to display: custom_name if exists, else default habit_name
+    for habit in habits:
+        habit["display_name"] = habit["custom_name"] if habit["custom_name"] else habit["habit_name"]
+        habit["added"] = habit["in_user_habits"]  # 1 if added, 0 if not
+
+    return habits
@@ -0,0 +1,206 @@
+import threading
+from collections import OrderedDict
+
+from rollups import refresh_day_all_users, refresh_user_days
+from streaks import update_streaks
+from view_cache import bump_day_generations, bump_generation, bump_generations
+
+# ============================================================
+# DAILY TASK MATERIALIZATION
+# ============================================================
+# daily_task_status holds one row per (user, habit, day). Rows are
+# created as 'Pending' for every habit the user has selected; the
+# unique_user_habit_date key makes the insert safe to repeat.
+
+# Values of the daily_task_status.status ENUM
+STATUSES = ("Completed", "Missed", "Skipped", "Pending")
+
+
+def materialize_user_day(cursor, user_id, day):
+    # Create all missing Pending rows for one user in a single statement.
+    # Returns the number of rows actually inserted.
+    cursor.execute("""
+        INSERT INTO daily_task_status (user_id, habit_id, everyday_date, status)
+        SELECT ush.user_id, ush.habit_id, %s, 'Pending'
+        FROM user_selected_habits ush
+        WHERE ush.user_id = %s
+        ON DUPLICATE KEY UPDATE task_id = task_id
+    """, (day, user_id))
+    inserted = cursor.rowcount
+    if inserted > 0:
+        refresh_user_days(cursor, [(user_id, day)])
+        bump_generation(cursor, user_id)
+    return inserted
+
+
+class MaterializedDays:
+    # Per worker: (user_id, day) -> users.data_generation right after this
+    # worker last made sure the day's rows exist. Everything that can add
+    # a selected habit bumps the generation, so while it is unchanged the
+    # rows are still complete and materialize_user_day can be skipped.
+    def __init__(self, size=10000):
+        self.size = size
+        self._lock = threading.Lock()
+        self._days = OrderedDict()
+
+    def is_current(self, user_id, day, generation):
+        with self._lock:
+            return generation is not None and self._days.get((user_id, day)) == generation
+
+    def remember(self, user_id, day, generation):
+        with self._lock:
+            self._days[(user_id, day)] = generation
+            self._days.move_to_end((user_id, day))
+            while len(self._days) > self.size:
+                self._days.popitem(last=False)
+
+
+def selected_habit_ids(cursor, user_id, habit_ids):
+    # Subset of habit_ids the user has in user_selected_habits
+    if not habit_ids:
+        return set()
+    placeholders = ", ".join(["%s"] * len(habit_ids))
+    cursor.execute(f"""
+        SELECT habit_id FROM user_selected_habits
+        WHERE user_id = %s AND habit_id IN ({placeholders})
+    """, (user_id, *habit_ids))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_status_updates(cursor, rows):
+    # rows: (user_id, habit_id, day, status, marked_time) tuples.
+    # Written with one multi-row upsert on unique_user_habit_date; when the
+    # same key appears twice the later row wins. Streak summaries and
+    # stats rollups are updated and the users' cached views invalidated in
+    # the same transaction. Caller commits.
+    if not rows:
+        return 0
+    placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(rows))
+    params = [value for row in rows for value in row]
+    cursor.execute(f"""
+        INSERT INTO daily_task_status (user_id, habit_id, everyday_date, status, marked_time)
+        VALUES {placeholders}
+        ON DUPLICATE KEY UPDATE status = VALUES(status), marked_time = VALUES(marked_time)
+    """, params)
+
+    update_streaks(cursor, rows)
+    refresh_user_days(cursor, {(row[0], row[2]) for row in rows})
+    bump_generations(cursor, [row[0] for row in rows])
+    return len(rows)
+
+
+# ============================================================
+# NIGHTLY MATERIALIZER
+# ============================================================
+# Runs over every user_selected_habits entry in entry_id order,
+# one chunk per transaction. Progress is stored in job_checkpoints
+# in the same transaction as the chunk, so a restarted run resumes
+# right after the last committed chunk. Entries added later in the
+# day get higher entry_ids and are picked up by the next run.
+
+MATERIALIZE_JOB = "materialize_daily"
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def load_checkpoint(cursor, job_name, run_date):
+    cursor.execute("""
+        SELECT last_key FROM job_checkpoints
+        WHERE job_name = %s AND run_date = %s
+    """, (job_name, run_date))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def save_checkpoint(cursor, job_name, run_date, last_key):
+    cursor.execute("""
+        INSERT INTO job_checkpoints (job_name, run_date, last_key, updated_at)
+        VALUES (%s, %s, %s, NOW())
+        ON DUPLICATE KEY UPDATE last_key = VALUES(last_key), updated_at = VALUES(updated_at)
+    """, (job_name, run_date, last_key))
+
+
+def materialize_day(connection, day, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    # Pre-create Pending rows for every selected habit of every user.
+    # Returns (rows_inserted, chunks_committed).
+    cursor = connection.cursor()
+    last_key = load_checkpoint(cursor, MATERIALIZE_JOB, day)
+    inserted = 0
+    chunks = 0
+
+    while True:
+        # Upper entry_id of the next chunk
+        cursor.execute("""
+            SELECT MAX(entry_id) FROM (
+                SELECT entry_id FROM user_selected_habits
+                WHERE entry_id > %s
+                ORDER BY entry_id
+                LIMIT %s
+            ) AS chunk
+        """, (last_key, chunk_size))
+        upper = cursor.fetchone()[0]
+        if upper is None:
+            break
+
+        cursor.execute("""
+            INSERT INTO daily_task_status (user_id, habit_id, everyday_date, status)
+            SELECT ush.user_id, ush.habit_id, %s, 'Pending'
+            FROM user_selected_habits ush
+            WHERE ush.entry_id > %s AND ush.entry_id <= %s
+            ON DUPLICATE KEY UPDATE task_id = task_id
+        """, (day, last_key, upper))
+        inserted += max(cursor.rowcount, 0)
+
+        save_checkpoint(cursor, MATERIALIZE_JOB, day, upper)
+        connection.commit()
+
+        last_key = upper
+        chunks += 1
+        if progress:
+            progress(chunks, last_key, inserted)
+
+    # Bring the day / week / month rollups of this day up to date in one pass
+    refresh_day_all_users(cursor, day)
+    if inserted:
+        bump_day_generations(cursor, day)
+    connection.commit()
+
+    cursor.close()
+    return inserted, chunks
+
+
+def mark_missed(connection, day, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    # Flip leftover Pending rows of a finished day to Missed, in bounded
+    # chunks so no single transaction holds locks for long.
+    cursor = connection.cursor()
+    updated = 0
+
+    while True:
+        # UPDATE ... LIMIT is MySQL only; pick the chunk in a subquery
+        # (wrapped once more so MySQL accepts the same-table reference)
+        cursor.execute("""
+            UPDATE daily_task_status
+            SET status = 'Missed'
+            WHERE task_id IN (
+                SELECT task_id FROM (
+                    SELECT task_id FROM daily_task_status
+                    WHERE everyday_date = %s AND status = 'Pending'
+                    LIMIT %s
+                ) AS chunk
+            )
+        """, (day, chunk_size))
+        count = cursor.rowcount
+        connection.commit()
+
+        updated += count
+        if progress:
+            progress(updated)
+        if count < chunk_size:
+            break
+
+    if updated:
+        refresh_day_all_users(cursor, day)
+        bump_day_generations(cursor, day)
+        connection.commit()
+
+    cursor.close()
+    return updated
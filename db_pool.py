@@ -0,0 +1,171 @@
+import os
+import queue
+import threading
+import time
+
+# ============================================================
+# DATABASE CONNECTION POOL
+# ============================================================
+# Keeps a set of open connections per worker process so that a request
+# does not pay a TCP + auth handshake (MySQL) or a file open + PRAGMA
+# setup (SQLite). Connections are health checked on checkout and
+# replaced once they get older than `recycle` seconds (MySQL drops idle
+# connections after wait_timeout). The driver specific parts live in
+# storage.py.
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, connect, size=5, max_overflow=10, timeout=30.0, recycle=3600, pre_ping=True):
+        self._connect = connect
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # LIFO so the most recently used (warm) connection is reused first
+        self._idle = queue.LifoQueue()
+        self._created = {}
+        self._opened = 0
+        self._in_use = 0
+        self._pid = os.getpid()
+
+        # metrics
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self.recycled = 0
+        self.failed_pings = 0
+        self.peak_in_use = 0
+
+    def _check_fork(self):
+        # A forked worker must never share sockets with its parent: drop the
+        # inherited connections without closing them and start over.
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+
+    def _discard(self, conn):
+        with self._lock:
+            self._opened -= 1
+            self._created.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _open(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+        with self._lock:
+            self._created[id(conn)] = time.monotonic()
+        return conn
+
+    def acquire(self):
+        self._check_fork()
+        started = time.perf_counter()
+        deadline = started + self.timeout
+
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_open = self._opened < self.size + self.max_overflow
+                    if can_open:
+                        self._opened += 1
+                if can_open:
+                    conn = self._open()
+                    break
+
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    with self._lock:
+                        self.timeouts += 1
+                    raise PoolTimeout(f"No database connection available within {self.timeout}s")
+                try:
+                    conn = self._idle.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+
+            # Health checks on checkout
+            created = self._created.get(id(conn), 0)
+            if self.recycle and time.monotonic() - created > self.recycle:
+                self._discard(conn)
+                with self._lock:
+                    self.recycled += 1
+                continue
+            if self.pre_ping:
+                try:
+                    conn.ping()
+                except Exception:
+                    self._discard(conn)
+                    with self._lock:
+                        self.failed_pings += 1
+                    continue
+            break
+
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self._in_use)
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return conn
+
+    def release(self, conn):
+        if self._pid != os.getpid():
+            return
+
+        with self._lock:
+            self._in_use -= 1
+
+        # Never hand an open transaction (or its snapshot) to the next request
+        try:
+            conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+
+        # Overflow connections are closed instead of kept idle
+        with self._lock:
+            keep = self._opened <= self.size
+        if keep:
+            self._idle.put(conn)
+        else:
+            self._discard(conn)
+
+    def stats(self):
+        with self._lock:
+            capacity = self.size + self.max_overflow
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._opened,
+                "idle": self._idle.qsize(),
+                "in_use": self._in_use,
+                "peak_in_use": self.peak_in_use,
+                "utilization": (self._in_use / capacity) if capacity else 0.0,
+                "checkouts": self.checkouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "wait_seconds_avg": (self.wait_seconds_total / self.checkouts) if self.checkouts else 0.0,
+                "timeouts": self.timeouts,
+                "recycled": self.recycled,
+                "failed_pings": self.failed_pings
+            }
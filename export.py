@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+import zlib
+
+# ============================================================
+# DATA EXPORT
+# ============================================================
+# Streams everything we store about one user. Status rows are read with
+# a server-side (unbuffered) cursor and turned into output as they
+# arrive, so memory use does not depend on the size of the history.
+# Output is batched into ~64 KB pieces before it is handed to Flask.
+#
+#   csv     one row per daily_task_status entry, habit and category
+#           names resolved
+#   ndjson  a "profile" record, one "habit" record per selected habit,
+#           then one "status" record per daily_task_status entry
+
+EXPORT_FORMATS = ("csv", "ndjson")
+CHUNK_BYTES = 64 * 1024
+
+CSV_HEADER = ["date", "habit_id", "habit_name", "category", "status", "marked_time"]
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _profile_and_habits(connection, user_id):
+    cursor = connection.cursor("dict")
+    cursor.execute("""
+        SELECT username, first_name, last_name, email, mobile, dob, gender, created_at
+        FROM users WHERE user_id = %s
+    """, (user_id,))
+    profile = cursor.fetchone()
+
+    cursor.execute("""
+        SELECT h.habit_id, h.habit_name, ush.custom_name, c.category_name,
+               h.is_custom, ush.date_added
+        FROM user_selected_habits ush
+        JOIN habits h ON h.habit_id = ush.habit_id
+        JOIN categories c ON c.category_id = h.category_id
+        WHERE ush.user_id = %s
+        ORDER BY ush.entry_id
+    """, (user_id,))
+    habits = cursor.fetchall()
+    cursor.close()
+    return profile, habits
+
+
+def _status_rows(connection, user_id):
+    # Unbuffered: rows are pulled from the server as the generator advances
+    cursor = connection.cursor("stream")
+    try:
+        cursor.execute("""
+            SELECT dts.everyday_date, dts.habit_id,
+                   COALESCE(ush.custom_name, h.habit_name), c.category_name,
+                   dts.status, dts.marked_time
+            FROM daily_task_status dts
+            JOIN habits h ON h.habit_id = dts.habit_id
+            JOIN categories c ON c.category_id = h.category_id
+            LEFT JOIN user_selected_habits ush
+              ON ush.user_id = dts.user_id AND ush.habit_id = dts.habit_id
+            WHERE dts.user_id = %s
+            ORDER BY dts.everyday_date, dts.habit_id
+        """, (user_id,))
+        for row in cursor:
+            yield row
+    finally:
+        cursor.close()
+
+
+def _csv_lines(connection, user_id):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    for day, habit_id, habit_name, category, status, marked_time in _status_rows(connection, user_id):
+        writer.writerow([_iso(day), habit_id, habit_name, category, status, _iso(marked_time)])
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_lines(connection, user_id):
+    profile, habits = _profile_and_habits(connection, user_id)
+    lines = []
+    if profile:
+        lines.append(json.dumps({
+            "type": "profile",
+            **{key: _iso(value) if key in ("dob", "created_at") else value for key, value in profile.items()}
+        }))
+    for habit in habits:
+        lines.append(json.dumps({
+            "type": "habit",
+            "habit_id": habit["habit_id"],
+            "habit_name": habit["custom_name"] or habit["habit_name"],
+            "default_name": habit["habit_name"],
+            "category": habit["category_name"],
+            "is_custom": bool(habit["is_custom"]),
+            "date_added": _iso(habit["date_added"])
+        }))
+    yield "".join(line + "\n" for line in lines)
+
+    pending = []
+    size = 0
+    for day, habit_id, habit_name, category, status, marked_time in _status_rows(connection, user_id):
+        line = json.dumps({
+            "type": "status",
+            "date": _iso(day),
+            "habit_id": habit_id,
+            "habit_name": habit_name,
+            "category": category,
+            "status": status,
+            "marked_time": _iso(marked_time)
+        }) + "\n"
+        pending.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield "".join(pending)
+            pending, size = [], 0
+    yield "".join(pending)
+
+
+def _gzipped(chunks):
+    # wbits=31: gzip container, so the download opens with any gunzip
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(connection, user_id, fmt, gzip=False):
+    # Generator of bytes for the Flask response body
+    lines = _csv_lines(connection, user_id) if fmt == "csv" else _ndjson_lines(connection, user_id)
+    if gzip:
+        return _gzipped(lines)
+    return (chunk.encode("utf-8") for chunk in lines if chunk)
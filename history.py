@@ -0,0 +1,145 @@
+import base64
+import binascii
+
+from daily_tasks import STATUSES
+from stats import parse_iso_date
+
+# ============================================================
+# HABIT HISTORY (keyset pagination)
+# ============================================================
+# Rows of daily_task_status, newest first, ordered by
+# (everyday_date DESC, habit_id DESC). A page continues strictly after
+# the last key of the previous one, so every page is an index range
+# scan on idx_dts_user_date no matter how deep into the history it is
+# (no OFFSET). The key travels to the client as an opaque cursor token.
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+STREAM_CHUNK = 1000
+
+
+def encode_cursor(day, habit_id):
+    raw = f"{day.isoformat()}:{habit_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    # Returns (day, habit_id) or None for a malformed token
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("ascii")
+        day, habit_id = raw.split(":")
+        day = parse_iso_date(day)
+        return (day, int(habit_id)) if day else None
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def parse_history_args(args):
+    # request.args -> (filters, after, limit, error message)
+    filters = {}
+    for name in ("habit_id", "category_id"):
+        if args.get(name):
+            try:
+                filters[name] = int(args[name])
+            except ValueError:
+                return None, None, None, f"{name} must be a number"
+
+    if args.get("status"):
+        if args["status"] not in STATUSES:
+            return None, None, None, f"status must be one of {', '.join(STATUSES)}"
+        filters["status"] = args["status"]
+
+    for name in ("start", "end"):
+        if args.get(name):
+            filters[name] = parse_iso_date(args[name])
+            if not filters[name]:
+                return None, None, None, f"{name} must be YYYY-MM-DD"
+
+    after = None
+    if args.get("cursor"):
+        after = decode_cursor(args["cursor"])
+        if not after:
+            return None, None, None, "Invalid cursor"
+
+    try:
+        limit = int(args.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        return None, None, None, "limit must be a number"
+    limit = min(max(limit, 1), MAX_LIMIT)
+
+    return filters, after, limit, None
+
+
+def fetch_history(cursor, user_id, filters, after=None, limit=DEFAULT_LIMIT):
+    # One page of rows (DictCursor) strictly after the `after` key
+    conditions = ["dts.user_id = %s"]
+    params = [user_id]
+
+    if "habit_id" in filters:
+        conditions.append("dts.habit_id = %s")
+        params.append(filters["habit_id"])
+    if "category_id" in filters:
+        conditions.append("h.category_id = %s")
+        params.append(filters["category_id"])
+    if "status" in filters:
+        conditions.append("dts.status = %s")
+        params.append(filters["status"])
+    if filters.get("start"):
+        conditions.append("dts.everyday_date >= %s")
+        params.append(filters["start"])
+    if filters.get("end"):
+        conditions.append("dts.everyday_date <= %s")
+        params.append(filters["end"])
+    if after:
+        conditions.append("(dts.everyday_date < %s OR (dts.everyday_date = %s AND dts.habit_id < %s))")
+        params.extend([after[0], after[0], after[1]])
+
+    params.append(limit)
+    cursor.execute(f"""
+        SELECT dts.everyday_date, dts.habit_id,
+               COALESCE(ush.custom_name, h.habit_name) AS habit_name,
+               h.category_id, c.category_name,
+               dts.status, dts.marked_time
+        FROM daily_task_status dts
+        JOIN habits h ON h.habit_id = dts.habit_id
+        JOIN categories c ON c.category_id = h.category_id
+        LEFT JOIN user_selected_habits ush
+          ON ush.user_id = dts.user_id AND ush.habit_id = dts.habit_id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY dts.everyday_date DESC, dts.habit_id DESC
+        LIMIT %s
+    """, params)
+    return cursor.fetchall()
+
+
+def history_page(cursor, user_id, filters, after=None, limit=DEFAULT_LIMIT):
+    # Returns (rows, next_cursor); next_cursor is None on the last page
+    rows = fetch_history(cursor, user_id, filters, after, limit + 1)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["everyday_date"], rows[-1]["habit_id"])
+    return rows, next_cursor
+
+
+def iter_history(cursor, user_id, filters, after=None, chunk_size=STREAM_CHUNK):
+    # Every matching row, one keyset page at a time (flat memory)
+    while True:
+        rows = fetch_history(cursor, user_id, filters, after, chunk_size)
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        after = (rows[-1]["everyday_date"], rows[-1]["habit_id"])
+
+
+def history_item(row):
+    # JSON-ready dict of one history row
+    return {
+        "date": row["everyday_date"].isoformat(),
+        "habit_id": row["habit_id"],
+        "habit_name": row["habit_name"],
+        "category_id": row["category_id"],
+        "category_name": row["category_name"],
+        "status": row["status"],
+        "marked_time": row["marked_time"].isoformat() if row["marked_time"] else None
+    }
@@ -0,0 +1,69 @@
+import hashlib
+import os
+from datetime import datetime, time as dt_time
+
+from flask import request
+
+# ============================================================
+# CONDITIONAL GET
+# ============================================================
+# Logged-in pages are rendered from the user's own data, the predefined
+# catalog, today's date and the templates. Their validator is a hash of
+# exactly that: (user, data_generation, page, query string, date,
+# catalog version, deploy fingerprint). data_generation is bumped with
+# every write (view_cache.bump_generation), so one primary key lookup
+# tells whether the page the browser already has is still current and a
+# repeat navigation is answered with 304 before any query or template
+# work.
+#
+# Responses are "private, no-cache": browsers keep them but revalidate on
+# every navigation, shared caches never store them.
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def page_etag(*parts):
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:24]
+
+
+def last_modified_for(last_write_at, day):
+    # Pages also change at midnight (today's list, streaks), so a page
+    # is never older than the start of the day
+    # (NOW() values are server local time)
+    start_of_day = datetime.combine(day, dt_time.min)
+    if last_write_at is None or last_write_at < start_of_day:
+        return start_of_day.astimezone()
+    return last_write_at.astimezone()
+
+
+def is_not_modified(etag):
+    # Only the ETag decides: Last-Modified has one-second resolution and
+    # does not cover catalog or deploy changes. Weak comparison, so the
+    # W/ that compressing proxies add still matches.
+    return request.if_none_match.contains_weak(etag)
+
+
+def set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    response.vary.add("Cookie")
+    return response
+
+
+def deploy_fingerprint(*directories):
+    # Hash of every file under the template / static folders: identical
+    # in all workers of one release, different after a deploy that
+    # changes what the pages look like
+    digest = hashlib.sha1()
+    for directory in directories:
+        if not directory or not os.path.isdir(directory):
+            continue
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, directory).encode("utf-8"))
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()[:12]
@@ -0,0 +1,236 @@
+import csv
+from datetime import date, datetime
+
+from daily_tasks import STATUSES
+from rollups import rebuild_rollups
+from stats import parse_iso_date
+from streaks import rebuild_streaks
+from view_cache import bump_generation
+
+# ============================================================
+# HABIT HISTORY IMPORT (CSV)
+# ============================================================
+# Reads a CSV line by line (the whole file is never held in memory),
+# maps every row to one of the user's habits and upserts the statuses
+# into daily_task_status in chunks: one multi-row
+# INSERT ... ON DUPLICATE KEY UPDATE and one commit per chunk.
+#
+# Habit mapping, by name (case-insensitive):
+#   1. a habit already in the user's list (custom name or default name)
+#   2. a predefined habit -> added to the user's list
+#   3. otherwise a new custom habit, in the row's category (a predefined
+#      one, one of the user's custom categories, or a new custom
+#      category); rows without a category go to "Imported".
+#
+# Streaks and stats rollups are rebuilt once at the end rather than
+# maintained row by row.
+#
+# Columns are found by header name. Our own CSV export can be imported
+# as it is.
+
+DEFAULT_IMPORT_CHUNK = 5000
+MAX_REPORTED_ERRORS = 20
+DEFAULT_IMPORT_CATEGORY = "Imported"
+
+COLUMN_ALIASES = {
+    "date": ("date", "everyday_date", "day"),
+    "habit": ("habit_name", "habit", "name"),
+    "status": ("status",),
+    "category": ("category", "category_name"),
+    "marked_time": ("marked_time",)
+}
+
+STATUS_ALIASES = {status.lower(): status for status in STATUSES}
+STATUS_ALIASES.update({
+    "done": "Completed", "yes": "Completed", "true": "Completed", "1": "Completed", "x": "Completed",
+    "no": "Missed", "false": "Missed", "0": "Missed",
+    "skip": "Skipped"
+})
+
+
+class CSVImportError(ValueError):
+    # The file cannot be imported at all (bad header)
+    pass
+
+
+def _find_columns(header):
+    names = [name.strip().lower() for name in header]
+    columns = {}
+    for key, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in names:
+                columns[key] = names.index(alias)
+                break
+    missing = [key for key in ("date", "habit", "status") if key not in columns]
+    if missing:
+        raise CSVImportError(f"CSV header is missing column(s): {', '.join(missing)}")
+    return columns
+
+
+class HabitResolver:
+    # Habit / category name -> id, creating what does not exist yet.
+    # Inserts run on the import cursor and are committed with the chunk.
+
+    def __init__(self, cursor, user_id, catalog):
+        self.cursor = cursor
+        self.user_id = user_id
+        self.catalog = catalog
+        self.habits_created = 0
+        self.habits_selected = 0
+        self.categories_created = 0
+
+        cursor.execute("""
+            SELECT h.habit_id, h.habit_name, ush.custom_name
+            FROM user_selected_habits ush
+            JOIN habits h ON h.habit_id = ush.habit_id
+            WHERE ush.user_id = %s
+        """, (user_id,))
+        self.habits = {}
+        for habit_id, habit_name, custom_name in cursor.fetchall():
+            self.habits.setdefault(habit_name.lower(), habit_id)
+            if custom_name:
+                self.habits[custom_name.lower()] = habit_id
+
+        self.predefined = {}
+        for category in catalog.categories:
+            for habit in catalog.habits_of(category["category_id"]):
+                self.predefined.setdefault(habit["habit_name"].lower(), habit["habit_id"])
+
+        self.categories = {c["category_name"].lower(): c["category_id"] for c in catalog.categories}
+        cursor.execute("""
+            SELECT category_id, category_name FROM categories
+            WHERE is_custom = 1 AND user_id = %s
+        """, (user_id,))
+        for category_id, category_name in cursor.fetchall():
+            self.categories.setdefault(category_name.lower(), category_id)
+
+    def category_id(self, name):
+        name = (name or "").strip() or DEFAULT_IMPORT_CATEGORY
+        key = name.lower()
+        if key not in self.categories:
+            self.cursor.execute("""
+                INSERT INTO categories (category_name, is_custom, user_id)
+                VALUES (%s, %s, %s)
+            """, (name, True, self.user_id))
+            self.categories[key] = self.cursor.lastrowid
+            self.categories_created += 1
+        return self.categories[key]
+
+    def habit_id(self, name, category_name):
+        key = name.lower()
+        if key in self.habits:
+            return self.habits[key]
+
+        if key in self.predefined:
+            habit_id = self.predefined[key]
+            self.habits_selected += 1
+        else:
+            self.cursor.execute("""
+                INSERT INTO habits (category_id, user_id, habit_name, is_custom, is_active, created_at)
+                VALUES (%s, %s, %s, %s, %s, NOW())
+            """, (self.category_id(category_name), self.user_id, name, True, True))
+            habit_id = self.cursor.lastrowid
+            self.habits_created += 1
+
+        self.cursor.execute("""
+            INSERT INTO user_selected_habits (user_id, habit_id, date_added, custom_name)
+            VALUES (%s, %s, CURDATE(), %s)
+            ON DUPLICATE KEY UPDATE entry_id = entry_id
+        """, (self.user_id, habit_id, None if key in self.predefined else name))
+        self.habits[key] = habit_id
+        return habit_id
+
+
+def _write_chunk(cursor, rows):
+    # executemany turns this into multi-row INSERTs
+    cursor.executemany("""
+        INSERT INTO daily_task_status (user_id, habit_id, everyday_date, status, marked_time)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE status = VALUES(status), marked_time = VALUES(marked_time)
+    """, rows)
+
+
+def import_csv(connection, user_id, lines, catalog, chunk_size=DEFAULT_IMPORT_CHUNK, progress=None):
+    # lines: any iterable of text lines (an open file, a decoded upload).
+    # Returns a summary dict; progress(rows_read, rows_imported) is called
+    # after every committed chunk.
+    reader = csv.reader(lines)
+    try:
+        columns = _find_columns(next(reader))
+    except StopIteration:
+        raise CSVImportError("The CSV file is empty")
+
+    cursor = connection.cursor()
+    resolver = HabitResolver(cursor, user_id, catalog)
+    today = date.today()
+
+    summary = {"rows": 0, "imported": 0, "skipped": 0, "chunks": 0, "errors": []}
+    chunk = []
+
+    def skip(reason):
+        summary["skipped"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+            summary["errors"].append(f"line {reader.line_num}: {reason}")
+
+    def flush():
+        if not chunk:
+            return
+        _write_chunk(cursor, chunk)
+        connection.commit()
+        summary["imported"] += len(chunk)
+        summary["chunks"] += 1
+        chunk.clear()
+        if progress:
+            progress(summary["rows"], summary["imported"])
+
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        summary["rows"] += 1
+        try:
+            day = parse_iso_date(row[columns["date"]])
+            habit_name = row[columns["habit"]].strip()
+            status = STATUS_ALIASES.get(row[columns["status"]].strip().lower())
+            category = row[columns["category"]] if "category" in columns else None
+            marked = row[columns["marked_time"]].strip() if "marked_time" in columns else ""
+        except IndexError:
+            skip("too few columns")
+            continue
+
+        if not day:
+            skip("date must be YYYY-MM-DD")
+            continue
+        if day > today:
+            skip("date is in the future")
+            continue
+        if not habit_name:
+            skip("habit name is empty")
+            continue
+        if not status:
+            skip(f"status must be one of {', '.join(STATUSES)}")
+            continue
+        try:
+            marked_time = datetime.fromisoformat(marked) if marked else None
+        except ValueError:
+            marked_time = None
+
+        habit_id = resolver.habit_id(habit_name[:255], category)
+        chunk.append((user_id, habit_id, day, status, marked_time))
+        if len(chunk) >= chunk_size:
+            flush()
+
+    flush()
+
+    # Derived tables in one pass over the (now larger) history
+    rebuild_streaks(cursor, user_id)
+    rebuild_rollups(cursor, user_id)
+    bump_generation(cursor, user_id)
+    connection.commit()
+    cursor.close()
+
+    summary.update(
+        habits_created=resolver.habits_created,
+        habits_selected=resolver.habits_selected,
+        categories_created=resolver.categories_created
+    )
+    return summary
@@ -0,0 +1,297 @@
+import re
+import threading
+import time
+from collections import defaultdict
+
+from flask import g, request
+
+# ============================================================
+# REQUEST / SQL INSTRUMENTATION
+# ============================================================
+# Every request records wall time, number of SQL statements, time spent
+# in them and rows fetched. The pooled database connection is wrapped so
+# each cursor reports to the current request; code keeps using
+# `db.connection.cursor(...)` as before.
+#
+# Numbers are aggregated per endpoint into histograms and rendered in
+# Prometheus text format (see render_prometheus).
+#
+# N+1 detection: when one request runs the same SQL text at least
+# `N_PLUS_ONE_THRESHOLD` times (a query inside a Python loop, like the
+# old per-date loop of /my_stats), the endpoint and statement are
+# logged and counted.
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+ROW_BUCKETS = (1, 10, 100, 1000, 10000, 100000)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+# ---------------------------
+# per-request counters
+# ---------------------------
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.statements = defaultdict(int)   # normalized SQL -> executions
+        self.status = None
+
+    def record(self, sql, seconds):
+        self.queries += 1
+        self.sql_seconds += seconds
+        self.statements[normalize_sql(sql)] += 1
+
+
+def current_stats():
+    return g.get("request_stats")
+
+
+class InstrumentedCursor:
+    # Transparent proxy: times execute/executemany, counts fetched rows
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _timed(self, method, sql, args):
+        started = time.perf_counter()
+        try:
+            return method(sql, args)
+        finally:
+            stats = current_stats()
+            if stats is not None:
+                stats.record(sql, time.perf_counter() - started)
+
+    def execute(self, sql, args=None):
+        return self._timed(self._cursor.execute, sql, args)
+
+    def executemany(self, sql, args):
+        return self._timed(self._cursor.executemany, sql, args)
+
+    def _count(self, rows):
+        stats = current_stats()
+        if stats is not None and rows:
+            stats.rows += rows
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        self._count(1 if row is not None else 0)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._cursor.fetchmany(size) if size is not None else self._cursor.fetchmany()
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._count(len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._count(1)
+            yield row
+
+
+class InstrumentedConnection:
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs))
+
+
+# ---------------------------
+# aggregation
+# ---------------------------
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_seconds = defaultdict(lambda: Histogram(DURATION_BUCKETS))
+        self.sql_seconds = defaultdict(lambda: Histogram(DURATION_BUCKETS))
+        self.sql_queries = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+        self.rows_fetched = defaultdict(lambda: Histogram(ROW_BUCKETS))
+        self.responses = defaultdict(int)        # (endpoint, method, status) -> count
+        self.n_plus_one = defaultdict(int)       # endpoint -> requests flagged
+        self.slow_requests = defaultdict(int)    # endpoint -> count
+
+    def observe(self, endpoint, method, stats, wall_seconds, n_plus_one, slow):
+        with self._lock:
+            self.request_seconds[endpoint].observe(wall_seconds)
+            self.sql_seconds[endpoint].observe(stats.sql_seconds)
+            self.sql_queries[endpoint].observe(stats.queries)
+            self.rows_fetched[endpoint].observe(stats.rows)
+            self.responses[(endpoint, method, stats.status or 0)] += 1
+            if n_plus_one:
+                self.n_plus_one[endpoint] += 1
+            if slow:
+                self.slow_requests[endpoint] += 1
+
+    def snapshot(self):
+        # Copy under the lock so rendering does not race with requests
+        with self._lock:
+            def copy(histograms):
+                result = {}
+                for key, histogram in histograms.items():
+                    clone = Histogram(histogram.buckets)
+                    clone.counts = list(histogram.counts)
+                    clone.total = histogram.total
+                    clone.sum = histogram.sum
+                    result[key] = clone
+                return result
+            return {
+                "request_seconds": copy(self.request_seconds),
+                "sql_seconds": copy(self.sql_seconds),
+                "sql_queries": copy(self.sql_queries),
+                "rows_fetched": copy(self.rows_fetched),
+                "responses": dict(self.responses),
+                "n_plus_one": dict(self.n_plus_one),
+                "slow_requests": dict(self.slow_requests)
+            }
+
+
+class Instrumentation:
+    def __init__(self, app=None, db=None):
+        self.metrics = Metrics()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db=None):
+        app.config.setdefault("INSTRUMENTATION_ENABLED", True)
+        app.config.setdefault("N_PLUS_ONE_THRESHOLD", 10)
+        app.config.setdefault("SLOW_REQUEST_SECONDS", 1.0)
+        if not app.config["INSTRUMENTATION_ENABLED"]:
+            return
+
+        self.app = app
+        if db is not None:
+            db.wrap_connection = InstrumentedConnection
+        app.before_request(self._before)
+        app.after_request(self._after)
+        # teardown runs after streamed bodies are finished, so their
+        # queries are counted too
+        app.teardown_request(self._teardown)
+
+    def _before(self):
+        g.request_stats = RequestStats()
+
+    def _after(self, response):
+        stats = current_stats()
+        if stats is not None:
+            stats.status = response.status_code
+        return response
+
+    def _teardown(self, exception):
+        stats = g.pop("request_stats", None)
+        if stats is None:
+            return
+        wall = time.perf_counter() - stats.started
+        endpoint = request.endpoint or "unmatched"
+        if exception is not None and stats.status is None:
+            stats.status = 500
+
+        threshold = self.app.config["N_PLUS_ONE_THRESHOLD"]
+        repeated = [(sql, count) for sql, count in stats.statements.items() if count >= threshold]
+        for sql, count in repeated:
+            self.app.logger.warning("N+1 query pattern in %s: %d x %s", endpoint, count, sql[:200])
+
+        slow = wall >= self.app.config["SLOW_REQUEST_SECONDS"]
+        if slow:
+            self.app.logger.warning(
+                "Slow request %s %s: %.3fs (%d queries, %.3fs SQL, %d rows)",
+                request.method, request.path, wall, stats.queries, stats.sql_seconds, stats.rows
+            )
+
+        self.metrics.observe(endpoint, request.method, stats, wall, bool(repeated), slow)
+
+
+# ============================================================
+# PROMETHEUS TEXT FORMAT
+# ============================================================
+
+PREFIX = "habit_tracker_"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _histogram_lines(name, help_text, histograms):
+    lines = [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} histogram"]
+    for endpoint, histogram in sorted(histograms.items()):
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            lines.append(f"{PREFIX}{name}_bucket{_labels(endpoint=endpoint, le=bound)} {count}")
+        lines.append(f"{PREFIX}{name}_bucket{_labels(endpoint=endpoint, le='+Inf')} {histogram.total}")
+        lines.append(f"{PREFIX}{name}_sum{_labels(endpoint=endpoint)} {histogram.sum}")
+        lines.append(f"{PREFIX}{name}_count{_labels(endpoint=endpoint)} {histogram.total}")
+    return lines
+
+
+def _counter_lines(name, help_text, values, label_names):
+    lines = [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} counter"]
+    for key, value in sorted(values.items()):
+        key = key if isinstance(key, tuple) else (key,)
+        lines.append(f"{PREFIX}{name}{_labels(**dict(zip(label_names, key)))} {value}")
+    return lines
+
+
+def render_prometheus(metrics, gauges=None):
+    # gauges: {group: {name: number}} from pool / cache / buffer stats
+    snapshot = metrics.snapshot()
+    lines = []
+    lines += _histogram_lines("request_duration_seconds", "Wall time per request.", snapshot["request_seconds"])
+    lines += _histogram_lines("request_sql_seconds", "Time spent in SQL per request.", snapshot["sql_seconds"])
+    lines += _histogram_lines("request_sql_queries", "SQL statements per request.", snapshot["sql_queries"])
+    lines += _histogram_lines("request_rows_fetched", "Rows fetched per request.", snapshot["rows_fetched"])
+    lines += _counter_lines("responses_total", "Responses by endpoint, method and status.",
+                            snapshot["responses"], ("endpoint", "method", "status"))
+    lines += _counter_lines("n_plus_one_requests_total", "Requests that repeated one SQL statement too often.",
+                            snapshot["n_plus_one"], ("endpoint",))
+    lines += _counter_lines("slow_requests_total", "Requests slower than SLOW_REQUEST_SECONDS.",
+                            snapshot["slow_requests"], ("endpoint",))
+
+    for group, values in sorted((gauges or {}).items()):
+        for name, value in sorted(values.items()):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            metric = f"{PREFIX}{group}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+
+    return "\n".join(lines) + "\n"
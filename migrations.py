@@ -0,0 +1,427 @@
+import re
+
+from availability import USERNAME_TAKEN_SQL
+from rollups import rebuild_all_rollups
+from streaks import rebuild_all_streaks
+from storage import DB_ERRORS
+
+# ============================================================
+# SCHEMA MIGRATIONS
+# ============================================================
+# Every schema change is a numbered migration. The versions applied to a
+# database are recorded in schema_version, so `upgrade()` only runs what
+# is missing. MySQL commits DDL implicitly, so each step is written to be
+# safe to re-run if a migration was interrupted half way.
+#
+# Tables are written in MySQL DDL; on SQLite the storage layer rewrites
+# AUTO_INCREMENT / ENUM / UNIQUE KEY (storage.translate). Steps that
+# need more than that branch on `dialect` ("mysql" or "sqlite").
+
+
+def index_exists(cursor, table, index_name):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (table, index_name))
+    return cursor.fetchone() is not None
+
+
+def add_index(cursor, dialect, table, index_name, columns, unique=False):
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    if dialect == "sqlite":
+        cursor.execute(f"CREATE {kind} IF NOT EXISTS {index_name} ON {table} ({', '.join(columns)})")
+        return
+    if index_exists(cursor, table, index_name):
+        return
+    cursor.execute(f"ALTER TABLE {table} ADD {kind} {index_name} ({', '.join(columns)})")
+
+
+def column_exists(cursor, dialect, table, column):
+    if dialect == "sqlite":
+        cursor.execute(f"PRAGMA table_info({table})")
+        return any(row[1] == column for row in cursor.fetchall())
+    cursor.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        LIMIT 1
+    """, (table, column))
+    return cursor.fetchone() is not None
+
+
+def add_column(cursor, dialect, table, column, definition):
+    if not column_exists(cursor, dialect, table, column):
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+# ---------------------------
+# 1: base tables
+# ---------------------------
+def migration_001_base_tables(cursor, dialect):
+    # users table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS users (
+        user_id INT AUTO_INCREMENT PRIMARY KEY,
+        first_name VARCHAR(255),
+        last_name VARCHAR(255),
+        username VARCHAR(255) UNIQUE,
+        dob DATE,
+        gender VARCHAR(20),
+        mobile VARCHAR(50),
+        email VARCHAR(255) UNIQUE,
+        password VARCHAR(255),
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    # categories table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS categories (
+        category_id INT AUTO_INCREMENT PRIMARY KEY,
+        category_name VARCHAR(255) NOT NULL,
+        is_custom BOOLEAN DEFAULT FALSE,
+        user_id INT NULL,
+        FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    )
+    """)
+
+    # habits table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS habits (
+        habit_id INT AUTO_INCREMENT PRIMARY KEY,
+        category_id INT,
+        user_id INT NULL,
+        habit_name VARCHAR(255),
+        is_custom TINYINT(1) DEFAULT 0,
+        is_active BOOLEAN DEFAULT TRUE,
+        created_at DATETIME,
+        FOREIGN KEY (category_id) REFERENCES categories(category_id),
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    )
+    """)
+
+    # user_selected_habits table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS user_selected_habits (
+        entry_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT,
+        habit_id INT,
+        date_added DATE,
+        custom_name VARCHAR(255),
+        is_daily_task BOOLEAN DEFAULT FALSE,
+        order_position INT,
+        FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+        FOREIGN KEY (habit_id) REFERENCES habits(habit_id) ON DELETE CASCADE
+    )
+    """)
+
+    # daily_task_status table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS daily_task_status (
+        task_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        habit_id INT NOT NULL,
+        everyday_date DATE NOT NULL,
+        status ENUM('Completed', 'Missed', 'Skipped', 'Pending') DEFAULT 'Pending',
+        marked_time DATETIME DEFAULT NULL,
+        UNIQUE KEY unique_user_habit_date (user_id, habit_id, everyday_date),
+        FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+        FOREIGN KEY (habit_id) REFERENCES habits(habit_id) ON DELETE CASCADE
+    )
+    """)
+
+    # job_checkpoints table (progress of restartable background jobs)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS job_checkpoints (
+        job_name VARCHAR(64) NOT NULL,
+        run_date DATE NOT NULL,
+        last_key INT NOT NULL DEFAULT 0,
+        updated_at DATETIME,
+        PRIMARY KEY (job_name, run_date)
+    )
+    """)
+
+
+# ---------------------------
+# 2: indexes for hot lookup paths
+# ---------------------------
+def migration_002_hot_path_indexes(cursor, dialect):
+    # A habit can only be selected once per user. Drop older duplicates
+    # (keep the first entry) before the unique key is added.
+    if dialect == "sqlite":
+        cursor.execute("""
+            DELETE FROM user_selected_habits
+            WHERE entry_id NOT IN (
+                SELECT MIN(entry_id) FROM user_selected_habits GROUP BY user_id, habit_id
+            )
+        """)
+    else:
+        cursor.execute("""
+            DELETE newer FROM user_selected_habits newer
+            JOIN user_selected_habits older
+              ON older.user_id = newer.user_id
+             AND older.habit_id = newer.habit_id
+             AND older.entry_id < newer.entry_id
+        """)
+    add_index(cursor, dialect, "user_selected_habits", "unique_user_habit", ["user_id", "habit_id"], unique=True)
+
+    # Category pages / add_custom_habit look categories up by name,
+    # the dashboard lists a user's custom categories.
+    add_index(cursor, dialect, "categories", "idx_categories_name", ["category_name"])
+    add_index(cursor, dialect, "categories", "idx_categories_user_custom", ["user_id", "is_custom"])
+
+    # Category pages list habits of one category
+    add_index(cursor, dialect, "habits", "idx_habits_category", ["category_id"])
+
+    # /my_stats groups a user's rows by date; the nightly job flips one
+    # day's Pending rows to Missed.
+    add_index(cursor, dialect, "daily_task_status", "idx_dts_user_date",
+              ["user_id", "everyday_date", "habit_id", "status"])
+    add_index(cursor, dialect, "daily_task_status", "idx_dts_date_status", ["everyday_date", "status"])
+
+
+# ---------------------------
+# 3: per-habit streak summary
+# ---------------------------
+def migration_003_habit_streaks(cursor, dialect):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS habit_streaks (
+        user_id INT NOT NULL,
+        habit_id INT NOT NULL,
+        current_streak INT NOT NULL DEFAULT 0,
+        best_streak INT NOT NULL DEFAULT 0,
+        last_completed_date DATE NULL,
+        PRIMARY KEY (user_id, habit_id),
+        FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+        FOREIGN KEY (habit_id) REFERENCES habits(habit_id) ON DELETE CASCADE
+    )
+    """)
+
+    # Backfill from the existing history
+    rebuild_all_streaks(cursor)
+
+
+# ---------------------------
+# 4: stats rollups
+# ---------------------------
+def migration_004_stats_rollups(cursor, dialect):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS stats_rollup_user (
+        user_id INT NOT NULL,
+        grain ENUM('day', 'week', 'month') NOT NULL,
+        period_start DATE NOT NULL,
+        total INT NOT NULL DEFAULT 0,
+        completed INT NOT NULL DEFAULT 0,
+        skipped INT NOT NULL DEFAULT 0,
+        missed INT NOT NULL DEFAULT 0,
+        pending INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, grain, period_start),
+        FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS stats_rollup_category (
+        user_id INT NOT NULL,
+        category_id INT NOT NULL,
+        grain ENUM('day', 'week', 'month') NOT NULL,
+        period_start DATE NOT NULL,
+        total INT NOT NULL DEFAULT 0,
+        completed INT NOT NULL DEFAULT 0,
+        skipped INT NOT NULL DEFAULT 0,
+        missed INT NOT NULL DEFAULT 0,
+        pending INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, grain, period_start, category_id),
+        FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+        FOREIGN KEY (category_id) REFERENCES categories(category_id) ON DELETE CASCADE
+    )
+    """)
+
+    # The nightly job re-sums one week/month for every user
+    add_index(cursor, dialect, "stats_rollup_user", "idx_rollup_user_period", ["grain", "period_start"])
+    add_index(cursor, dialect, "stats_rollup_category", "idx_rollup_category_period", ["grain", "period_start"])
+
+    # Backfill from the existing history
+    rebuild_all_rollups(cursor)
+
+
+# ---------------------------
+# 5: per-user data generation
+# ---------------------------
+def migration_005_user_generation(cursor, dialect):
+    # Bumped by every write to a user's habits / statuses; cached views
+    # (view_cache.py) are keyed by it.
+    add_column(cursor, dialect, "users", "data_generation", "INT NOT NULL DEFAULT 0")
+    add_column(cursor, dialect, "users", "last_write_at", "DATETIME NULL")
+
+
+# ---------------------------
+# 6: case-insensitive username lookups on SQLite
+# ---------------------------
+def migration_006_username_nocase(cursor, dialect):
+    # Username checks compare case-insensitively (availability.py). MySQL's
+    # default collation already does and uses the unique index; SQLite
+    # compares with NOCASE, which needs its own index.
+    if dialect == "sqlite":
+        add_index(cursor, dialect, "users", "idx_users_username_nocase", ["username COLLATE NOCASE"])
+
+
+MIGRATIONS = [
+    (1, "base tables", migration_001_base_tables),
+    (2, "indexes for hot lookup paths", migration_002_hot_path_indexes),
+    (3, "habit streaks", migration_003_habit_streaks),
+    (4, "stats rollups", migration_004_stats_rollups),
+    (5, "user data generation", migration_005_user_generation),
+    (6, "case-insensitive usernames on sqlite", migration_006_username_nocase),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+def ensure_version_table(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INT PRIMARY KEY,
+        description VARCHAR(255),
+        applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+
+def current_version(cursor):
+    try:
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+    except DB_ERRORS:
+        # No schema_version table yet: nothing applied
+        return 0
+    row = cursor.fetchone()
+    return (row[0] if row else None) or 0
+
+
+def upgrade(connection, target=LATEST_VERSION, echo=None):
+    # Apply every pending migration up to `target`. Returns the versions applied.
+    cursor = connection.cursor()
+    ensure_version_table(cursor)
+    version = current_version(cursor)
+    applied = []
+
+    for number, description, migrate in MIGRATIONS:
+        if number <= version or number > target:
+            continue
+        if echo:
+            echo(f"Applying migration {number}: {description}")
+        migrate(cursor, connection.dialect)
+        cursor.execute(
+            "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+            (number, description)
+        )
+        connection.commit()
+        applied.append(number)
+
+    cursor.close()
+    return applied
+
+
+# ============================================================
+# QUERY PLAN CHECK
+# ============================================================
+# EXPLAINs the queries behind the busiest pages and reports any table
+# that would be read with a full scan (MySQL type = ALL, SQLite a plain
+# "SCAN <table>"). Run it against a
+# database with realistic data: on near-empty tables MySQL may prefer
+# a scan even when a usable index exists.
+
+HOT_QUERIES = [
+    ("login by username",
+     "SELECT user_id, username, password FROM users WHERE username = %s",
+     ("someone1",), ["users"]),
+
+    ("username exists",
+     USERNAME_TAKEN_SQL,
+     ("someone1",), ["users"]),
+
+    ("login by email",
+     "SELECT user_id, username, password FROM users WHERE email = %s",
+     ("someone@gmail.com",), ["users"]),
+
+    ("category by name",
+     "SELECT category_id FROM categories WHERE category_name = %s",
+     ("Health & Wellness",), ["categories"]),
+
+    ("custom categories of user",
+     "SELECT * FROM categories WHERE is_custom=1 AND user_id=%s",
+     (1,), ["categories"]),
+
+    ("category page habits",
+     """SELECT h.habit_id, h.habit_name, ush.custom_name
+        FROM user_selected_habits ush
+        JOIN habits h ON h.habit_id = ush.habit_id
+        WHERE ush.user_id = %s AND h.category_id = %s""",
+     (1, 1), ["ush", "h"]),
+
+    ("selected habit lookup",
+     "SELECT entry_id FROM user_selected_habits WHERE user_id=%s AND habit_id=%s",
+     (1, 1), ["user_selected_habits"]),
+
+    ("today view",
+     """SELECT h.habit_id, dts.status
+        FROM user_selected_habits ush
+        JOIN habits h ON ush.habit_id = h.habit_id
+        JOIN categories c ON h.category_id = c.category_id
+        JOIN daily_task_status dts
+          ON dts.habit_id = h.habit_id
+         AND dts.user_id = ush.user_id
+         AND dts.everyday_date = CURDATE()
+        WHERE ush.user_id = %s""",
+     (1,), ["ush", "h", "c", "dts"]),
+
+    ("daily stats",
+     """SELECT period_start, total, completed
+        FROM stats_rollup_user
+        WHERE user_id = %s AND grain = 'day' AND period_start >= %s
+        ORDER BY period_start DESC""",
+     (1, "2000-01-01"), ["stats_rollup_user"]),
+
+    ("history page",
+     """SELECT everyday_date, habit_id, status
+        FROM daily_task_status
+        WHERE user_id = %s
+          AND (everyday_date < %s OR (everyday_date = %s AND habit_id < %s))
+        ORDER BY everyday_date DESC, habit_id DESC
+        LIMIT 100""",
+     (1, "2030-01-01", "2030-01-01", 1), ["daily_task_status"]),
+]
+
+
+# SQLite plan lines read "SCAN <table>" for a full table scan and
+# "SCAN <table> USING [COVERING] INDEX ..." / "SEARCH ..." otherwise.
+_SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def check_query_plans(connection):
+    # Returns a list of "<query>: full scan on <table>" problems (empty = ok)
+    cursor = connection.cursor("dict")
+    problems = []
+
+    for name, sql, params, tables in HOT_QUERIES:
+        if isinstance(sql, dict):    # per dialect
+            sql = sql[connection.dialect]
+        if connection.dialect == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            for row in cursor.fetchall():
+                match = _SQLITE_FULL_SCAN.match(row["detail"])
+                if match and match.group(1) in tables:
+                    problems.append(f"{name}: full scan on {match.group(1)}")
+            continue
+
+        cursor.execute("EXPLAIN " + sql, params)
+        for row in cursor.fetchall():
+            if row.get("table") in tables and row.get("type") == "ALL":
+                problems.append(f"{name}: full scan on {row['table']}")
+
+    cursor.close()
+    return problems
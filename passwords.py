@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# ============================================================
+# PASSWORD HASHING POOL
+# ============================================================
+# scrypt / pbkdf2 cost tens of milliseconds of CPU per call. Running them
+# on the request thread lets a burst of logins occupy every worker, so
+# hashing goes through a small bounded thread pool instead (hashlib
+# releases the GIL while it hashes, so threads run in parallel).
+#
+# At most `workers` hashes run at once and at most `max_queue` more wait.
+# Beyond that submit() raises HasherBusy right away and the caller
+# answers 503 instead of queueing requests without limit.
+#
+# `method` is a werkzeug method string ("scrypt:32768:8:1",
+# "pbkdf2:sha256:600000"). Stored hashes made with other parameters are
+# reported by needs_rehash() so login can upgrade them.
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    def __init__(self, method=DEFAULT_METHOD, workers=4, max_queue=32, timeout=10.0):
+        self.method = method
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._prefix = None
+        self._queued = 0
+        self._running = 0
+
+        # metrics
+        self.submitted = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.peak_queued = 0
+        self.wait_seconds_total = 0.0
+        self.hash_seconds_total = 0.0
+
+    def _ensure_started(self):
+        # Created lazily in the process that serves requests: threads do
+        # not survive a fork from a preloading parent.
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hash")
+                    self._pid = os.getpid()
+                    self._queued = self._running = 0
+
+    def _run(self, submitted_at, func, args):
+        started = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self.wait_seconds_total += started - submitted_at
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.hash_seconds_total += time.perf_counter() - started
+
+    def submit(self, func, *args):
+        # Run func(*args) on the pool and wait for its result
+        self._ensure_started()
+        with self._lock:
+            if self._queued >= self.max_queue + max(self.workers - self._running, 0):
+                self.rejected += 1
+                raise HasherBusy("Password hashing queue is full")
+            self._queued += 1
+            self.submitted += 1
+            self.peak_queued = max(self.peak_queued, self._queued)
+        future = self._executor.submit(self._run, time.perf_counter(), func, args)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HasherBusy(f"Password hashing took longer than {self.timeout}s") from None
+
+    def hash(self, password):
+        return self.submit(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self.submit(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        # Compare the "method:params" part in front of the salt with what
+        # the configured method produces (werkzeug fills in defaults)
+        if self._prefix is None:
+            self._prefix = self.hash("").split("$", 1)[0]
+        return pwhash.split("$", 1)[0] != self._prefix
+
+    def rehash(self, pwhash, password):
+        # After a successful verify: a new hash with the current method,
+        # or None when the stored one is already current
+        if not self.needs_rehash(pwhash):
+            return None
+        new_hash = self.hash(password)
+        with self._lock:
+            self.rehashed += 1
+        return new_hash
+
+    def stats(self):
+        with self._lock:
+            return {
+                "method": self.method,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self._queued,
+                "running": self._running,
+                "peak_queued": self.peak_queued,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_avg": (self.wait_seconds_total / self.submitted) if self.submitted else 0.0,
+                "hash_seconds_total": self.hash_seconds_total
+            }
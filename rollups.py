@@ -0,0 +1,279 @@
+from collections import defaultdict
+from datetime import timedelta
+
+# ============================================================
+# STATS ROLLUPS
+# ============================================================
+# Pre-aggregated status counts per user (stats_rollup_user) and per
+# user + category (stats_rollup_category) at three grains:
+#   day    one row per date
+#   week   ISO week, period_start is the Monday
+#   month  period_start is the 1st
+#
+# Day rows are aggregated from daily_task_status; week and month rows
+# are aggregated from the day rows. The status write path refreshes the
+# periods it touched; rebuild_rollups() recomputes a whole user.
+
+GRAINS = ("day", "week", "month")
+COUNT_COLUMNS = ("total", "completed", "skipped", "missed", "pending")
+
+STATUS_COUNTS_SQL = """COUNT(*),
+               SUM(dts.status = 'Completed'),
+               SUM(dts.status = 'Skipped'),
+               SUM(dts.status = 'Missed'),
+               SUM(dts.status = 'Pending')"""
+
+ROLLUP_SUMS_SQL = "SUM(total), SUM(completed), SUM(skipped), SUM(missed), SUM(pending)"
+
+UPSERT_COUNTS_SQL = """ON DUPLICATE KEY UPDATE total = VALUES(total),
+                                completed = VALUES(completed),
+                                skipped = VALUES(skipped),
+                                missed = VALUES(missed),
+                                pending = VALUES(pending)"""
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def month_end(day):
+    next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+def period_bounds(grain, day):
+    # (first, last) day of the period of `grain` containing `day`
+    if grain == "week":
+        first = week_start(day)
+        return first, first + timedelta(days=6)
+    if grain == "month":
+        return month_start(day), month_end(day)
+    return day, day
+
+
+def _in_list(values):
+    return ", ".join(["%s"] * len(values))
+
+
+# ============================================================
+# INCREMENTAL REFRESH (status write path)
+# ============================================================
+
+def refresh_user_days(cursor, user_days, removed=False):
+    # Recompute the day / week / month rows containing the given
+    # (user_id, day) pairs. Runs in the writer's transaction.
+    # removed=True after status rows were deleted (a habit went away):
+    # rows of days / periods that lost their last status row are dropped
+    # too. Status writes only add or change rows and skip that.
+    days_by_user = defaultdict(set)
+    for user_id, day in user_days:
+        days_by_user[user_id].add(day)
+
+    for user_id, days in days_by_user.items():
+        days = sorted(days)
+        periods = sorted({(grain, *period_bounds(grain, day)) for day in days for grain in ("week", "month")})
+
+        if removed:
+            _delete_periods(cursor, user_id, days, periods)
+
+        cursor.execute(f"""
+            INSERT INTO stats_rollup_user (user_id, grain, period_start, total, completed, skipped, missed, pending)
+            SELECT dts.user_id, 'day', dts.everyday_date,
+               {STATUS_COUNTS_SQL}
+            FROM daily_task_status dts
+            WHERE dts.user_id = %s AND dts.everyday_date IN ({_in_list(days)})
+            GROUP BY dts.user_id, dts.everyday_date
+            {UPSERT_COUNTS_SQL}
+        """, (user_id, *days))
+
+        cursor.execute(f"""
+            INSERT INTO stats_rollup_category (user_id, category_id, grain, period_start, total, completed, skipped, missed, pending)
+            SELECT dts.user_id, h.category_id, 'day', dts.everyday_date,
+               {STATUS_COUNTS_SQL}
+            FROM daily_task_status dts
+            JOIN habits h ON h.habit_id = dts.habit_id
+            WHERE dts.user_id = %s AND dts.everyday_date IN ({_in_list(days)})
+            GROUP BY dts.user_id, h.category_id, dts.everyday_date
+            {UPSERT_COUNTS_SQL}
+        """, (user_id, *days))
+
+        if removed:
+            _resum_periods(cursor, user_id, periods)
+        else:
+            for grain, first, last in periods:
+                _refresh_period(cursor, grain, first, last, user_id=user_id)
+
+
+def _delete_periods(cursor, user_id, days, periods):
+    # Clear the affected rows first: a day (or a category on that day)
+    # whose last status row is gone must lose its row, not keep the old
+    # counts because nothing re-aggregates it
+    starts = {"day": days}
+    for grain, first, _ in periods:
+        starts.setdefault(grain, []).append(first)
+    for table in ("stats_rollup_user", "stats_rollup_category"):
+        for grain, firsts in starts.items():
+            cursor.execute(f"""
+                DELETE FROM {table}
+                WHERE user_id = %s AND grain = %s AND period_start IN ({_in_list(firsts)})
+            """, (user_id, grain, *firsts))
+
+
+def _resum_periods(cursor, user_id, periods):
+    # All affected weeks / months of one user re-summed from their day
+    # rows: one read and one (chunked) upsert per table, however many
+    # periods a removed habit's history spans
+    wanted = {(grain, first) for grain, first, _ in periods}
+    first = min(period[1] for period in periods)
+    last = max(period[2] for period in periods)
+    for table, key_columns in (("stats_rollup_user", ("user_id",)),
+                               ("stats_rollup_category", ("user_id", "category_id"))):
+        cursor.execute(f"""
+            SELECT {", ".join(key_columns)}, period_start, {", ".join(COUNT_COLUMNS)}
+            FROM {table}
+            WHERE user_id = %s AND grain = 'day' AND period_start BETWEEN %s AND %s
+        """, (user_id, first, last))
+        key_len = len(key_columns)
+        rows = [row for row in _coarser_rows(cursor.fetchall(), key_len)
+                if (row[key_len], row[key_len + 1]) in wanted]
+        _insert_rows(cursor, table, key_columns + ("grain", "period_start") + COUNT_COLUMNS, rows)
+
+
+def habit_days(cursor, user_id, habit_id):
+    # (user_id, day) pairs a habit has status rows on; read them before
+    # deleting the habit (its history goes with it) and refresh after
+    cursor.execute("""
+        SELECT DISTINCT everyday_date FROM daily_task_status
+        WHERE user_id = %s AND habit_id = %s
+    """, (user_id, habit_id))
+    return [(user_id, row[0]) for row in cursor.fetchall()]
+
+
+def _refresh_period(cursor, grain, first, last, user_id=None):
+    # Re-sum one week/month from its day rows, for one user or for everyone
+    user_filter = "AND user_id = %s" if user_id is not None else ""
+    user_params = (user_id,) if user_id is not None else ()
+
+    cursor.execute(f"""
+        INSERT INTO stats_rollup_user (user_id, grain, period_start, total, completed, skipped, missed, pending)
+        SELECT user_id, %s, %s, {ROLLUP_SUMS_SQL}
+        FROM stats_rollup_user
+        WHERE grain = 'day' AND period_start BETWEEN %s AND %s {user_filter}
+        GROUP BY user_id
+        {UPSERT_COUNTS_SQL}
+    """, (grain, first, first, last, *user_params))
+
+    cursor.execute(f"""
+        INSERT INTO stats_rollup_category (user_id, category_id, grain, period_start, total, completed, skipped, missed, pending)
+        SELECT user_id, category_id, %s, %s, {ROLLUP_SUMS_SQL}
+        FROM stats_rollup_category
+        WHERE grain = 'day' AND period_start BETWEEN %s AND %s {user_filter}
+        GROUP BY user_id, category_id
+        {UPSERT_COUNTS_SQL}
+    """, (grain, first, first, last, *user_params))
+
+
+def refresh_day_all_users(cursor, day):
+    # Batch variant for the nightly job: one day (and its week/month) for
+    # every user at once.
+    cursor.execute(f"""
+        INSERT INTO stats_rollup_user (user_id, grain, period_start, total, completed, skipped, missed, pending)
+        SELECT dts.user_id, 'day', dts.everyday_date,
+               {STATUS_COUNTS_SQL}
+        FROM daily_task_status dts
+        WHERE dts.everyday_date = %s
+        GROUP BY dts.user_id, dts.everyday_date
+        {UPSERT_COUNTS_SQL}
+    """, (day,))
+
+    cursor.execute(f"""
+        INSERT INTO stats_rollup_category (user_id, category_id, grain, period_start, total, completed, skipped, missed, pending)
+        SELECT dts.user_id, h.category_id, 'day', dts.everyday_date,
+               {STATUS_COUNTS_SQL}
+        FROM daily_task_status dts
+        JOIN habits h ON h.habit_id = dts.habit_id
+        WHERE dts.everyday_date = %s
+        GROUP BY dts.user_id, h.category_id, dts.everyday_date
+        {UPSERT_COUNTS_SQL}
+    """, (day,))
+
+    for grain in ("week", "month"):
+        first, last = period_bounds(grain, day)
+        _refresh_period(cursor, grain, first, last)
+
+
+# ============================================================
+# FULL REBUILD
+# ============================================================
+
+def _coarser_rows(day_rows, key_len):
+    # day_rows: (key..., period_start, counts...) tuples where the key has
+    # `key_len` columns. Returns week and month rows in the same layout,
+    # with the grain inserted after the key.
+    sums = defaultdict(lambda: [0] * len(COUNT_COLUMNS))
+    for row in day_rows:
+        key, day, counts = row[:key_len], row[key_len], row[key_len + 1:]
+        for grain in ("week", "month"):
+            bucket = sums[(*key, grain, period_bounds(grain, day)[0])]
+            for i, count in enumerate(counts):
+                bucket[i] += int(count or 0)
+    return [(*key, *values) for key, values in sums.items()]
+
+
+def _insert_rows(cursor, table, columns, rows, chunk_size=1000):
+    for offset in range(0, len(rows), chunk_size):
+        chunk = rows[offset:offset + chunk_size]
+        placeholders = ", ".join(["(" + _in_list(columns) + ")"] * len(chunk))
+        cursor.execute(f"""
+            INSERT INTO {table} ({", ".join(columns)})
+            VALUES {placeholders}
+            {UPSERT_COUNTS_SQL}
+        """, [value for row in chunk for value in row])
+
+
+def rebuild_rollups(cursor, user_id):
+    # Drop and recompute every rollup row of one user
+    cursor.execute("DELETE FROM stats_rollup_user WHERE user_id = %s", (user_id,))
+    cursor.execute("DELETE FROM stats_rollup_category WHERE user_id = %s", (user_id,))
+
+    cursor.execute(f"""
+        SELECT dts.user_id, dts.everyday_date,
+               {STATUS_COUNTS_SQL}
+        FROM daily_task_status dts
+        WHERE dts.user_id = %s
+        GROUP BY dts.user_id, dts.everyday_date
+    """, (user_id,))
+    user_days = cursor.fetchall()
+
+    cursor.execute(f"""
+        SELECT dts.user_id, h.category_id, dts.everyday_date,
+               {STATUS_COUNTS_SQL}
+        FROM daily_task_status dts
+        JOIN habits h ON h.habit_id = dts.habit_id
+        WHERE dts.user_id = %s
+        GROUP BY dts.user_id, h.category_id, dts.everyday_date
+    """, (user_id,))
+    category_days = cursor.fetchall()
+
+    user_columns = ("user_id", "grain", "period_start") + COUNT_COLUMNS
+    category_columns = ("user_id", "category_id", "grain", "period_start") + COUNT_COLUMNS
+
+    _insert_rows(cursor, "stats_rollup_user", user_columns,
+                 [(row[0], "day", *row[1:]) for row in user_days] + _coarser_rows(user_days, 1))
+    _insert_rows(cursor, "stats_rollup_category", category_columns,
+                 [(row[0], row[1], "day", *row[2:]) for row in category_days] + _coarser_rows(category_days, 2))
+    return len(user_days)
+
+
+def rebuild_all_rollups(cursor, progress=None):
+    cursor.execute("SELECT DISTINCT user_id FROM daily_task_status ORDER BY user_id")
+    user_ids = [row[0] for row in cursor.fetchall()]
+    for done, user_id in enumerate(user_ids, start=1):
+        rebuild_rollups(cursor, user_id)
+        if progress:
+            progress(done, len(user_ids))
+    return len(user_ids)
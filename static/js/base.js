@@ -0,0 +1,14 @@
+function openSidebar() {
+  document.getElementById("sidebar").style.width = "250px";
+}
+function closeSidebar() {
+  document.getElementById("sidebar").style.width = "0";
+}
+
+// 🔹 Auto-hide flash messages (bottom-right)
+setTimeout(() => {
+  const flashContainer = document.getElementById("flash-container");
+  if (flashContainer) {
+    flashContainer.style.display = "none";
+  }
+}, 3000);
@@ -0,0 +1,335 @@
+//-----------------------------------
+// First Name - Last Name Validation
+//-----------------------------------
+
+function capitalizeFirstLetter(input) {
+  if (input.value.length > 0) {
+    input.value = input.value.charAt(0).toUpperCase() + input.value.slice(1).toLowerCase();
+  }
+}
+
+// Ensure names are formatted before submission
+function formatNamesBeforeSubmit() {
+  const firstName = document.getElementById('first_name');
+  const lastName = document.getElementById('last_name');
+  capitalizeFirstLetter(firstName);
+  capitalizeFirstLetter(lastName);
+}
+
+//----------------------------
+// First Name Last Name Validation
+//----------------------------
+function validateProfileForm() {
+  const firstName = document.getElementById("first_name").value.trim();
+  const lastName = document.getElementById("last_name").value.trim();
+
+  const namePattern = /^[A-Z][a-z]{2,19}$/; // 1 uppercase + 2–19 lowercase only
+
+  if (!namePattern.test(firstName) || !namePattern.test(lastName)) {
+    alert("First Name and Last Name must start with a capital letter, followed by lowercase letters only (3–20 total).");
+    return false;
+  }
+
+  return true;
+}
+
+// Attach input event to capitalize while typing
+document.addEventListener("DOMContentLoaded", function() {
+  const firstNameInput = document.getElementById("first_name");
+  const lastNameInput = document.getElementById("last_name");
+
+  firstNameInput.addEventListener("input", function() {
+    capitalizeFirstLetter(firstNameInput);
+  });
+
+  lastNameInput.addEventListener("input", function() {
+    capitalizeFirstLetter(lastNameInput);
+  });
+
+  // Ensure capitalization before form submission
+  const form = firstNameInput.closest("form");
+  form.addEventListener("submit", function() {
+    formatNamesBeforeSubmit();
+  });
+});
+
+// -------------------------
+// Username Validation
+// -------------------------
+const usernameInput = document.getElementById("username");
+const usernameError = document.getElementById("username_error");
+
+usernameInput.addEventListener("input", function() {
+  let val = this.value;
+
+  // Remove invalid characters (non-alphanumeric)
+  val = val.replace(/[^A-Za-z0-9]/g, "");
+  this.value = val;
+
+  let errorMsg = "";
+
+  // Rule 1: Length 5-20
+  if (val.length < 5 || val.length > 20) {
+    errorMsg = "Username should range in between 5-20 characters";
+  }
+  // Rule 2: Must contain at least 1 alphabet and 1 numeral
+  else if (!(/[A-Za-z]/.test(val) && /[0-9]/.test(val))) {
+    errorMsg = "Username must contain at least 1 alphabet and 1 numeral";
+  }
+
+  // Display error if any
+  if (errorMsg !== "") {
+    usernameError.innerText = errorMsg;
+    usernameError.style.display = "block";
+    return; // Stop AJAX call if front-end validation fails
+  } else {
+    usernameError.innerText = "";
+    usernameError.style.display = "none";
+
+
+    // AJAX: check uniqueness
+    fetch("/check_username", {
+      method: "POST",
+      headers: { "Content-Type": "application/x-www-form-urlencoded" },
+      body: "username=" + encodeURIComponent(val)
+    })
+    .then(res => res.json())
+    .then(data => {
+      if (data.status === "error") {
+        usernameError.innerText = data.message;
+        usernameError.style.display = "block";
+      } else {
+        usernameError.innerText = "";
+        usernameError.style.display = "none";
+      }
+    })
+    .catch(err => {
+      console.error("Username check failed:", err);
+    });
+  }
+});
+
+// -------------------------
+// DOB Validation
+// -------------------------
+document.addEventListener("DOMContentLoaded", function () {
+  const dobField = document.getElementById("dob");
+  const dobError = document.getElementById("dob-error");
+
+  function validateDOB() {
+    const val = dobField.value;
+    if (!val) {
+      dobError.textContent = "Required field*";
+      return false;
+    }
+
+    const parts = val.split("-");
+    if (parts.length === 3) {
+      const year = parseInt(parts[0]);
+      const month = parseInt(parts[1]) - 1; // JS month is 0-based
+      const day = parseInt(parts[2]);
+      const enteredDate = new Date(year, month, day);
+      const today = new Date();
+
+      if (year > today.getFullYear()) {
+        dobError.textContent = `DOB cannot be beyond ${today.getFullYear()}`;
+        return false;
+      }
+
+      if (enteredDate > today) {
+        const mm = String(today.getMonth() + 1).padStart(2, "0");
+        const dd = String(today.getDate()).padStart(2, "0");
+        const yyyy = today.getFullYear();
+        dobError.textContent = `Date cannot be in the future* (max ${mm}/${dd}/${yyyy})`;
+        return false;
+      }
+    }
+
+    dobError.textContent = "";
+    return true;
+  }
+
+  dobField.addEventListener("change", validateDOB);
+
+  // Validate on form submit
+  const form = dobField.closest("form");
+  form.addEventListener("submit", function (e) {
+    if (!validateDOB()) {
+      e.preventDefault();
+    }
+  });
+});
+
+// -------------------------
+// Mobile No Validation
+// -------------------------
+
+const mobileInput = document.getElementById("mobile");
+const mobileError = document.getElementById("mobile-error");
+
+function validateMobile(value) {
+  if (!value) {
+    mobileError.innerText = "Required field*";
+    mobileError.style.display = "block";
+  } else if (!/^[6-9][0-9]{9}$/.test(value)) {
+    if (value.length < 10) {
+      mobileError.innerText = "Mobile No. should have 10 digits*";
+    } else {
+      mobileError.innerText = "Mobile No. must start with 6,7,8, or 9*";
+    }
+    mobileError.style.display = "block";
+  } else {
+    mobileError.style.display = "none";
+  }
+}
+
+// Restrict typing to digits only
+mobileInput.addEventListener("input", function() {
+  this.value = this.value.replace(/[^0-9]/g, "").slice(0, 10);
+  validateMobile(this.value);
+});
+
+// Handle paste event
+mobileInput.addEventListener("paste", function(e) {
+  e.preventDefault();
+  let pasted = (e.clipboardData || window.clipboardData).getData("text");
+  pasted = pasted.replace(/[^0-9]/g, "").slice(0, 10);
+  this.value = pasted;
+  validateMobile(this.value);
+});
+
+// Optional: validate on blur
+mobileInput.addEventListener("blur", function() {
+  validateMobile(this.value);
+});
+
+//--------------------------
+// Email Validation
+//--------------------------
+
+document.getElementById('email').addEventListener('input', function() {
+  const email = this.value.trim();
+  const error = document.getElementById('email_error');
+
+  // ✅ Allowed domains
+  const allowedDomains = [
+    "gmail.com", "yahoo.com", "outlook.com", "hotmail.com",
+    "icloud.com", "live.com", "aol.com", "protonmail.com", "zoho.com", "rediffmail.com"
+  ];
+
+  // ✅ Regex: min 5 chars before @, lowercase letters/numbers/._ only
+  const emailPattern = /^[a-z0-9._]{5,}@[a-z0-9.-]+\.[a-z]{2,}$/;
+
+  if (email === "") {
+    error.style.display = "none";
+    return;
+  }
+
+  if (!emailPattern.test(email)) {
+    error.textContent = "Invalid format: min 5 lowercase letters/numbers/._ before @";
+    error.style.display = "block";
+    return;
+  }
+
+  const [username, domain] = email.split('@');
+
+  // ✅ Check if domain is allowed
+  if (!allowedDomains.includes(domain)) {
+    error.textContent = "Email must end with one of: " + allowedDomains.join(', ');
+    error.style.display = "block";
+    return;
+  }
+
+  // ✅ Check for repeated characters (like aaaaa, 11111, ......)
+  if (/^(.)\1+$/.test(username)) {
+    error.textContent = "Username part cannot have all repeated characters";
+    error.style.display = "block";
+    return;
+  }
+
+  error.style.display = "none";
+});
+
+//---------------------------
+// Password Validation
+//---------------------------
+function validatePassword(input) {
+  const password = input.value.trim();
+  const errorRule = document.getElementById("passwordError");
+  const errorLength = document.getElementById("passwordLengthError");
+
+  // Regex: at least one uppercase, one number, one special character
+  const ruleRegex = /^(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]*$/;
+
+  errorRule.textContent = "";
+  errorLength.textContent = "";
+  input.style.borderColor = "";
+
+  if (password.length === 0) {
+    errorRule.textContent = "Required field*";
+    input.style.borderColor = "red";
+    return;
+  }
+
+  if (!ruleRegex.test(password)) {
+    errorRule.textContent = "Password must contain atleast one uppercase letter, one number and one special character each. And Password length must be in between 8 to 30 characters*";
+    input.style.borderColor = "red";
+  }
+
+  if (password.length < 8 || password.length > 30) {
+    errorLength.textContent = "Password must contain atleast one uppercase letter, one number and one special character. And Password length must be in between 8 to 30 characters*";
+    input.style.borderColor = "red";
+  }
+
+  if (ruleRegex.test(password) && password.length >= 8 && password.length <= 30) {
+    input.style.borderColor = "green";
+  }
+}
+
+
+// ---------------------------------
+// Capital Letter Validation
+// ---------------------------------
+document.addEventListener("DOMContentLoaded", function() {
+  const firstName = document.getElementById("first_name");
+  const lastName = document.getElementById("last_name");
+  const firstNameError = document.getElementById("first_name_error");
+  const lastNameError = document.getElementById("last_name_error");
+
+  function checkUppercase(input, errorField) {
+    let value = input.value;
+
+    // If first character exists and is not uppercase
+    if (value.length > 0 && !/^[A-Z]/.test(value.charAt(0))) {
+      errorField.innerText = "First letter should be in Uppercase";
+      errorField.style.display = "block";
+      input.value = ""; // clear field to force correct input
+      input.style.borderColor = "red";
+    } else {
+      errorField.style.display = "none";
+      input.style.borderColor = "green";
+    }
+  }
+
+  // Run on input and paste
+  firstName.addEventListener("input", function() {
+    checkUppercase(firstName, firstNameError);
+  });
+  lastName.addEventListener("input", function() {
+    checkUppercase(lastName, lastNameError);
+  });
+
+  firstName.addEventListener("paste", function(e) {
+    e.preventDefault();
+    const pasted = (e.clipboardData || window.clipboardData).getData("text");
+    this.value = pasted;
+    checkUppercase(firstName, firstNameError);
+  });
+
+  lastName.addEventListener("paste", function(e) {
+    e.preventDefault();
+    const pasted = (e.clipboardData || window.clipboardData).getData("text");
+    this.value = pasted;
+    checkUppercase(lastName, lastNameError);
+  });
+});
@@ -0,0 +1,158 @@
+// -----------------------------------------
+// Add Yours Modal
+// -----------------------------------------
+document.getElementById("openModal").onclick = function() {
+  document.getElementById("habitModal").style.display = "flex";
+};
+document.getElementById("closeModal").onclick = function() {
+  document.getElementById("habitModal").style.display = "none";
+};
+
+// Open Edit Modal with habit data
+document.querySelectorAll(".edit-btn").forEach(btn => {
+  btn.addEventListener("click", function() {
+    document.getElementById("editHabitId").value = this.dataset.habitId;
+    document.getElementById("editHabitInput").value = this.dataset.habitName;
+    document.getElementById("editHabitModal").style.display = "flex";
+  });
+});
+
+document.getElementById("closeEditModal").onclick = function() {
+  document.getElementById("editHabitModal").style.display = "none";
+};
+
+// -------------------------------------------
+// Add New Habit Validation
+// -------------------------------------------
+const habitInput = document.getElementById("newHabitInput");
+const habitForm = document.getElementById("addHabitForm");
+const habitError = document.getElementById("habitError");
+
+function capitalizeFirstLetter(input) {
+  if (input.value.length > 0) {
+    input.value = input.value.charAt(0).toUpperCase() + input.value.slice(1);
+  }
+}
+
+const habitPattern = /^[A-Z][A-Za-z0-9 ]{4,29}$/; // 5-30 chars, first capital
+
+function hasRepeatedChars(str) {
+  // Remove spaces and ignore case
+  const cleanStr = str.replace(/\s/g, '').toLowerCase();
+  // Match any character repeated 5+ times consecutively
+  return /(.)\1{4,}/.test(cleanStr);
+}
+
+
+// --------------------------
+// Real-time validation on input
+// --------------------------
+habitInput.addEventListener("input", function() {
+  capitalizeFirstLetter(habitInput);
+
+  const val = habitInput.value.trim();
+
+  if (val.length > 0 && val.length < 5) {
+    habitError.textContent = "Habit name should be 5 to 30 characters long";
+  } else if (!habitPattern.test(val) && val.length >= 5) {
+    habitError.textContent = "Start with capital letter. Only letters, numbers and space allowed.";
+  } else if (hasRepeatedChars(val)) {
+    habitError.textContent = "Do not enter repeated characters like 'aaaaa' or '11111'.";
+  } else {
+    habitError.textContent = "";
+  }
+});
+
+// --------------------------
+// Submit-time validation
+// --------------------------
+habitForm.addEventListener("submit", function(e) {
+  const val = habitInput.value.trim();
+
+  if (val.length < 5 || val.length > 30) {
+    habitError.textContent = "Habit name should be 5 to 30 characters long";
+    e.preventDefault();
+    return;
+  }
+
+  if (!habitPattern.test(val)) {
+    habitError.textContent = "Start with capital letter. Only letters, numbers, and space allowed.";
+    e.preventDefault();
+    return;
+  }
+
+  if (hasRepeatedChars(val)) {
+    habitError.textContent = "Do not enter repeated characters like 'aaaaa' or '11111'";
+    e.preventDefault();
+    return;
+  }
+
+  habitError.textContent = "";
+});
+
+// -------------------------------------------
+// Remove Habit (Custom Category)
+// -------------------------------------------
+document.querySelectorAll(".remove-btn").forEach(btn => {
+  btn.addEventListener("click", function() {
+    const habitId = this.dataset.habitId;
+    const categoryId = this.dataset.categoryId;
+    const habitCard = document.getElementById(`habit-${habitId}`);
+
+    if (!habitCard) return;
+
+    // Smooth fade-out animation
+    habitCard.style.transition = "opacity 0.3s ease, transform 0.3s ease";
+    habitCard.style.opacity = "0";
+    habitCard.style.transform = "scale(0.9)";
+
+    // Remove from DOM after animation
+    setTimeout(() => {
+      habitCard.remove();
+
+      // Send POST request to remove habit in backend
+      fetch(`/remove_custom_habit/${categoryId}/${habitId}`, { method: "POST" });
+    }, 300);
+  });
+});
+
+
+// --------------------------
+// Edit Habit Validation
+// --------------------------
+const editHabitInput = document.getElementById("editHabitInput");
+const editHabitForm = document.getElementById("editHabitForm");
+const editHabitError = document.getElementById("editHabitError");
+
+function validateHabitInput(inputEl, errorEl) {
+  // Capitalize first letter
+  if (inputEl.value.length > 0) {
+    inputEl.value = inputEl.value.charAt(0).toUpperCase() + inputEl.value.slice(1);
+  }
+
+  const val = inputEl.value.trim();
+
+  if (val.length < 5 || val.length > 30) {
+    errorEl.textContent = "Habit name should be 5 to 30 characters long";
+    return false;
+  }
+  if (!habitPattern.test(val)) {
+    errorEl.textContent = "Start with capital letter. Only letters, numbers and space allowed.";
+    return false;
+  }
+  if (hasRepeatedChars(val)) {
+    errorEl.textContent = "Do not enter repeated characters like 'aaaaa' or '11111'";
+    return false;
+  }
+
+  errorEl.textContent = "";
+  return true;
+}
+
+// Real-time input validation
+editHabitInput.addEventListener("input", () => validateHabitInput(editHabitInput, editHabitError));
+
+// Form submit validation
+editHabitForm.addEventListener("submit", function(e) {
+  if (!validateHabitInput(editHabitInput, editHabitError)) e.preventDefault();
+});
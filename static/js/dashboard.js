@@ -0,0 +1,100 @@
+// create_category URL, from the <script> tag
+const CREATE_URL = document.currentScript.dataset.createUrl;
+
+// Open/Close Modal
+const modal = document.getElementById("customModal");
+const openBtn = document.getElementById("openModalBtn");
+const closeBtn = document.getElementById("closeModalBtn");
+
+openBtn.onclick = () => modal.style.display = "flex";
+closeBtn.onclick = () => modal.style.display = "none";
+window.onclick = e => { if(e.target == modal) modal.style.display = "none"; }
+
+// Handle Form Submission via AJAX
+const form = document.getElementById("createCategoryForm");
+const categoryInput = document.getElementById("newCategoryInput");
+
+// Create an error message element
+let errorMsg = document.createElement("small");
+errorMsg.style.color = "red";
+errorMsg.style.display = "block";
+errorMsg.style.marginTop = "-12px";
+categoryInput.parentNode.insertBefore(errorMsg, categoryInput.nextSibling);
+
+// Function to capitalize first letter
+function capitalizeFirstLetter(input) {
+  if(input.value.length > 0){
+    input.value = input.value.charAt(0).toUpperCase() + input.value.slice(1);
+  }
+}
+
+// Validate category input
+function validateCategory(name) {
+  // 1. Only letters, numbers, space allowed
+  if (!/^[A-Za-z0-9 ]*$/.test(name)) {
+    errorMsg.innerText = "Only letters, numbers and space allowed";
+    return false;
+  }
+
+  // 2. Length 5-20
+  if (name.length < 5 || name.length > 20) {
+    errorMsg.innerText = "Category name should be 5 to 20 characters long";
+    return false;
+  }
+
+  // 3. First letter must be uppercase
+  if (!/^[A-Z]/.test(name)) {
+    errorMsg.innerText = "First letter must be uppercase";
+    return false;
+  }
+
+  // 4. Prevent repeated single character like aaaaaaaaa or 11111111
+  const rest = name.slice(1);
+  if (/^(.)\1+$/.test(rest)) {
+    errorMsg.innerText = "Repeated characters not allowed";
+    return false;
+  }
+
+  errorMsg.innerText = "";
+  return true;
+}
+
+// Force allowed characters while typing
+categoryInput.addEventListener("input", () => {
+  // Remove invalid characters immediately
+  categoryInput.value = categoryInput.value.replace(/[^A-Za-z0-9 ]/g, '');
+  capitalizeFirstLetter(categoryInput);
+  validateCategory(categoryInput.value.trim());
+});
+
+form.addEventListener("submit", async (e) => {
+  e.preventDefault();
+  const categoryName = categoryInput.value.trim();
+
+  if (!validateCategory(categoryName)) return; // stop submission if invalid
+
+  try {
+    const response = await fetch(CREATE_URL, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ category_name: categoryName })
+    });
+    const data = await response.json();
+    if(data.success) {
+      const grid = document.getElementById("categoriesGrid");
+      const newTab = document.createElement("a");
+      newTab.href = data.url;
+      newTab.className = "category";
+      newTab.textContent = categoryName;
+      grid.insertBefore(newTab, openBtn); // insert before Custom button
+      modal.style.display = "none";
+      form.reset();
+      errorMsg.innerText = "";
+    } else {
+      alert(data.message || "Error creating category");
+    }
+  } catch(err) {
+    console.error(err);
+    alert("Server error. Try again.");
+  }
+});
@@ -0,0 +1,82 @@
+// ✅ This runs whenever a checkbox is clicked
+function toggleHabitStatus(checkbox) {
+    const habitItem = checkbox.closest('.habit-item');
+    const habitCard = habitItem.querySelector('.habit-card');
+    const removeBtn = habitItem.querySelector('form');
+    const span = checkbox.nextElementSibling;
+    const isChecked = checkbox.checked;
+
+    // ✅ Step 1: Hide checkbox + remove button
+    checkbox.style.visibility = "hidden";
+    if (span) span.style.visibility = "hidden";
+    if (removeBtn) removeBtn.style.visibility = "hidden";
+
+    // ✅ Step 2: Add "completed" style
+    if (habitCard) {
+        if (isChecked) habitCard.classList.add('completed');
+        else habitCard.classList.remove('completed');
+    }
+
+    // ✅ Step 3: Queue status for the backend (sent in one batch)
+    queueStatusUpdate(checkbox.dataset.habitId, isChecked ? 'Completed' : 'Pending');
+}
+
+// ✅ Clicks made in quick succession are sent together to the batch endpoint
+const BATCH_URL = document.currentScript.dataset.batchUrl;   // from the <script> tag
+const pendingUpdates = new Map();   // habit_id -> status (latest wins)
+let flushTimer = null;
+
+function queueStatusUpdate(habitId, status) {
+    pendingUpdates.set(habitId, status);
+    clearTimeout(flushTimer);
+    flushTimer = setTimeout(flushStatusUpdates, 400);
+}
+
+function takePendingUpdates() {
+    const updates = Array.from(pendingUpdates, ([habit_id, status]) => ({ habit_id, status }));
+    pendingUpdates.clear();
+    clearTimeout(flushTimer);
+    return updates;
+}
+
+function flushStatusUpdates() {
+    const updates = takePendingUpdates();
+    if (!updates.length) return;
+
+    fetch(BATCH_URL, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ updates })
+    })
+    .then(res => res.json())
+    .then(data => console.log("Statuses updated:", data.applied))
+    .catch(err => console.error("Error:", err));
+}
+
+// ✅ Don't lose queued clicks when leaving the page
+window.addEventListener("pagehide", () => {
+    const updates = takePendingUpdates();
+    if (!updates.length) return;
+    navigator.sendBeacon(BATCH_URL, new Blob([JSON.stringify({ updates })], { type: "application/json" }));
+});
+
+// ✅ This runs automatically when the page loads
+document.addEventListener("DOMContentLoaded", () => {
+    document.querySelectorAll('input[type="checkbox"][data-habit-id]').forEach(checkbox => {
+        const habitItem = checkbox.closest('.habit-item');
+        const habitCard = habitItem.querySelector('.habit-card');
+        const removeBtn = habitItem.querySelector('form');
+        const span = checkbox.nextElementSibling;
+
+        // Check if it’s marked completed in backend (Jinja renders this)
+        const isCompleted = checkbox.hasAttribute('checked');
+
+        if (isCompleted) {
+            // Hide checkbox + remove button on load
+            checkbox.style.visibility = "hidden";
+            if (span) span.style.visibility = "hidden";
+            if (removeBtn) removeBtn.style.visibility = "hidden";
+            if (habitCard) habitCard.classList.add('completed');
+        }
+    });
+});
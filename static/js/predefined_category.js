@@ -0,0 +1,112 @@
+// Add Yours Modal
+const modal = document.getElementById("habitModal");
+const openModal = document.getElementById("openModal");
+const closeModal = document.getElementById("closeModal");
+
+openModal.addEventListener("click", () => { modal.style.display = "flex"; });
+closeModal.addEventListener("click", () => { modal.style.display = "none"; });
+window.addEventListener("click", (e) => { if(e.target === modal) modal.style.display = "none"; });
+
+// Edit Habit Modal
+const editModal = document.getElementById("editHabitModal");
+const closeEditModal = document.getElementById("closeEditModal");
+const editHabitInput = document.getElementById("editHabitInput");
+const editHabitId = document.getElementById("editHabitId");
+
+document.querySelectorAll(".edit-btn").forEach(btn => {
+  btn.addEventListener("click", () => {
+    editHabitInput.value = btn.dataset.habitName;
+    editHabitId.value = btn.dataset.habitId;
+    editModal.style.display = "flex";
+  });
+});
+
+closeEditModal.addEventListener("click", () => { editModal.style.display = "none"; });
+window.addEventListener("click", (e) => { if(e.target === editModal) editModal.style.display = "none"; });
+
+
+// Custom habit instant removal
+document.querySelectorAll(".remove-btn").forEach(btn => {
+  btn.addEventListener("click", function(e) {
+    const isCustom = this.dataset.isCustom === "1";
+    const habitId = this.dataset.habitId;
+    const habitCard = document.getElementById(`habit-${habitId}`);
+
+    // If it's a custom habit, prevent normal form submission
+    if (isCustom) {
+      e.preventDefault();
+
+      if (!habitCard) return;
+
+      // Animate fade-out
+      habitCard.style.transition = "opacity 0.3s ease, transform 0.3s ease";
+      habitCard.style.opacity = "0";
+      habitCard.style.transform = "scale(0.9)";
+
+      setTimeout(() => {
+        habitCard.remove();
+      }, 300);
+
+      // Send AJAX request to remove from backend
+      fetch(this.form.action, {
+        method: "POST"
+      }).catch(() => {
+        console.error("Error removing habit");
+      });
+    }
+    // Else: let normal form submission happen for predefined/edited habits
+  });
+});
+
+// ------------------- Habit Validation -------------------
+const habitRegex = /^[A-Z][A-Za-z0-9 ]{4,29}$/;
+
+function validateHabitInput(inputEl, errorEl) {
+  let value = inputEl.value.trim();
+
+  // Auto-capitalize first letter
+  if (value.length > 0) {
+    inputEl.value = value.charAt(0).toUpperCase() + value.slice(1);
+    value = inputEl.value;
+  }
+
+  if (value.length < 5 || value.length > 30) {
+    errorEl.textContent = "Habit name should be 5 to 30 characters long";
+    return false;
+  }
+
+  if (!habitRegex.test(value)) {
+    errorEl.textContent = "Start with capital letter. Only letters, numbers and space allowed.";
+    return false;
+  }
+
+  // Reject repeated single character (like aaaaa or 11111)
+  const repeatedConsecutiveRegex = /(.)\1{4,}/;  // NEW regex
+  if (repeatedConsecutiveRegex.test(value.replace(/\s/g, ""))) { // ignore spaces
+    errorEl.textContent = "Do not enter repeated characters like 'aaaaa' or '11111'.";  // NEW error
+    return false;
+  }
+
+  errorEl.textContent = "";
+  return true;
+}
+
+// Add Habit
+const addHabitForm = document.getElementById("addHabitForm");
+const addHabitInput = document.getElementById("newHabitInput");
+const addHabitError = document.getElementById("addHabitError");
+
+addHabitInput.addEventListener("input", () => validateHabitInput(addHabitInput, addHabitError));
+addHabitForm.addEventListener("submit", (e) => {
+  if (!validateHabitInput(addHabitInput, addHabitError)) e.preventDefault();
+});
+
+// Edit Habit
+const editHabitFormEl = document.getElementById("editHabitForm");
+const editHabitInputEl = document.getElementById("editHabitInput");
+const editHabitError = document.getElementById("editHabitError");
+
+editHabitInputEl.addEventListener("input", () => validateHabitInput(editHabitInputEl, editHabitError));
+editHabitFormEl.addEventListener("submit", (e) => {
+  if (!validateHabitInput(editHabitInputEl, editHabitError)) e.preventDefault();
+});
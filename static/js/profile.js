@@ -0,0 +1,156 @@
+//---------------------------
+// Capitalize as user types
+//---------------------------
+function capitalizeFirstLetter(input) {
+  if (input.value.length > 0) {
+    input.value = input.value.charAt(0).toUpperCase() + input.value.slice(1).toLowerCase();
+  }
+}
+
+// Ensure names are formatted before submission
+function formatNamesBeforeSubmit() {
+  const firstName = document.getElementById('first_name');
+  const lastName = document.getElementById('last_name');
+  capitalizeFirstLetter(firstName);
+  capitalizeFirstLetter(lastName);
+}
+
+//----------------------------
+// Name Validation
+//----------------------------
+function capitalizeFirstLetter(input) {
+  if (input.value.length > 0) {
+    input.value = input.value.charAt(0).toUpperCase() + input.value.slice(1).toLowerCase();
+  }
+}
+
+// Validate first and last names before submission
+function validateProfileForm() {
+  const firstName = document.getElementById("first_name").value.trim();
+  const lastName = document.getElementById("last_name").value.trim();
+
+  const namePattern = /^[A-Z][a-z]{2,19}$/; // 1 uppercase + 2–19 lowercase only
+
+  if (!namePattern.test(firstName) || !namePattern.test(lastName)) {
+    alert("First Name and Last Name must start with a capital letter, followed by lowercase letters only (3–20 total).");
+    return false;
+  }
+
+  return true;
+}
+
+// -------------------------
+// Mobile No Validation
+// -------------------------
+const mobileInput = document.getElementById("mobile");
+const mobileError = document.getElementById("mobile_error");
+
+function validateMobile(value) {
+  if (!/^[6-9][0-9]{9}$/.test(value)) {
+    mobileError.innerText = "Invalid mobile no. Must be 10 digits and start with 6-9";
+    mobileError.style.display = "block";
+    return false;
+  } else {
+    mobileError.innerText = "";
+    mobileError.style.display = "none";
+    return true;
+  }
+}
+
+// Restrict typing to digits only and max 10 characters
+mobileInput.addEventListener("input", function() {
+  this.value = this.value.replace(/[^0-9]/g, "").slice(0, 10);
+  validateMobile(this.value);
+});
+
+// Validate before form submission
+document.getElementById("profileForm").addEventListener("submit", function(e) {
+  if (!validateMobile(mobileInput.value)) {
+    e.preventDefault(); // stop submission if invalid
+  }
+});
+
+// -------------------------
+// DOB Validation
+// -------------------------
+
+const dobInput = document.getElementById("dob");
+const dobError = document.getElementById("dob_error");
+
+function validateDOB(value) {
+  const today = new Date();
+  const inputDate = new Date(value);
+  if (inputDate > today) {
+    // Format today in mm/dd/yyyy
+    const dd = String(today.getDate()).padStart(2, '0');
+    const mm = String(today.getMonth() + 1).padStart(2, '0'); // Month is 0-based
+    const yyyy = today.getFullYear();
+    dobError.innerText = `DOB cannot be in the future (max ${mm}/${dd}/${yyyy})`;
+    dobError.style.display = "block";
+    return false;
+  } else {
+    dobError.innerText = "";
+    dobError.style.display = "none";
+    return true;
+  }
+}
+
+// Validate on change (calendar or manual input)
+dobInput.addEventListener("change", function() {
+  validateDOB(this.value);
+});
+
+// Validate before form submission
+document.getElementById("profileForm").addEventListener("submit", function(e) {
+  if (!validateDOB(dobInput.value)) {
+    e.preventDefault(); // stop submission if invalid
+  }
+});
+
+// -------------------------
+// Email Validation
+// -------------------------
+const emailInput = document.getElementById("email");
+const emailError = document.getElementById("email_error");
+
+emailInput.addEventListener("input", function() {
+  const email = this.value.trim();
+  const allowedDomains = [
+    "gmail.com", "yahoo.com", "outlook.com", "hotmail.com",
+    "icloud.com", "live.com", "aol.com", "protonmail.com",
+    "zoho.com", "rediffmail.com"
+  ];
+
+  // Regex: at least 5 lowercase letters/numbers/._ before @
+  const emailPattern = /^[a-z0-9._]{5,}@[a-z0-9.-]+\.[a-z]{2,}$/;
+
+  if (email === "") {
+    emailError.style.display = "none";
+    return;
+  }
+
+  if (!emailPattern.test(email)) {
+    emailError.textContent =
+      "Invalid format: min 5 lowercase letters/numbers/._ before @";
+    emailError.style.display = "block";
+    return;
+  }
+
+  const [username, domain] = email.split('@');
+
+  if (!allowedDomains.includes(domain)) {
+    emailError.textContent =
+      "Email must end with one of: " + allowedDomains.join(', ');
+    emailError.style.display = "block";
+    return;
+  }
+
+  if (/^(.)\1+$/.test(username)) {
+    emailError.textContent =
+      "Username part cannot have all repeated characters";
+    emailError.style.display = "block";
+    return;
+  }
+
+  emailError.style.display = "none";
+});
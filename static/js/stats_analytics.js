@@ -0,0 +1,44 @@
+(function () {
+    const box = document.getElementById("analytics");
+    const percent = value => value === null ? "–" : Math.round(value * 100) + "%";
+
+    function listItem(name, value) {
+        const li = document.createElement("li");
+        const label = document.createElement("span");
+        const number = document.createElement("span");
+        label.textContent = name;
+        number.textContent = value;
+        li.append(label, number);
+        return li;
+    }
+
+    fetch(box.dataset.url, { credentials: "same-origin" })
+        .then(response => response.ok ? response.json() : Promise.reject(response.status))
+        .then(data => {
+            if (!data.rows) return;
+            const last = series => series[series.length - 1];
+            document.getElementById("rate-30").textContent = percent(last(data.rolling["30"]));
+            document.getElementById("rate-7").textContent = percent(last(data.rolling["7"]));
+
+            const bars = document.getElementById("weekday-bars");
+            data.weekdays.forEach((day, i) => {
+                const bar = document.createElement("div");
+                bar.className = "weekday-bar";
+                bar.title = day + ": " + percent(data.weekday_rates[i]);
+                bar.style.setProperty("--fill", (data.weekday_rates[i] || 0) * 100 + "%");
+                bar.dataset.day = day.charAt(0);
+                bars.append(bar);
+            });
+
+            const categories = document.getElementById("category-rates");
+            data.categories.forEach(c => categories.append(listItem(c.category_name, percent(c.completion_rate))));
+
+            const habits = document.getElementById("consistent-habits");
+            data.habits.slice(0, 5).forEach(h => {
+                habits.append(listItem(h.habit_name, h.consistency === null ? "–" : Math.round(h.consistency)));
+            });
+
+            box.hidden = false;
+        })
+        .catch(() => {});
+})();
@@ -0,0 +1,54 @@
+(function () {
+    const box = document.getElementById("heatmap");
+    const grid = document.getElementById("heatmap-grid");
+    const label = document.getElementById("heatmap-year");
+    const NO_DATA = 255;
+    const DAY = 86400000;
+    let year = parseInt(box.dataset.year, 10);
+
+    // 54 week columns x 7 weekday rows (a leap year starting on Sunday spans 54), created once and recoloured per year
+    const cells = [];
+    for (let i = 0; i < 54 * 7; i++) {
+        const cell = document.createElement("div");
+        cell.className = "heatmap-cell";
+        grid.append(cell);
+        cells.push(cell);
+    }
+
+    function draw(start, values) {
+        const offset = (start.getUTCDay() + 6) % 7;  // Monday = 0
+        cells.forEach((cell, i) => {
+            const day = i - offset;
+            if (day < 0 || day >= values.length) {
+                cell.style.visibility = "hidden";
+                return;
+            }
+            const value = values[day];
+            const date = new Date(start.getTime() + day * DAY).toISOString().slice(0, 10);
+            cell.style.visibility = "visible";
+            cell.style.background = value === NO_DATA
+                ? "rgba(255,255,255,0.06)"
+                : "rgba(0,255,153," + (0.15 + 0.85 * value / 100) + ")";
+            cell.title = date + (value === NO_DATA ? ": no data" : ": " + value + "%");
+        });
+    }
+
+    function load() {
+        label.textContent = year;
+        fetch(box.dataset.url + "&year=" + year, { credentials: "same-origin" })
+            .then(response => response.ok ? response : Promise.reject(response.status))
+            .then(response => response.arrayBuffer().then(buffer => {
+                const start = new Date(response.headers.get("X-Heatmap-Start") + "T00:00:00Z");
+                draw(start, new Uint8Array(buffer));
+            }))
+            .catch(() => {});
+    }
+
+    box.querySelectorAll("button[data-step]").forEach(button => {
+        button.addEventListener("click", () => {
+            year += parseInt(button.dataset.step, 10);
+            load();
+        });
+    });
+    load();
+})();
@@ -0,0 +1,232 @@
+from datetime import date, datetime, timedelta
+
+from rollups import COUNT_COLUMNS, month_end
+
+# ============================================================
+# STATS ENGINE
+# ============================================================
+# Reads the per-day counters shown on /my_stats and the range summaries
+# of /api/stats/summary from the stats rollup tables (see rollups.py)
+# instead of grouping raw daily_task_status rows on every request.
+
+DEFAULT_PAGE_SIZE = 30
+MAX_PAGE_SIZE = 366
+
+
+def parse_iso_date(value):
+    # "YYYY-MM-DD" -> date, anything else -> None
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value.strip(), "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def parse_page_args(args):
+    # Read page / per_page from request.args with sane bounds
+    try:
+        page = max(int(args.get("page", 1)), 1)
+    except (TypeError, ValueError):
+        page = 1
+
+    try:
+        per_page = int(args.get("per_page", DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        per_page = DEFAULT_PAGE_SIZE
+    per_page = min(max(per_page, 1), MAX_PAGE_SIZE)
+
+    return page, per_page
+
+
+def daily_stats(cursor, user_id, start=None, end=None, page=1, per_page=DEFAULT_PAGE_SIZE):
+    # cursor must be a DictCursor
+    conditions = ["user_id = %s", "grain = 'day'"]
+    params = [user_id]
+
+    if start:
+        conditions.append("period_start >= %s")
+        params.append(start)
+    if end:
+        conditions.append("period_start <= %s")
+        params.append(end)
+
+    # Fetch one extra row so we know whether an older page exists
+    # without running a separate COUNT query.
+    params.extend([per_page + 1, (page - 1) * per_page])
+
+    cursor.execute(f"""
+        SELECT period_start, total, completed, skipped, missed, pending
+        FROM stats_rollup_user
+        WHERE {" AND ".join(conditions)}
+        ORDER BY period_start DESC
+        LIMIT %s OFFSET %s
+    """, tuple(params))
+    rows = cursor.fetchall()
+
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+
+    days = []
+    for row in rows:
+        days.append({
+            "date": row["period_start"],
+            "total_habits": int(row["total"] or 0),
+            "completed_habits": int(row["completed"] or 0),
+            "skipped_habits": int(row["skipped"] or 0),
+            "missed_habits": int(row["missed"] or 0),
+            "pending_habits": int(row["pending"] or 0)
+        })
+
+    return {
+        "days": days,
+        "page": page,
+        "per_page": per_page,
+        "has_prev": page > 1,
+        "has_next": has_next,
+        "start": start,
+        "end": end
+    }
+
+
+# ============================================================
+# RANGE SUMMARIES
+# ============================================================
+# A range is split into the coarsest rollup periods that fit inside it:
+# whole months, then whole ISO weeks, then single days for the ragged
+# edges. A calendar year is 12 month rows instead of 365 day rows.
+
+def plan_periods(start, end):
+    # [(grain, period_start), ...] covering start..end exactly
+    plan = []
+    day = start
+    while day <= end:
+        next_month = month_end(day) + timedelta(days=1)
+        if day.day == 1 and month_end(day) <= end:
+            plan.append(("month", day))
+            day = next_month
+        elif (day.weekday() == 0 and day + timedelta(days=6) <= end
+              # don't let a week straddle into a month that fits whole
+              and not (next_month <= day + timedelta(days=6) and month_end(next_month) <= end)):
+            plan.append(("week", day))
+            day += timedelta(days=7)
+        else:
+            plan.append(("day", day))
+            day += timedelta(days=1)
+    return plan
+
+
+def _plan_filter(plan, column_prefix=""):
+    # SQL condition + params selecting exactly the planned rollup rows
+    by_grain = {}
+    for grain, period_start in plan:
+        by_grain.setdefault(grain, []).append(period_start)
+
+    clauses = []
+    params = []
+    for grain, starts in by_grain.items():
+        clauses.append(f"({column_prefix}grain = %s AND {column_prefix}period_start IN ({', '.join(['%s'] * len(starts))}))")
+        params.extend([grain, *starts])
+    return " OR ".join(clauses), params
+
+
+def _empty_counts():
+    return {column: 0 for column in COUNT_COLUMNS}
+
+
+def _add_counts(totals, row):
+    for column in COUNT_COLUMNS:
+        totals[column] += int(row[column] or 0)
+
+
+def _with_rate(counts):
+    counts["completion_rate"] = round(counts["completed"] / counts["total"], 4) if counts["total"] else None
+    return counts
+
+
+def period_stats(cursor, user_id, start, end):
+    # cursor must be a DictCursor. Totals for start..end plus the rollup
+    # rows they were summed from, oldest first.
+    plan = plan_periods(start, end)
+    if not plan:
+        return {"start": start, "end": end, "periods": [], "totals": _with_rate(_empty_counts())}
+
+    condition, params = _plan_filter(plan)
+    cursor.execute(f"""
+        SELECT grain, period_start, total, completed, skipped, missed, pending
+        FROM stats_rollup_user
+        WHERE user_id = %s AND ({condition})
+        ORDER BY period_start
+    """, (user_id, *params))
+
+    totals = _empty_counts()
+    periods = []
+    for row in cursor.fetchall():
+        _add_counts(totals, row)
+        period = {"grain": row["grain"], "period_start": row["period_start"]}
+        period.update({column: int(row[column] or 0) for column in COUNT_COLUMNS})
+        periods.append(_with_rate(period))
+
+    return {
+        "start": start,
+        "end": end,
+        "rows_read": len(periods),
+        "periods": periods,
+        "totals": _with_rate(totals)
+    }
+
+
+def category_stats(cursor, user_id, start, end):
+    # cursor must be a DictCursor. Per-category totals for start..end.
+    plan = plan_periods(start, end)
+    if not plan:
+        return []
+
+    condition, params = _plan_filter(plan, column_prefix="r.")
+    cursor.execute(f"""
+        SELECT r.category_id, c.category_name,
+               r.total, r.completed, r.skipped, r.missed, r.pending
+        FROM stats_rollup_category r
+        JOIN categories c ON c.category_id = r.category_id
+        WHERE r.user_id = %s AND ({condition})
+    """, (user_id, *params))
+
+    categories = {}
+    for row in cursor.fetchall():
+        entry = categories.setdefault(row["category_id"], {
+            "category_id": row["category_id"],
+            "category_name": row["category_name"],
+            **_empty_counts()
+        })
+        _add_counts(entry, row)
+
+    return sorted((_with_rate(entry) for entry in categories.values()),
+                  key=lambda entry: entry["category_name"])
+
+
+# ============================================================
+# CALENDAR HEATMAP
+# ============================================================
+# One byte per day of a year: completed / (completed + missed) scaled to
+# 0-100, or NO_DATA when nothing was decided that day. A whole year is
+# at most 366 bytes however old the account is.
+
+NO_DATA = 255
+
+
+def heatmap_year(cursor, user_id, year):
+    # Returns (first_day, bytes) for the calendar year
+    start = date(year, 1, 1)
+    end = date(year, 12, 31)
+    cursor.execute("""
+        SELECT period_start, completed, missed
+        FROM stats_rollup_user
+        WHERE user_id = %s AND grain = 'day' AND period_start BETWEEN %s AND %s
+    """, (user_id, start, end))
+
+    values = bytearray([NO_DATA]) * ((end - start).days + 1)
+    for row in cursor.fetchall():
+        completed, missed = int(row["completed"] or 0), int(row["missed"] or 0)
+        if completed + missed:
+            values[(row["period_start"] - start).days] = round(100 * completed / (completed + missed))
+    return start, bytes(values)
@@ -0,0 +1,288 @@
+import functools
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+
+from flask import g
+
+from db_pool import ConnectionPool
+
+try:
+    import MySQLdb
+    import MySQLdb.cursors
+except ImportError:    # SQLite-only installs do not need mysqlclient
+    MySQLdb = None
+
+# ============================================================
+# STORAGE BACKENDS
+# ============================================================
+# Every route and helper module talks to the database through
+# `db.connection` (one pooled connection per app context). Two engines
+# sit behind it, picked with DB_BACKEND:
+#   mysql   MySQLdb connections (the default, multi-node deployments)
+#   sqlite  one database file (SQLITE_PATH) for single-node / edge
+#           installs, CI and in-process benchmarks
+#
+# Both speak the same small interface:
+#   connection.cursor()          tuple rows
+#   connection.cursor("dict")    dict rows (column name -> value)
+#   connection.cursor("stream")  unbuffered rows for large exports
+#   connection.commit() / rollback() / dialect
+#
+# SQL is written once in the MySQL dialect with %s placeholders. The
+# SQLite engine rewrites the few MySQL-only constructs the app uses
+# (see translate()) and caches the result, so each statement text is
+# translated once and then served from sqlite3's prepared statement
+# cache.
+
+DB_ERRORS = (sqlite3.Error,) if MySQLdb is None else (sqlite3.Error, MySQLdb.Error)
+
+
+# ---------------------------
+# MySQL
+# ---------------------------
+class MySQLConnection:
+    dialect = "mysql"
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, kind=None):
+        if kind == "dict":
+            return self._connection.cursor(MySQLdb.cursors.DictCursor)
+        if kind == "stream":
+            # Rows are read from the socket while iterating
+            return self._connection.cursor(MySQLdb.cursors.SSCursor)
+        return self._connection.cursor()
+
+
+def mysql_connect_factory(config):
+    if MySQLdb is None:
+        raise RuntimeError("DB_BACKEND is 'mysql' but mysqlclient is not installed")
+
+    def connect():
+        kwargs = {
+            "host": config["MYSQL_HOST"],
+            "port": config["MYSQL_PORT"],
+            "connect_timeout": config["MYSQL_CONNECT_TIMEOUT"],
+            "charset": config["MYSQL_CHARSET"]
+        }
+        if config["MYSQL_USER"]:
+            kwargs["user"] = config["MYSQL_USER"]
+        if config["MYSQL_PASSWORD"]:
+            kwargs["passwd"] = config["MYSQL_PASSWORD"]
+        if config["MYSQL_DB"]:
+            kwargs["db"] = config["MYSQL_DB"]
+        if config["MYSQL_UNIX_SOCKET"]:
+            kwargs["unix_socket"] = config["MYSQL_UNIX_SOCKET"]
+        return MySQLdb.connect(**kwargs)
+    return connect
+
+
+# ---------------------------
+# SQLite
+# ---------------------------
+# DATE / DATETIME columns come back as date / datetime objects, like
+# they do from MySQLdb.
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()[:10]))
+sqlite3.register_converter("DATETIME", lambda value: datetime.fromisoformat(value.decode()))
+
+_PLACEHOLDER = re.compile(r"%([s%])")
+_DATEDIFF = re.compile(r"DATEDIFF\(\s*([^(),]+?)\s*,\s*([^(),]+?)\s*\)", re.IGNORECASE)
+_UPSERT = re.compile(r"ON DUPLICATE KEY UPDATE\s+(.*?)\s*$", re.IGNORECASE | re.DOTALL)
+_VALUES_REF = re.compile(r"VALUES\((\w+)\)", re.IGNORECASE)
+_FUNCTIONS = (
+    ("NOW()", "datetime('now', 'localtime')"),
+    ("CURDATE()", "date('now', 'localtime')"),
+)
+
+# CREATE TABLE: the column / key syntax SQLite spells differently
+_DDL = (
+    (re.compile(r"INT AUTO_INCREMENT PRIMARY KEY", re.IGNORECASE), "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"(\w+) ENUM\(([^)]*)\)", re.IGNORECASE), r"\1 VARCHAR(16) CHECK (\1 IN (\2))"),
+    (re.compile(r"UNIQUE KEY (\w+) \(", re.IGNORECASE), r"CONSTRAINT \1 UNIQUE ("),
+)
+
+
+def _upsert_clause(match):
+    # "a = VALUES(a), b = b" -> ON CONFLICT DO UPDATE SET a = excluded.a;
+    # only no-op assignments ("id = id", insert-if-missing) -> DO NOTHING
+    assignments = []
+    for part in match.group(1).split(","):
+        column, value = (side.strip() for side in part.split("=", 1))
+        value = _VALUES_REF.sub(r"excluded.\1", value)
+        if value != column:
+            assignments.append(f"{column} = {value}")
+    if not assignments:
+        return "ON CONFLICT DO NOTHING"
+    return "ON CONFLICT DO UPDATE SET " + ", ".join(assignments)
+
+
+@functools.lru_cache(maxsize=1024)
+def translate(sql):
+    # MySQL dialect -> SQLite dialect, for the constructs used in this app
+    sql = _PLACEHOLDER.sub(lambda m: "?" if m.group(1) == "s" else "%", sql)
+    for mysql_function, sqlite_function in _FUNCTIONS:
+        sql = sql.replace(mysql_function, sqlite_function)
+    sql = _DATEDIFF.sub(r"CAST(julianday(\1) - julianday(\2) AS INTEGER)", sql)
+    sql = _UPSERT.sub(_upsert_clause, sql)
+    if sql.lstrip().upper().startswith("CREATE TABLE"):
+        for pattern, replacement in _DDL:
+            sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def _dict_row(cursor, row):
+    # Like MySQLdb's DictCursor, the first column of a duplicated name wins
+    result = {}
+    for column, value in zip(cursor.description, row):
+        result.setdefault(column[0], value)
+    return result
+
+
+class SQLiteCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, sql, args=None):
+        self._cursor.execute(translate(sql), args or ())
+        return self._cursor.rowcount
+
+    def executemany(self, sql, args):
+        self._cursor.executemany(translate(sql), args)
+        return self._cursor.rowcount
+
+
+class SQLiteConnection:
+    dialect = "sqlite"
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, kind=None):
+        # sqlite3 cursors already step through results lazily, so
+        # "stream" needs nothing special
+        cursor = self._connection.cursor()
+        if kind == "dict":
+            cursor.row_factory = _dict_row
+        return SQLiteCursor(cursor)
+
+
+def sqlite_connect_factory(config):
+    path = config["SQLITE_PATH"]
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    def connect():
+        # isolation_level IMMEDIATE: the implicit transaction opened before
+        # the first write takes the write lock right away (waiting up to
+        # busy_timeout) instead of failing on a read -> write upgrade.
+        connection = sqlite3.connect(
+            path,
+            timeout=config["SQLITE_BUSY_TIMEOUT"],
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level="IMMEDIATE",
+            check_same_thread=False,    # pooled: used by one thread at a time
+            cached_statements=config["SQLITE_CACHED_STATEMENTS"]
+        )
+        # WAL: readers never block the writer and see a consistent snapshot
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA foreign_keys = ON")
+        return connection
+    return connect
+
+
+# ============================================================
+# FLASK INTEGRATION
+# ============================================================
+# `db.connection` is checked out from the pool on first use in an app
+# context and given back when the context is torn down.
+
+class Storage:
+    def __init__(self, app=None):
+        self.pool = None
+        self.dialect = None
+        self.wrap_connection = None    # optional proxy factory (instrumentation)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("DB_BACKEND", "mysql")
+
+        app.config.setdefault("MYSQL_HOST", "localhost")
+        app.config.setdefault("MYSQL_PORT", 3306)
+        app.config.setdefault("MYSQL_USER", None)
+        app.config.setdefault("MYSQL_PASSWORD", None)
+        app.config.setdefault("MYSQL_DB", None)
+        app.config.setdefault("MYSQL_UNIX_SOCKET", None)
+        app.config.setdefault("MYSQL_CONNECT_TIMEOUT", 10)
+        app.config.setdefault("MYSQL_CHARSET", "utf8mb4")
+        app.config.setdefault("MYSQL_POOL_SIZE", 5)
+        app.config.setdefault("MYSQL_POOL_MAX_OVERFLOW", 10)
+        app.config.setdefault("MYSQL_POOL_TIMEOUT", 30)
+        app.config.setdefault("MYSQL_POOL_RECYCLE", 3600)
+        app.config.setdefault("MYSQL_POOL_PRE_PING", True)
+
+        app.config.setdefault("SQLITE_PATH", os.path.join(app.instance_path, "habit_tracker.sqlite3"))
+        app.config.setdefault("SQLITE_POOL_SIZE", 8)
+        app.config.setdefault("SQLITE_BUSY_TIMEOUT", 10)
+        app.config.setdefault("SQLITE_CACHED_STATEMENTS", 256)
+
+        config = app.config
+        self.dialect = config["DB_BACKEND"]
+
+        if self.dialect == "sqlite":
+            self._wrap = SQLiteConnection
+            # A local file: no idle timeout to recycle for, nothing to ping
+            self.pool = ConnectionPool(
+                sqlite_connect_factory(config),
+                size=config["SQLITE_POOL_SIZE"],
+                max_overflow=0,
+                timeout=config["SQLITE_BUSY_TIMEOUT"],
+                recycle=0,
+                pre_ping=False
+            )
+        elif self.dialect == "mysql":
+            self._wrap = MySQLConnection
+            self.pool = ConnectionPool(
+                mysql_connect_factory(config),
+                size=config["MYSQL_POOL_SIZE"],
+                max_overflow=config["MYSQL_POOL_MAX_OVERFLOW"],
+                timeout=config["MYSQL_POOL_TIMEOUT"],
+                recycle=config["MYSQL_POOL_RECYCLE"],
+                pre_ping=config["MYSQL_POOL_PRE_PING"]
+            )
+        else:
+            raise ValueError(f"Unknown DB_BACKEND {self.dialect!r} (expected 'mysql' or 'sqlite')")
+
+        app.teardown_appcontext(self.teardown)
+
+    @property
+    def connection(self):
+        if "db_connection" not in g:
+            g.db_connection = self.pool.acquire()
+        connection = self._wrap(g.db_connection)
+        if self.wrap_connection is not None:
+            return self.wrap_connection(connection)
+        return connection
+
+    def teardown(self, exception):
+        conn = g.pop("db_connection", None)
+        if conn is not None:
+            self.pool.release(conn)
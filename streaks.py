@@ -0,0 +1,214 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+# ============================================================
+# STREAK ENGINE
+# ============================================================
+# habit_streaks keeps, per (user, habit):
+#   current_streak      length of the run of Completed days ending at
+#   last_completed_date
+#   best_streak         longest run ever
+# The stored current_streak is only "live" while last_completed_date is
+# today or yesterday; after that the streak is broken and reads as 0.
+#
+# Status writes update the summary in O(1) per habit. Anything that can
+# shorten a run (un-completing a day, back-filling an older day) triggers
+# a rebuild of just that habit from history.
+
+
+def effective_current(current_streak, last_completed_date, today):
+    if last_completed_date and last_completed_date >= today - timedelta(days=1):
+        return current_streak
+    return 0
+
+
+def _load_streak_rows(cursor, keys):
+    # Row-value IN lists are MySQL only: match on both columns separately
+    # (still the primary key) and drop the cross-product extras here.
+    user_ids = sorted({key[0] for key in keys})
+    habit_ids = sorted({key[1] for key in keys})
+    cursor.execute(f"""
+        SELECT user_id, habit_id, current_streak, best_streak, last_completed_date
+        FROM habit_streaks
+        WHERE user_id IN ({", ".join(["%s"] * len(user_ids))})
+          AND habit_id IN ({", ".join(["%s"] * len(habit_ids))})
+    """, (*user_ids, *habit_ids))
+    wanted = set(keys)
+    return {
+        (row[0], row[1]): [row[2], row[3], row[4]]
+        for row in cursor.fetchall() if (row[0], row[1]) in wanted
+    }
+
+
+def _save_streak_rows(cursor, summaries):
+    # summaries: {(user_id, habit_id): [current, best, last_completed]}
+    rows = [(user_id, habit_id, current, best, last)
+            for (user_id, habit_id), (current, best, last) in summaries.items()]
+    if not rows:
+        return
+    placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(rows))
+    params = [value for row in rows for value in row]
+    cursor.execute(f"""
+        INSERT INTO habit_streaks (user_id, habit_id, current_streak, best_streak, last_completed_date)
+        VALUES {placeholders}
+        ON DUPLICATE KEY UPDATE current_streak = VALUES(current_streak),
+                                best_streak = VALUES(best_streak),
+                                last_completed_date = VALUES(last_completed_date)
+    """, params)
+
+
+def update_streaks(cursor, rows):
+    # rows: the (user_id, habit_id, day, status, marked_time) tuples that
+    # were just written, in write order. Runs in the writer's transaction.
+    final = {}
+    for user_id, habit_id, day, status, _ in rows:
+        final[(user_id, habit_id, day)] = status
+    if not final:
+        return
+
+    keys = sorted({(user_id, habit_id) for user_id, habit_id, _ in final})
+    summaries = _load_streak_rows(cursor, keys)
+    changed = {}
+    rebuild = set()
+
+    for (user_id, habit_id, day), status in sorted(final.items()):
+        key = (user_id, habit_id)
+        if key in rebuild:
+            continue
+        current, best, last = summaries.get(key, [0, 0, None])
+
+        if status == "Completed":
+            if last is None or day > last + timedelta(days=1):
+                current, last = 1, day           # a new run starts
+            elif day == last + timedelta(days=1):
+                current, last = current + 1, day  # the run grows by one day
+            elif day < last:
+                rebuild.add(key)                 # back-filled an older day
+                continue
+            best = max(best, current)
+        elif last is not None and day <= last:
+            # A day inside the known history is no longer Completed
+            rebuild.add(key)
+            continue
+        else:
+            continue
+
+        summaries[key] = changed[key] = [current, best, last]
+
+    for key in rebuild:
+        changed.pop(key, None)
+    _save_streak_rows(cursor, changed)
+
+    for user_id, habit_id in sorted(rebuild):
+        rebuild_streaks(cursor, user_id, habit_ids=[habit_id])
+
+
+# ============================================================
+# REBUILD FROM HISTORY (vectorized)
+# ============================================================
+
+def compute_streaks(habit_ids, day_numbers):
+    # habit_ids / day_numbers: equal length arrays of Completed days, sorted
+    # by (habit_id, day). Returns {habit_id: (current, best, last_day_number)}.
+    habit_ids = np.asarray(habit_ids, dtype=np.int64)
+    days = np.asarray(day_numbers, dtype=np.int64)
+    if days.size == 0:
+        return {}
+
+    # Start of each habit's block and of each run of consecutive days
+    habit_start = np.ones(days.size, dtype=bool)
+    habit_start[1:] = habit_ids[1:] != habit_ids[:-1]
+    run_start = habit_start.copy()
+    run_start[1:] |= np.diff(days) != 1
+
+    run_ids = np.cumsum(run_start) - 1
+    run_lengths = np.bincount(run_ids)
+
+    # Per habit: best = longest run, current = run containing the last day
+    habit_first_run = run_ids[habit_start]
+    best = np.maximum.reduceat(run_lengths, habit_first_run)
+    habit_end = np.append(np.flatnonzero(habit_start)[1:] - 1, days.size - 1)
+    current = run_lengths[run_ids[habit_end]]
+
+    return {
+        int(habit): (int(cur), int(top), int(last))
+        for habit, cur, top, last in zip(habit_ids[habit_start], current, best, days[habit_end])
+    }
+
+
+def rebuild_streaks(cursor, user_id, habit_ids=None):
+    # Recompute one user's summaries (optionally only some habits) from
+    # daily_task_status in one query and one vectorized pass.
+    conditions = ["user_id = %s", "status = 'Completed'"]
+    params = [user_id]
+    if habit_ids:
+        conditions.append(f"habit_id IN ({', '.join(['%s'] * len(habit_ids))})")
+        params.extend(habit_ids)
+
+    cursor.execute(f"""
+        SELECT habit_id, everyday_date FROM daily_task_status
+        WHERE {" AND ".join(conditions)}
+        ORDER BY habit_id, everyday_date
+    """, params)
+    history = cursor.fetchall()
+
+    habits = [row[0] for row in history]
+    days = [row[1].toordinal() for row in history]
+    computed = compute_streaks(habits, days)
+
+    # Start from a clean slate for the rebuilt scope
+    delete_sql = "DELETE FROM habit_streaks WHERE user_id = %s"
+    delete_params = [user_id]
+    if habit_ids:
+        delete_sql += f" AND habit_id IN ({', '.join(['%s'] * len(habit_ids))})"
+        delete_params.extend(habit_ids)
+    cursor.execute(delete_sql, delete_params)
+
+    _save_streak_rows(cursor, {
+        (user_id, habit): [current, best, date.fromordinal(last)]
+        for habit, (current, best, last) in computed.items()
+    })
+    return len(computed)
+
+
+def rebuild_all_streaks(cursor, progress=None):
+    cursor.execute("SELECT DISTINCT user_id FROM daily_task_status ORDER BY user_id")
+    user_ids = [row[0] for row in cursor.fetchall()]
+    for done, user_id in enumerate(user_ids, start=1):
+        rebuild_streaks(cursor, user_id)
+        if progress:
+            progress(done, len(user_ids))
+    return len(user_ids)
+
+
+# ============================================================
+# READ
+# ============================================================
+
+def user_streaks(cursor, user_id, today):
+    # Streaks of the user's selected habits (DictCursor), best first
+    cursor.execute("""
+        SELECT h.habit_id,
+               COALESCE(ush.custom_name, h.habit_name) AS habit_name,
+               hs.current_streak,
+               hs.best_streak,
+               hs.last_completed_date
+        FROM user_selected_habits ush
+        JOIN habits h ON h.habit_id = ush.habit_id
+        LEFT JOIN habit_streaks hs
+          ON hs.user_id = ush.user_id AND hs.habit_id = ush.habit_id
+        WHERE ush.user_id = %s
+    """, (user_id,))
+
+    streaks = []
+    for row in cursor.fetchall():
+        streaks.append({
+            "habit_id": row["habit_id"],
+            "habit_name": row["habit_name"],
+            "current_streak": effective_current(row["current_streak"] or 0, row["last_completed_date"], today),
+            "best_streak": row["best_streak"] or 0,
+            "last_completed_date": row["last_completed_date"]
+        })
+    streaks.sort(key=lambda s: (-s["current_streak"], -s["best_streak"], s["habit_name"]))
+    return streaks
@@ -0,0 +1,117 @@
+import itertools
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import pytest
+
+# app.py reads its configuration when imported: point it at a throw-away
+# SQLite database and keep every instance file out of the source tree.
+TMP_DIR = tempfile.mkdtemp(prefix="habit_tracker_tests-")
+os.environ.update({
+    "FLASK_DB_BACKEND": "sqlite",
+    "FLASK_SQLITE_PATH": os.path.join(TMP_DIR, "db.sqlite3"),
+    "FLASK_WRITE_BEHIND_JOURNAL_DIR": os.path.join(TMP_DIR, "write_behind"),
+    "FLASK_VIEW_CACHE_PATH": os.path.join(TMP_DIR, "view_cache.sqlite3"),
+    "FLASK_ASSETS_BUILD_DIR": os.path.join(TMP_DIR, "assets"),
+})
+
+PASSWORD = "Passw0rd!"
+
+_numbers = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    import app as app_module
+
+    app_module.app.config["TESTING"] = True
+    with app_module.app.app_context():
+        app_module.create_tables_and_seed()
+    yield app_module
+    shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def app(app_module):
+    return app_module.app
+
+
+@pytest.fixture
+def connection(app_module):
+    # One pooled connection for the test; whatever it did not commit is dropped
+    with app_module.app.app_context():
+        connection = app_module.db.connection
+        yield connection
+        connection.rollback()
+
+
+@pytest.fixture
+def make_user(connection):
+    # Creates a user directly in the database, returns its user_id
+    def make_user():
+        n = next(_numbers)
+        cursor = connection.cursor()
+        cursor.execute("""
+            INSERT INTO users (first_name, last_name, username, mobile, email, password)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, ("Test", "User", f"test{n:04d}", f"9{n:09d}", f"test{n:04d}@gmail.com", "-"))
+        user_id = cursor.lastrowid
+        connection.commit()
+        cursor.close()
+        return user_id
+    return make_user
+
+
+@pytest.fixture
+def signup(app_module):
+    # Returns a new signed-up and logged-in browser on every call, with
+    # the sign-up flashes already consumed
+    def signup():
+        n = next(_numbers)
+        username = f"Tester{n:04d}"
+        client = app_module.app.test_client()
+        client.post("/create_account", data={
+            "first_name": "Tester", "last_name": "Person", "username": username,
+            "dob": "1995-05-05", "gender": "Other", "mobile": f"8{n:09d}",
+            "email": f"tester{n:04d}@gmail.com", "password": PASSWORD, "confirm_password": PASSWORD
+        })
+        response = client.post("/login", data={"email_or_username": username, "password": PASSWORD})
+        assert response.status_code == 302, "login failed"
+        client.get("/dashboard")
+        return client
+    return signup
+
+
+@pytest.fixture
+def client(signup):
+    return signup()
+
+
+@pytest.fixture
+def habits(connection):
+    # Two predefined habits of one category and one of another
+    cursor = connection.cursor()
+    cursor.execute("SELECT MIN(category_id), MAX(category_id) FROM categories WHERE is_custom = 0")
+    first, last = cursor.fetchone()
+    ids = []
+    for category_id, count in ((first, 2), (last, 1)):
+        cursor.execute("SELECT habit_id FROM habits WHERE category_id = %s ORDER BY habit_id LIMIT %s",
+                       (category_id, count))
+        ids.extend(row[0] for row in cursor.fetchall())
+    cursor.close()
+    return ids
+
+
+@pytest.fixture
+def write_statuses(connection):
+    # Writes (user_id, habit_id, day, status) rows the way the app does
+    from daily_tasks import apply_status_updates
+
+    def write_statuses(rows):
+        cursor = connection.cursor()
+        apply_status_updates(cursor, [(*row, datetime(2024, 3, 1)) for row in rows])
+        connection.commit()
+        cursor.close()
+    return write_statuses
@@ -0,0 +1,75 @@
+import io
+import tarfile
+
+import pytest
+from flask import Flask
+
+import assets as assets_module
+from assets import Assets, sri_hash
+
+CSS = b".btn { color: red; }\n"
+JS = b"window.bootstrap = {};\n"
+
+
+@pytest.fixture
+def vendored(tmp_path, monkeypatch):
+    # Two made-up vendor files pinned like the real ones
+    monkeypatch.setattr(assets_module, "VENDOR", {
+        "vendor/lib/lib.min.css": ("lib@1.0.0/dist/css/lib.min.css", sri_hash(CSS)),
+        "vendor/lib/lib.min.js": ("lib@1.0.0/dist/js/lib.min.js", sri_hash(JS)),
+    })
+    monkeypatch.setattr(assets_module, "BUNDLES", {
+        "lib.css": ["vendor/lib/lib.min.css"],
+        "lib.js": ["vendor/lib/lib.min.js"],
+    })
+    static = tmp_path / "static"
+    static.mkdir()
+    app = Flask(__name__, static_folder=str(static))
+    app.config["ASSETS_BUILD_DIR"] = str(tmp_path / "build")
+    return app, Assets(app), static
+
+
+def test_missing_vendor_files_are_reported(vendored):
+    app, assets, _ = vendored
+    assert assets.missing == {"lib.css": "vendor/lib/lib.min.css", "lib.js": "vendor/lib/lib.min.js"}
+    with app.test_request_context():
+        assert assets.url("lib.css") == "/static/vendor/lib/lib.min.css"
+
+
+def test_vendor_from_a_local_folder(tmp_path, vendored):
+    app, assets, static = vendored
+    dist = tmp_path / "download" / "dist"
+    (dist / "css").mkdir(parents=True)
+    (dist / "js").mkdir()
+    (dist / "css" / "lib.min.css").write_bytes(b"tampered")
+    (dist / "js" / "lib.min.js").write_bytes(JS)
+    (tmp_path / "download" / "lib.min.css").write_bytes(CSS)    # the copy matching the hash wins
+
+    assert sorted(assets.vendor(str(tmp_path / "download"), echo=lambda line: None)) == \
+        ["vendor/lib/lib.min.css", "vendor/lib/lib.min.js"]
+    assert (static / "vendor/lib/lib.min.css").read_bytes() == CSS
+    assets.build()
+    assert assets.missing == {}
+    with app.test_request_context():
+        assert assets.url("lib.js").startswith("/assets/lib.")
+
+
+def test_vendor_from_an_npm_tarball(tmp_path, vendored):
+    _, assets, static = vendored
+    tarball = tmp_path / "lib-1.0.0.tgz"
+    with tarfile.open(tarball, "w:gz") as archive:
+        for name, data in (("package/dist/css/lib.min.css", CSS), ("package/dist/js/lib.min.js", JS)):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+    assert len(assets.vendor(str(tarball), echo=lambda line: None)) == 2
+    assert (static / "vendor/lib/lib.min.js").read_bytes() == JS
+
+
+def test_vendor_refuses_files_with_another_hash(tmp_path, vendored):
+    _, assets, static = vendored
+    (tmp_path / "lib.min.css").write_bytes(b"tampered")
+    with pytest.raises(ValueError, match="lib.min.css matching"):
+        assets.vendor(str(tmp_path), echo=lambda line: None)
+    assert not (static / "vendor/lib/lib.min.css").exists()
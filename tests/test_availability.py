@@ -0,0 +1,69 @@
+import threading
+import time
+
+from availability import UsernameAvailability
+
+
+class SlowConnection:
+    # Stands in for the DB: every load returns the same rows, slowly
+    dialect = "sqlite"
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.loads = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params):
+        self.loads += 1
+        time.sleep(0.05)
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+def username_of(connection, user_id):
+    cursor = connection.cursor()
+    cursor.execute("SELECT username FROM users WHERE user_id = %s", (user_id,))
+    username = cursor.fetchone()[0]
+    cursor.close()
+    return username
+
+
+def test_taken_and_free_names(connection, make_user):
+    availability = UsernameAvailability(lambda: connection)
+    username = username_of(connection, make_user())
+    assert availability.is_taken(username.upper())
+    assert not availability.is_taken("nobody-has-this-name")
+
+
+def test_names_added_here_are_counted_once(connection, make_user):
+    availability = UsernameAvailability(lambda: connection)
+    availability.refresh()
+    before = availability.stats()["names"]
+
+    username = username_of(connection, make_user())
+    availability.add(username)
+    assert availability.is_taken(username)
+    availability.refresh(force=True)
+    assert availability.stats()["names"] == before + 1
+
+
+def test_concurrent_refreshes_load_once():
+    fake = SlowConnection([(1, "alice"), (2, "bob")])
+    availability = UsernameAvailability(lambda: fake, refresh_interval=60)
+    threads = [threading.Thread(target=availability.refresh) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert fake.loads == 1
+    assert availability.stats()["names"] == 2
+
+    # A forced refresh always reads rows committed before it was asked for
+    availability.refresh(force=True)
+    assert fake.loads == 2
@@ -0,0 +1,107 @@
+from datetime import date, timedelta
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from history import (
+    decode_cursor, encode_cursor, history_page, iter_history, parse_history_args
+)
+
+FIRST_DAY = date(2023, 12, 20)
+DAYS = 20
+
+
+@pytest.fixture
+def history_user(connection, make_user):
+    # Three habits with a status on every day: same-date ties on every page
+    user_id = make_user()
+    cursor = connection.cursor()
+    cursor.execute("SELECT habit_id, category_id FROM habits WHERE is_custom = 0 ORDER BY habit_id LIMIT 3")
+    habits = cursor.fetchall()
+    cursor.executemany("""
+        INSERT INTO daily_task_status (user_id, habit_id, everyday_date, status)
+        VALUES (%s, %s, %s, %s)
+    """, [
+        (user_id, habit_id, FIRST_DAY + timedelta(days=n), "Completed" if n % 2 else "Missed")
+        for n in range(DAYS) for habit_id, _ in habits
+    ])
+    connection.commit()
+    cursor.close()
+    return user_id, habits
+
+
+def keys(rows):
+    return [(row["everyday_date"], row["habit_id"]) for row in rows]
+
+
+def test_pages_cover_the_history_once_newest_first(connection, history_user):
+    user_id, habits = history_user
+    cursor = connection.cursor("dict")
+    everything = keys(iter_history(cursor, user_id, {}, chunk_size=1000))
+    assert len(everything) == DAYS * len(habits)
+    assert everything == sorted(everything, reverse=True)
+
+    paged, after, pages = [], None, 0
+    while True:
+        rows, next_cursor = history_page(cursor, user_id, {}, after, limit=7)
+        paged.extend(keys(rows))
+        pages += 1
+        if next_cursor is None:
+            break
+        after = decode_cursor(next_cursor)
+        assert after == paged[-1]
+    cursor.close()
+
+    assert paged == everything
+    assert pages == -(-len(everything) // 7)
+
+
+def test_streaming_in_small_chunks_matches_one_chunk(connection, history_user):
+    user_id, _ = history_user
+    cursor = connection.cursor("dict")
+    assert keys(iter_history(cursor, user_id, {}, chunk_size=4)) == \
+        keys(iter_history(cursor, user_id, {}, chunk_size=1000))
+    cursor.close()
+
+
+def test_filters_and_cursor_combine(connection, history_user):
+    user_id, habits = history_user
+    habit_id = habits[1][0]
+    filters = {"habit_id": habit_id, "status": "Completed", "start": FIRST_DAY + timedelta(days=5)}
+    cursor = connection.cursor("dict")
+    rows, next_cursor = history_page(cursor, user_id, filters, limit=3)
+    rest = list(iter_history(cursor, user_id, filters, after=decode_cursor(next_cursor)))
+    cursor.close()
+
+    matching = [FIRST_DAY + timedelta(days=n) for n in range(5, DAYS) if n % 2]
+    assert [row["everyday_date"] for row in rows + rest] == sorted(matching, reverse=True)
+    assert {row["habit_id"] for row in rows + rest} == {habit_id}
+    assert {row["status"] for row in rows + rest} == {"Completed"}
+
+
+def test_cursor_round_trip():
+    token = encode_cursor(date(2024, 2, 29), 42)
+    assert "=" not in token
+    assert decode_cursor(token) == (date(2024, 2, 29), 42)
+
+
+@pytest.mark.parametrize("token", ["", "not-base64!", encode_cursor(date(2024, 1, 1), 1)[:-2], "MjAyNC0xMy0wMTox"])
+def test_malformed_cursors_are_rejected(token):
+    assert decode_cursor(token) is None
+    _, _, _, error = parse_history_args(MultiDict({"cursor": token or "x"}))
+    assert error == "Invalid cursor"
+
+
+def test_parse_history_args():
+    filters, after, limit, error = parse_history_args(MultiDict({
+        "habit_id": "3", "status": "Skipped", "start": "2024-01-01", "limit": "5000",
+        "cursor": encode_cursor(date(2024, 1, 9), 3)
+    }))
+    assert error is None
+    assert filters == {"habit_id": 3, "status": "Skipped", "start": date(2024, 1, 1)}
+    assert after == (date(2024, 1, 9), 3)
+    assert limit == 1000
+
+    assert parse_history_args(MultiDict({"status": "Done"}))[3].startswith("status must be one of")
+    assert parse_history_args(MultiDict({"end": "01/02/2024"}))[3] == "end must be YYYY-MM-DD"
+    assert parse_history_args(MultiDict({"limit": "ten"}))[3] == "limit must be a number"
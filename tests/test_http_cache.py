@@ -0,0 +1,86 @@
+import pytest
+
+PAGES = ["/dashboard", "/category/1", "/my_habits", "/my_stats", "/profile"]
+
+
+def revalidate(client, path, etag):
+    return client.get(path, headers={"If-None-Match": f'"{etag}"'})
+
+
+@pytest.mark.parametrize("path", PAGES)
+def test_unchanged_page_revalidates_to_304(client, path):
+    first = client.get(path)
+    assert first.status_code == 200
+    etag, _ = first.get_etag()
+    assert etag
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert first.last_modified is not None
+    assert "Cookie" in first.vary
+
+    again = revalidate(client, path, etag)
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.get_etag() == (etag, False)
+
+    # Compressing proxies turn it into a weak validator
+    assert client.get(path, headers={"If-None-Match": f'W/"{etag}"'}).status_code == 304
+
+
+def test_a_write_changes_the_etag(client):
+    client.post("/add_habit/1")
+    client.get("/dashboard")    # shows the flash
+    etag, _ = client.get("/my_habits").get_etag()
+    assert revalidate(client, "/my_habits", etag).status_code == 304
+
+    response = client.post("/update_habit_status", json={"habit_id": 1, "status": "Completed"})
+    assert response.get_json()["success"]
+
+    after = revalidate(client, "/my_habits", etag)
+    assert after.status_code == 200
+    assert after.get_etag()[0] != etag
+    assert b"habit-card completed" in after.data
+    assert revalidate(client, "/my_habits", after.get_etag()[0]).status_code == 304
+
+
+def test_first_visit_of_the_day_creates_rows_before_the_etag(client):
+    # The first /my_habits of a day creates the day's status rows (a write);
+    # the ETag it sends must already account for them
+    client.post("/add_habit/1")
+    client.post("/add_habit/2")
+    client.get("/dashboard")
+    first = client.get("/my_habits")
+    assert revalidate(client, "/my_habits", first.get_etag()[0]).status_code == 304
+
+
+def test_pages_with_flash_messages_are_not_validated(client):
+    etag, _ = client.get("/dashboard").get_etag()
+    client.post("/add_habit/1")
+
+    with_flash = revalidate(client, "/dashboard", etag)
+    assert with_flash.status_code == 200
+    assert with_flash.get_etag() == (None, None)
+    assert b"Habit added successfully" in with_flash.data
+
+    # The flash has been shown; the page carries a (new) validator again
+    etag, _ = client.get("/dashboard").get_etag()
+    assert revalidate(client, "/dashboard", etag).status_code == 304
+
+
+def test_etag_is_per_user(client, signup):
+    # Two fresh accounts: same generation, same page, different validators
+    etag, _ = client.get("/category/1").get_etag()
+    other = signup()
+    assert other.get("/category/1").get_etag()[0] != etag
+    assert revalidate(other, "/category/1", etag).status_code == 200
+
+
+def test_logged_out_and_disabled(app, client):
+    assert app.test_client().get("/dashboard").get_etag() == (None, None)
+
+    app.config["HTTP_CACHE_ENABLED"] = False
+    try:
+        response = client.get("/dashboard")
+        assert response.status_code == 200
+        assert response.get_etag() == (None, None)
+    finally:
+        app.config["HTTP_CACHE_ENABLED"] = True
@@ -0,0 +1,132 @@
+import re
+from datetime import date, timedelta
+
+import pytest
+
+from daily_tasks import STATUSES
+from importer import CSVImportError, import_csv
+from view_cache import current_generation
+
+WATER = "Drink 8 Glasses of Water"    # a predefined habit
+
+
+@pytest.fixture
+def run_import(app_module, connection):
+    def run_import(user_id, text, **kwargs):
+        return import_csv(connection, user_id, text.splitlines(), app_module.catalog_cache.get(), **kwargs)
+    return run_import
+
+
+def statuses(connection, user_id):
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT COALESCE(ush.custom_name, h.habit_name), dts.everyday_date, dts.status
+        FROM daily_task_status dts
+        JOIN habits h ON h.habit_id = dts.habit_id
+        LEFT JOIN user_selected_habits ush ON ush.user_id = dts.user_id AND ush.habit_id = dts.habit_id
+        WHERE dts.user_id = %s
+        ORDER BY 2, 1
+    """, (user_id,))
+    rows = [tuple(row) for row in cursor.fetchall()]
+    cursor.close()
+    return rows
+
+
+@pytest.mark.parametrize("text, message", [
+    ("", "The CSV file is empty"),
+    ("day,habit\n2024-01-01,Run", "CSV header is missing column(s): status"),
+    ("when,what,how\n", "CSV header is missing column(s): date, habit, status"),
+])
+def test_unusable_files_are_rejected(run_import, make_user, text, message):
+    with pytest.raises(CSVImportError, match=re.escape(message)):
+        run_import(make_user(), text)
+
+
+def test_invalid_rows_are_skipped_and_reported(connection, run_import, make_user):
+    user_id = make_user()
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    summary = run_import(user_id, "\n".join([
+        "Date,Habit_Name,Status,Category",
+        f"2024-01-01,{WATER},Completed,",       # 2: ok
+        "2024/01/02,Run,done,Fitness",         # 3: bad date
+        f"{tomorrow},Run,done,Fitness",        # 4: future
+        "2024-01-02, ,done,Fitness",           # 5: no habit name
+        "2024-01-02,Run,maybe,Fitness",        # 6: bad status
+        "2024-01-02,Run",                      # 7: too few columns
+        ",,,",                                 # blank: ignored
+        "2024-01-02,Run,done,Fitness",         # 9: ok
+    ]))
+
+    assert summary["rows"] == 7
+    assert summary["imported"] == 2
+    assert summary["skipped"] == 5
+    assert summary["errors"] == [
+        "line 3: date must be YYYY-MM-DD",
+        "line 4: date is in the future",
+        "line 5: habit name is empty",
+        f"line 6: status must be one of {', '.join(STATUSES)}",
+        "line 7: too few columns",
+    ]
+    assert statuses(connection, user_id) == [
+        (WATER, date(2024, 1, 1), "Completed"),
+        ("Run", date(2024, 1, 2), "Completed"),
+    ]
+
+
+def test_habits_are_mapped_selected_or_created(connection, run_import, make_user):
+    user_id = make_user()
+    summary = run_import(user_id, "\n".join([
+        "date,habit,status,category",
+        f"2024-01-01,{WATER.upper()},yes,",     # predefined, any case -> selected
+        f"2024-01-02,{WATER},skip,",
+        "2024-01-01,Stretch,x,Mobility",       # unknown -> custom habit in a new custom category
+        "2024-01-02,stretch,no,",              # ... found again by name
+        "2024-01-03,Juggle,1,",                # no category -> "Imported"
+    ]))
+
+    assert (summary["habits_selected"], summary["habits_created"], summary["categories_created"]) == (1, 2, 2)
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT h.habit_name, c.category_name, h.is_custom FROM user_selected_habits ush
+        JOIN habits h ON h.habit_id = ush.habit_id
+        JOIN categories c ON c.category_id = h.category_id
+        WHERE ush.user_id = %s ORDER BY h.habit_name
+    """, (user_id,))
+    assert [tuple(row) for row in cursor.fetchall()] == [
+        (WATER, "Health & Wellness", 0), ("Juggle", "Imported", 1), ("Stretch", "Mobility", 1)
+    ]
+    cursor.close()
+    assert statuses(connection, user_id) == [
+        (WATER, date(2024, 1, 1), "Completed"),
+        ("Stretch", date(2024, 1, 1), "Completed"),
+        (WATER, date(2024, 1, 2), "Skipped"),
+        ("Stretch", date(2024, 1, 2), "Missed"),
+        ("Juggle", date(2024, 1, 3), "Completed"),
+    ]
+
+
+def test_chunks_commit_and_derived_tables_are_rebuilt(connection, run_import, make_user):
+    user_id = make_user()
+    cursor = connection.cursor()
+    generation = current_generation(cursor, user_id)
+
+    progress = []
+    lines = ["date,habit_name,status"] + [f"2024-01-{day:02d},{WATER},Completed" for day in range(1, 6)]
+    summary = run_import(user_id, "\n".join(lines), chunk_size=2,
+                         progress=lambda read, imported: progress.append((read, imported)))
+
+    assert summary["chunks"] == 3
+    assert progress == [(2, 2), (4, 4), (5, 5)]
+    cursor.execute("SELECT current_streak, best_streak FROM habit_streaks WHERE user_id = %s", (user_id,))
+    assert cursor.fetchall() == [(5, 5)]
+    cursor.execute("""
+        SELECT total, completed FROM stats_rollup_user
+        WHERE user_id = %s AND grain = 'month' AND period_start = %s
+    """, (user_id, date(2024, 1, 1)))
+    assert cursor.fetchall() == [(5, 5)]
+    assert current_generation(cursor, user_id) == generation + 1
+    cursor.close()
+
+    # Importing the same file again updates rows instead of adding them
+    run_import(user_id, "\n".join(lines))
+    assert len(statuses(connection, user_id)) == 5
@@ -0,0 +1,70 @@
+import itertools
+
+import pytest
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from passwords import HasherBusy
+
+OLD_METHOD = "pbkdf2:sha256:1000"    # not the configured method: upgraded on login
+
+_numbers = itertools.count(1)
+
+
+@pytest.fixture
+def old_hash_user(connection):
+    n = next(_numbers)
+    username = f"Legacy{n:04d}"
+    cursor = connection.cursor()
+    cursor.execute("""
+        INSERT INTO users (first_name, last_name, username, mobile, email, password)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, ("Legacy", "User", username, f"7{n:09d}", f"legacy{n:04d}@gmail.com",
+          generate_password_hash("Passw0rd!", OLD_METHOD)))
+    connection.commit()
+    cursor.close()
+    return username
+
+
+def stored_hash(connection, username):
+    cursor = connection.cursor()
+    cursor.execute("SELECT password FROM users WHERE username = %s", (username,))
+    pwhash = cursor.fetchone()[0]
+    connection.rollback()
+    cursor.close()
+    return pwhash
+
+
+def login(app, username, password="Passw0rd!"):
+    return app.test_client().post("/login", data={"email_or_username": username, "password": password})
+
+
+def test_login_upgrades_an_old_hash(app, connection, old_hash_user):
+    assert login(app, old_hash_user).status_code == 302
+    pwhash = stored_hash(connection, old_hash_user)
+    assert pwhash.startswith(app.config["PASSWORD_HASH_METHOD"] + "$")
+    assert check_password_hash(pwhash, "Passw0rd!")
+
+
+def test_busy_pool_skips_the_upgrade_but_not_the_login(app_module, connection, old_hash_user, monkeypatch):
+    def busy(*args):
+        raise HasherBusy("Password hashing queue is full")
+    monkeypatch.setattr(app_module.password_hasher, "rehash", busy)
+
+    assert login(app_module.app, old_hash_user).status_code == 302
+    assert stored_hash(connection, old_hash_user).startswith(OLD_METHOD + "$")
+
+
+def test_busy_pool_during_verify_answers_503(app_module, old_hash_user, monkeypatch):
+    def busy(*args):
+        raise HasherBusy("Password hashing queue is full")
+    monkeypatch.setattr(app_module.password_hasher, "verify", busy)
+
+    response = login(app_module.app, old_hash_user)
+    assert response.status_code == 503
+    assert b"Too many sign-ins" in response.data
+
+
+def test_wrong_password(app, old_hash_user):
+    response = login(app, old_hash_user, "Wr0ngPass!")
+    assert response.status_code == 200
+    assert b"Wrong Password" in response.data
@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+
+from rollups import habit_days, period_bounds, rebuild_rollups, refresh_user_days
+
+START = date(2024, 1, 27)    # a Saturday: the rows below cross a week and a month boundary
+
+
+def rollups(connection, user_id):
+    cursor = connection.cursor()
+    tables = []
+    for table in ("stats_rollup_user", "stats_rollup_category"):
+        cursor.execute(f"SELECT * FROM {table} WHERE user_id = %s ORDER BY 1, 2, 3, 4", (user_id,))
+        tables.append([tuple(row) for row in cursor.fetchall()])
+    cursor.close()
+    return tables
+
+
+def assert_rollups_match_rebuild(connection, user_id):
+    incremental = rollups(connection, user_id)
+    cursor = connection.cursor()
+    rebuild_rollups(cursor, user_id)
+    cursor.close()
+    assert incremental == rollups(connection, user_id)
+    connection.rollback()
+
+
+def test_period_bounds():
+    assert period_bounds("day", START) == (START, START)
+    assert period_bounds("week", START) == (date(2024, 1, 22), date(2024, 1, 28))
+    assert period_bounds("month", date(2024, 2, 10)) == (date(2024, 2, 1), date(2024, 2, 29))
+
+
+def test_rollup_counts(connection, make_user, habits, write_statuses):
+    user_id = make_user()
+    write_statuses([
+        (user_id, habits[0], START, "Completed"),
+        (user_id, habits[1], START, "Skipped"),
+        (user_id, habits[2], START, "Completed"),
+        (user_id, habits[0], START + timedelta(days=5), "Missed"),
+    ])
+
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT grain, period_start, total, completed, skipped, missed, pending FROM stats_rollup_user
+        WHERE user_id = %s ORDER BY grain, period_start
+    """, (user_id,))
+    assert [tuple(row) for row in cursor.fetchall()] == [
+        ("day", date(2024, 1, 27), 3, 2, 1, 0, 0),
+        ("day", date(2024, 2, 1), 1, 0, 0, 1, 0),
+        ("month", date(2024, 1, 1), 3, 2, 1, 0, 0),
+        ("month", date(2024, 2, 1), 1, 0, 0, 1, 0),
+        ("week", date(2024, 1, 22), 3, 2, 1, 0, 0),
+        ("week", date(2024, 1, 29), 1, 0, 0, 1, 0),
+    ]
+    cursor.close()
+
+
+def test_incremental_rollups_match_a_full_rebuild(connection, make_user, habits, write_statuses):
+    user_id = make_user()
+    statuses = ("Completed", "Skipped", "Missed", "Pending")
+    for n in range(10):
+        write_statuses([
+            (user_id, habit_id, START + timedelta(days=n + i), statuses[(n + i + habit_id) % 4])
+            for i, habit_id in enumerate(habits)
+        ])
+    # Overwrites move counts between columns and periods
+    write_statuses([(user_id, habits[0], START + timedelta(days=n), "Completed") for n in range(0, 12, 3)])
+    assert_rollups_match_rebuild(connection, user_id)
+
+
+def test_removed_history_drops_its_rows(connection, make_user, habits, write_statuses):
+    # A habit's whole history goes (habit removal): days, weeks, months
+    # and categories left without status rows must lose their rollup rows
+    user_id = make_user()
+    write_statuses([(user_id, habits[0], START + timedelta(days=n), "Completed") for n in range(3)])
+    write_statuses([(user_id, habits[2], START + timedelta(days=n), "Skipped") for n in range(0, 60, 4)])
+
+    cursor = connection.cursor()
+    days = habit_days(cursor, user_id, habits[2])
+    assert len(days) == 15
+    cursor.execute("DELETE FROM daily_task_status WHERE user_id = %s AND habit_id = %s", (user_id, habits[2]))
+    refresh_user_days(cursor, days, removed=True)
+    connection.commit()
+
+    cursor.execute("SELECT MAX(period_start) FROM stats_rollup_user WHERE user_id = %s", (user_id,))
+    assert str(cursor.fetchone()[0]) == "2024-01-29"    # nothing after the other habit's last day
+    cursor.execute("SELECT COUNT(*) FROM stats_rollup_category WHERE user_id = %s AND category_id <> "
+                   "(SELECT category_id FROM habits WHERE habit_id = %s)", (user_id, habits[0]))
+    assert cursor.fetchone() == (0,)
+    cursor.close()
+    assert_rollups_match_rebuild(connection, user_id)
@@ -0,0 +1,63 @@
+import sqlite3
+
+from storage import translate
+
+
+def test_placeholders_and_literal_percent():
+    assert translate("SELECT * FROM t WHERE a = %s AND b LIKE 'x%%'") == \
+        "SELECT * FROM t WHERE a = ? AND b LIKE 'x%'"
+
+
+def test_mysql_functions():
+    sql = translate("SELECT NOW(), CURDATE(), DATEDIFF(everyday_date, %s) FROM t")
+    assert sql == ("SELECT datetime('now', 'localtime'), date('now', 'localtime'), "
+                   "CAST(julianday(everyday_date) - julianday(?) AS INTEGER) FROM t")
+    assert sqlite3.connect(":memory:").execute(
+        translate("SELECT DATEDIFF(%s, %s)"), ("2024-03-01", "2024-02-27")
+    ).fetchone() == (3,)
+
+
+def test_upsert_with_values():
+    sql = translate("""
+        INSERT INTO t (k, a, b) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE a = VALUES(a), b = b + VALUES(b)
+    """)
+    assert sql.rstrip().endswith("ON CONFLICT DO UPDATE SET a = excluded.a, b = b + excluded.b")
+
+
+def test_noop_upsert_becomes_do_nothing():
+    sql = translate("INSERT INTO t (k) VALUES (%s) ON DUPLICATE KEY UPDATE k = k")
+    assert sql.endswith("ON CONFLICT DO NOTHING")
+
+
+def test_create_table_ddl():
+    sql = translate("""
+        CREATE TABLE IF NOT EXISTS t (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            k INT NOT NULL,
+            status ENUM('Completed', 'Missed') DEFAULT 'Missed',
+            UNIQUE KEY unique_k (k)
+        )
+    """)
+    assert "INTEGER PRIMARY KEY AUTOINCREMENT" in sql
+    assert "status VARCHAR(16) CHECK (status IN ('Completed', 'Missed'))" in sql
+    assert "CONSTRAINT unique_k UNIQUE (k)" in sql
+
+    # ... and SQLite accepts and enforces the result
+    db = sqlite3.connect(":memory:")
+    db.execute(sql)
+    db.execute(translate("INSERT INTO t (k, status) VALUES (%s, %s)"), (1, "Completed"))
+    upsert = translate("INSERT INTO t (k, status) VALUES (%s, %s) ON DUPLICATE KEY UPDATE status = VALUES(status)")
+    db.execute(upsert, (1, "Missed"))
+    assert db.execute("SELECT k, status FROM t").fetchall() == [(1, "Missed")]
+    try:
+        db.execute(translate("INSERT INTO t (k, status) VALUES (%s, %s)"), (2, "Bogus"))
+    except sqlite3.IntegrityError:
+        pass
+    else:
+        raise AssertionError("ENUM check not enforced")
+
+
+def test_ddl_rewrites_only_apply_to_create_table():
+    sql = "SELECT 'UNIQUE KEY x (' FROM t"
+    assert translate(sql) == sql
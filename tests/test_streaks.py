@@ -0,0 +1,58 @@
+from datetime import date, timedelta
+
+from streaks import compute_streaks, effective_current
+
+START = date(2024, 1, 27)
+
+
+def streak(connection, user_id, habit_id):
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT current_streak, best_streak, last_completed_date FROM habit_streaks
+        WHERE user_id = %s AND habit_id = %s
+    """, (user_id, habit_id))
+    row = cursor.fetchone()
+    cursor.close()
+    return row
+
+
+def test_compute_streaks():
+    # habit 1: runs of 2 and 3 days, the last one current; habit 2: one day
+    assert compute_streaks([1, 1, 1, 1, 1, 2], [10, 11, 20, 21, 22, 5]) == {1: (3, 3, 22), 2: (1, 1, 5)}
+    assert compute_streaks([7, 7, 7], [1, 2, 9]) == {7: (1, 2, 9)}
+    assert compute_streaks([], []) == {}
+
+
+def test_effective_current():
+    today = date(2024, 2, 10)
+    assert effective_current(4, today, today) == 4
+    assert effective_current(4, today - timedelta(days=1), today) == 4
+    assert effective_current(4, today - timedelta(days=2), today) == 0
+    assert effective_current(0, None, today) == 0
+
+
+def test_streak_grows_and_is_rebuilt_when_shortened(connection, make_user, habits, write_statuses):
+    user_id, habit_id = make_user(), habits[0]
+    day = [START + timedelta(days=n) for n in range(4)]
+
+    write_statuses([(user_id, habit_id, d, "Completed") for d in day[:3]])
+    assert streak(connection, user_id, habit_id) == (3, 3, day[2])
+
+    # Un-completing a day inside the run splits it
+    write_statuses([(user_id, habit_id, day[1], "Skipped")])
+    assert streak(connection, user_id, habit_id) == (1, 1, day[2])
+
+    # Back-filling it and extending the run joins everything again
+    write_statuses([(user_id, habit_id, day[1], "Completed"), (user_id, habit_id, day[3], "Completed")])
+    assert streak(connection, user_id, habit_id) == (4, 4, day[3])
+
+
+def test_later_row_of_a_batch_wins(connection, make_user, habits, write_statuses):
+    user_id, habit_id = make_user(), habits[0]
+    write_statuses([(user_id, habit_id, START, "Completed"), (user_id, habit_id, START, "Missed")])
+
+    cursor = connection.cursor()
+    cursor.execute("SELECT status FROM daily_task_status WHERE user_id = %s", (user_id,))
+    assert cursor.fetchall() == [("Missed",)]
+    cursor.close()
+    assert streak(connection, user_id, habit_id) is None
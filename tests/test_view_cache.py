@@ -0,0 +1,67 @@
+from datetime import date
+
+from view_cache import MemoryBackend, SQLiteBackend, ViewCache, current_generation
+
+
+def test_writes_bump_the_generation(connection, make_user, habits, write_statuses):
+    user_id = make_user()
+    cursor = connection.cursor()
+    before = current_generation(cursor, user_id)
+    write_statuses([(user_id, habits[0], date(2024, 1, 27), "Completed")])
+    assert current_generation(cursor, user_id) == before + 1
+    cursor.close()
+
+
+def test_memory_backend_drops_least_recently_used():
+    backend = MemoryBackend(max_bytes=10)
+    backend.set("a", b"1234")
+    backend.set("b", b"1234")
+    backend.get("a")
+    backend.set("c", b"1234")
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1234"
+    assert backend.stats() == {"entries": 2, "bytes": 8, "evictions": 1}
+
+    backend.set("huge", b"x" * 11)
+    assert backend.get("huge") is None
+
+
+def test_sqlite_backend_is_shared_and_bounded(tmp_path):
+    path = str(tmp_path / "view_cache.sqlite3")
+    first = SQLiteBackend(path, max_bytes=100)
+    second = SQLiteBackend(path, max_bytes=100)
+    first.set("a", b"x" * 40)
+    assert second.get("a") == b"x" * 40
+
+    second.set("b", b"y" * 40)
+    second.set("c", b"z" * 40)
+    assert second.get("a") is None
+    assert second.stats()["entries"] == 2
+    assert second.stats()["evictions"] == 1
+
+
+def test_get_or_build_counts_hits_and_misses():
+    cache = ViewCache(MemoryBackend(max_bytes=1024))
+    key = ViewCache.key(7, 3, "today", "2024-01-27")
+    assert key == "7:3:today:2024-01-27"
+
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {"habits": [[1, "Completed"]]}
+
+    assert cache.get_or_build(key, build) == {"habits": [[1, "Completed"]]}
+    assert cache.get_or_build(key, build) == {"habits": [[1, "Completed"]]}
+    assert len(builds) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_today_view_is_built_once(app_module, client):
+    before = app_module.view_cache.stats()
+    assert client.get("/my_habits").status_code == 200
+    assert client.get("/my_habits").status_code == 200
+    after = app_module.view_cache.stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
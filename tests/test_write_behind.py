@@ -0,0 +1,99 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import date, datetime
+
+import pytest
+
+from write_behind import WriteBehindBuffer
+
+DAY = date(2024, 2, 1)
+
+
+@pytest.fixture
+def dead_pid():
+    # The pid of a process that has already exited
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def write_journal(path, lines):
+    with open(path, "w", encoding="utf-8") as journal:
+        for line in lines:
+            journal.write(line + "\n")
+
+
+def entry(habit_id, status, minute, user_id=1):
+    return json.dumps([user_id, habit_id, DAY.isoformat(), status, datetime(2024, 2, 1, 9, minute).isoformat()])
+
+
+def test_replays_journals_of_dead_processes(tmp_path, dead_pid):
+    write_journal(tmp_path / f"status-{dead_pid}-1.jsonl", [entry(1, "Completed", 0), entry(2, "Skipped", 1)])
+    # A later journal of the same process; the last line was torn by the crash
+    write_journal(tmp_path / f"status-{dead_pid}-2.jsonl", [entry(1, "Missed", 5), '[1, 3, "2024-02'])
+    # A live process's journal is left alone
+    live = tmp_path / f"status-{os.getppid()}-1.jsonl"
+    write_journal(live, [entry(9, "Completed", 0)])
+
+    flushed = []
+    buffer = WriteBehindBuffer(flushed.extend, str(tmp_path), fsync=False)
+    assert buffer.replay_orphans() == 2
+
+    assert sorted(flushed) == [
+        (1, 1, DAY, "Missed", datetime(2024, 2, 1, 9, 5)),
+        (1, 2, DAY, "Skipped", datetime(2024, 2, 1, 9, 1)),
+    ]
+    assert sorted(os.listdir(tmp_path)) == [live.name]
+    assert buffer.stats()["replayed_rows"] == 2
+
+
+def test_older_click_does_not_override_newer_one(tmp_path, dead_pid):
+    # Journals are read in name order, but the newest click wins
+    write_journal(tmp_path / f"status-{dead_pid}-1.jsonl", [entry(1, "Completed", 30)])
+    write_journal(tmp_path / f"status-{dead_pid}-2.jsonl", [entry(1, "Missed", 10)])
+
+    flushed = []
+    WriteBehindBuffer(flushed.extend, str(tmp_path), fsync=False).replay_orphans()
+    assert flushed == [(1, 1, DAY, "Completed", datetime(2024, 2, 1, 9, 30))]
+
+
+def test_failed_replay_keeps_the_journal(tmp_path, dead_pid):
+    write_journal(tmp_path / f"status-{dead_pid}-1.jsonl", [entry(1, "Completed", 0)])
+
+    def fail(rows):
+        raise RuntimeError("database down")
+
+    assert WriteBehindBuffer(fail, str(tmp_path), fsync=False).replay_orphans() == 0
+    # Claimed under a name that points at this (still running) process ...
+    assert os.listdir(tmp_path) == [f"status-{dead_pid}-1.jsonl.replay-{os.getpid()}"]
+
+
+def test_claimed_journal_of_a_dead_replayer_is_replayed(tmp_path, dead_pid):
+    # ... and once that process is gone too, the next one picks it up
+    write_journal(tmp_path / f"status-123-1.jsonl.replay-{dead_pid}", [entry(1, "Completed", 0)])
+
+    flushed = []
+    assert WriteBehindBuffer(flushed.extend, str(tmp_path), fsync=False).replay_orphans() == 1
+    assert os.listdir(tmp_path) == []
+
+
+def test_buffered_clicks_are_coalesced_and_journaled(tmp_path):
+    flushed = []
+    buffer = WriteBehindBuffer(flushed.extend, str(tmp_path), interval=3600, fsync=False)
+    clicked = datetime(2024, 2, 1, 9, 0)
+    buffer.put(1, 1, DAY, "Completed", clicked)
+    buffer.put(1, 1, DAY, "Skipped", clicked)
+    buffer.put(1, 2, DAY, "Completed", clicked)
+    assert buffer.pending_for(1, DAY) == {1: "Skipped", 2: "Completed"}
+
+    journal, = os.listdir(tmp_path)
+    with open(tmp_path / journal, encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
+
+    assert buffer.flush() == 2
+    assert sorted(flushed) == [(1, 1, DAY, "Skipped", clicked), (1, 2, DAY, "Completed", clicked)]
+    assert buffer.pending_for(1, DAY) == {}
+    assert buffer.stats()["coalesced"] == 1
+    buffer.stop()
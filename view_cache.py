@@ -0,0 +1,244 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# ============================================================
+# PER-USER VIEW CACHE
+# ============================================================
+# The today view (/my_habits) and the category overlays (a category page
+# with the user's selections and renamed habits) only change when that
+# user writes. users.data_generation is bumped in the same transaction
+# as every such write (bump_generation), and cached views are stored
+# under "<user>:<generation>:<view>:<args>". A request reads the
+# generation (one primary key lookup) and either finds its view or
+# builds and stores it; entries of older generations are never read
+# again and age out of the LRU.
+#
+# Backends:
+#   memory  per worker process, an LRU capped at `max_bytes`
+#   sqlite  one local file shared by all workers of a host, same cap,
+#           least recently used rows deleted first
+# Values are stored as JSON, so the byte cap measures what is kept.
+
+TOUCH_INTERVAL = 5.0    # seconds between LRU timestamp updates of one sqlite row
+
+
+# ============================================================
+# GENERATIONS
+# ============================================================
+
+def bump_generation(cursor, user_id):
+    # Call in the writer's transaction, before it commits
+    cursor.execute("""
+        UPDATE users SET data_generation = data_generation + 1, last_write_at = NOW()
+        WHERE user_id = %s
+    """, (user_id,))
+
+
+def bump_generations(cursor, user_ids):
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(user_ids))
+    cursor.execute(f"""
+        UPDATE users SET data_generation = data_generation + 1, last_write_at = NOW()
+        WHERE user_id IN ({placeholders})
+    """, user_ids)
+
+
+def bump_day_generations(cursor, day):
+    # Batch jobs: every user with status rows on `day`
+    cursor.execute("""
+        UPDATE users SET data_generation = data_generation + 1, last_write_at = NOW()
+        WHERE user_id IN (SELECT DISTINCT user_id FROM daily_task_status WHERE everyday_date = %s)
+    """, (day,))
+
+
+def bump_all_generations(cursor):
+    # Full rebuilds from the CLI: every cached view and page is stale
+    cursor.execute("UPDATE users SET data_generation = data_generation + 1, last_write_at = NOW()")
+
+
+def current_generation(cursor, user_id):
+    cursor.execute("SELECT data_generation FROM users WHERE user_id = %s", (user_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return row["data_generation"] if isinstance(row, dict) else row[0]
+
+
+def write_version(cursor, user_id):
+    # (data_generation, last_write_at), or None for an unknown user
+    cursor.execute("SELECT data_generation, last_write_at FROM users WHERE user_id = %s", (user_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    if isinstance(row, dict):
+        return row["data_generation"], row["last_write_at"]
+    return row[0], row[1]
+
+
+# ============================================================
+# BACKENDS
+# ============================================================
+
+class MemoryBackend:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()    # key -> bytes
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = value
+            self._bytes += len(value)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "evictions": self.evictions}
+
+
+class SQLiteBackend:
+    # Shared by the worker processes of one host through a WAL-mode file.
+    # Each thread opens its own connection.
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self.evictions = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = self._connection()
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS view_cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_view_cache_accessed ON view_cache (accessed)")
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = OFF")    # a cache: losing it is fine
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key):
+        connection = self._connection()
+        row = connection.execute("SELECT value, accessed FROM view_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        # Touch at most every few seconds: every write takes the file lock
+        now = time.time()
+        if now - row[1] > TOUCH_INTERVAL:
+            connection.execute("UPDATE view_cache SET accessed = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        connection = self._connection()
+        connection.execute("""
+            INSERT INTO view_cache (key, value, size, accessed) VALUES (?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size,
+                                            accessed = excluded.accessed
+        """, (key, value, len(value), time.time()))
+
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM view_cache").fetchone()[0]
+        if total > self.max_bytes:
+            # Drop the least recently used rows until ~10% below the cap
+            excess = total - int(self.max_bytes * 0.9)
+            cursor = connection.execute("""
+                DELETE FROM view_cache WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY accessed, key) - size AS freed_before
+                        FROM view_cache
+                    ) WHERE freed_before < ?
+                )
+            """, (excess,))
+            self.evictions += cursor.rowcount
+
+    def stats(self):
+        connection = self._connection()
+        entries, size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM view_cache").fetchone()
+        return {"entries": entries, "bytes": size, "evictions": self.evictions}
+
+
+# ============================================================
+# CACHE
+# ============================================================
+
+class ViewCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(user_id, generation, view, *args):
+        return ":".join(str(part) for part in (user_id, generation, view, *args))
+
+    def get_or_build(self, key, build):
+        # build() returns a JSON-serializable value
+        cached = self.backend.get(key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return json.loads(cached)
+
+        with self._lock:
+            self.misses += 1
+        value = build()
+        self.backend.set(key, json.dumps(value, separators=(",", ":")).encode("utf-8"))
+        return value
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            numbers = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0
+            }
+        numbers.update(self.backend.stats())
+        return numbers
+
+
+def create_view_cache(config):
+    # None when VIEW_CACHE_BACKEND is empty: views are always built
+    backend = config.get("VIEW_CACHE_BACKEND")
+    max_bytes = config.get("VIEW_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+    if not backend:
+        return None
+    if backend == "memory":
+        return ViewCache(MemoryBackend(max_bytes))
+    if backend == "sqlite":
+        return ViewCache(SQLiteBackend(config["VIEW_CACHE_PATH"], max_bytes))
+    raise ValueError(f"Unknown VIEW_CACHE_BACKEND {backend!r} (expected 'memory', 'sqlite' or None)")
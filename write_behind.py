@@ -0,0 +1,269 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime
+
+# ============================================================
+# WRITE-BEHIND BUFFER FOR HABIT STATUS UPDATES
+# ============================================================
+# Status clicks are acknowledged as soon as they are in memory and in an
+# append-only journal file. A background thread writes them to MySQL in
+# batches every `interval` seconds. Updates are coalesced per
+# (user_id, habit_id, date), so rapid toggling turns into one row write
+# and the latest click wins.
+#
+# Durability: every update is appended (and optionally fsynced) to
+# <journal_dir>/status-<pid>-<seq>.jsonl before it is acknowledged. On a
+# flush the active journal is rotated; rotated files are deleted only
+# after the batch has been committed. Journals left behind by a dead
+# process are replayed by the next process that starts the buffer.
+
+log = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    def __init__(self, flush_rows, journal_dir, interval=2.0, max_pending=10000, fsync=True):
+        self._flush_rows = flush_rows    # callable(list of row tuples); must commit
+        self.journal_dir = journal_dir
+        self.interval = interval
+        self.max_pending = max_pending
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = {}               # (user_id, habit_id, day) -> (status, marked_time)
+        self._journal = None
+        self._journal_seq = 0
+        self._rotated = []               # journals whose rows are not committed yet
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+
+        # metrics
+        self.accepted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.flush_failures = 0
+        self.replayed_rows = 0
+
+    # ---------------------------
+    # lifecycle
+    # ---------------------------
+    def _ensure_started(self):
+        # Started lazily in the process that serves requests, so a
+        # preloading parent never owns the thread or the journal.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            os.makedirs(self.journal_dir, exist_ok=True)
+            self._pid = os.getpid()
+            self._pending = {}
+            self._rotated = []
+            self._journal_seq = 0
+            self._open_journal()
+            self._stopping = False
+
+        self.replay_orphans()
+
+        self._thread = threading.Thread(target=self._run, name="write-behind-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                log.warning("write-behind flush failed: %s", e)
+
+    def stop(self):
+        # Final flush on shutdown; whatever fails stays in the journal
+        if self._pid != os.getpid():
+            return
+        self._stopping = True
+        self._wake.set()
+        try:
+            self.flush()
+        except Exception as e:
+            log.warning("write-behind final flush failed, journal kept for replay: %s", e)
+
+    # ---------------------------
+    # journal
+    # ---------------------------
+    def _journal_path(self, seq):
+        return os.path.join(self.journal_dir, f"status-{os.getpid()}-{seq}.jsonl")
+
+    def _open_journal(self):
+        self._journal_seq += 1
+        self._journal_file = self._journal_path(self._journal_seq)
+        self._journal = open(self._journal_file, "a", encoding="utf-8")
+
+    def _append_journal(self, key, status, marked_time):
+        user_id, habit_id, day = key
+        line = json.dumps([user_id, habit_id, day.isoformat(), status, marked_time.isoformat()])
+        self._journal.write(line + "\n")
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+    @staticmethod
+    def _read_journal(path, rows):
+        # Later lines win, as they did in memory
+        with open(path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    user_id, habit_id, day, status, marked_time = json.loads(line)
+                except ValueError:
+                    continue    # torn last line after a crash
+                key = (user_id, habit_id, date.fromisoformat(day))
+                marked_time = datetime.fromisoformat(marked_time)
+                if key not in rows or rows[key][1] <= marked_time:
+                    rows[key] = (status, marked_time)
+
+    def replay_orphans(self):
+        # Replay journals of processes that are no longer running
+        claimed = []
+        for path in glob.glob(os.path.join(self.journal_dir, "status-*.jsonl*")):
+            owner = _journal_owner(path)
+            if owner is None or owner == os.getpid() or _pid_alive(owner):
+                continue
+            # Renaming claims the file, so two starting workers never replay it twice
+            original = path.split(".jsonl")[0] + ".jsonl"
+            target = f"{original}.replay-{os.getpid()}"
+            try:
+                os.rename(path, target)
+            except OSError:
+                continue
+            claimed.append(target)
+
+        if not claimed:
+            return 0
+
+        rows = {}
+        for path in sorted(claimed):
+            self._read_journal(path, rows)
+        batch = [(*key, status, marked_time) for key, (status, marked_time) in rows.items()]
+        try:
+            if batch:
+                self._flush_rows(batch)
+        except Exception as e:
+            # Leave the journals for the next process to replay
+            log.warning("write-behind replay failed: %s", e)
+            return 0
+
+        for path in claimed:
+            os.remove(path)
+        self.replayed_rows += len(batch)
+        return len(batch)
+
+    # ---------------------------
+    # buffer API
+    # ---------------------------
+    def put(self, user_id, habit_id, day, status, marked_time):
+        # Returns False when the buffer is full; the caller then writes directly
+        self._ensure_started()
+        key = (user_id, habit_id, day)
+
+        with self._lock:
+            if key not in self._pending and len(self._pending) >= self.max_pending:
+                self.rejected += 1
+                self._wake.set()
+                return False
+            if key in self._pending:
+                self.coalesced += 1
+            self._append_journal(key, status, marked_time)
+            self._pending[key] = (status, marked_time)
+            self.accepted += 1
+        return True
+
+    def pending_for(self, user_id, day):
+        # Buffered (not yet written) statuses of one user for one day
+        with self._lock:
+            return {
+                habit_id: status
+                for (uid, habit_id, d), (status, _) in self._pending.items()
+                if uid == user_id and d == day
+            }
+
+    def flush(self):
+        if self._pid != os.getpid():
+            return 0
+
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch = self._pending
+                self._pending = {}
+                # Rotate the journal: new clicks go to a fresh file
+                self._journal.close()
+                self._rotated.append(self._journal_file)
+                self._open_journal()
+
+            rows = [(*key, status, marked_time) for key, (status, marked_time) in batch.items()]
+            try:
+                self._flush_rows(rows)
+            except Exception:
+                # Put the rows back unless a newer click replaced them meanwhile
+                with self._lock:
+                    for key, value in batch.items():
+                        self._pending.setdefault(key, value)
+                    self.flush_failures += 1
+                raise
+
+            with self._lock:
+                rotated, self._rotated = self._rotated, []
+                self.flushes += 1
+                self.flushed_rows += len(rows)
+            for path in rotated:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return len(rows)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "max_pending": self.max_pending,
+                "accepted": self.accepted,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+                "flushes": self.flushes,
+                "flushed_rows": self.flushed_rows,
+                "flush_failures": self.flush_failures,
+                "replayed_rows": self.replayed_rows
+            }
+
+
+def _journal_owner(path):
+    # status-<pid>-<seq>.jsonl belongs to <pid>;
+    # status-<pid>-<seq>.jsonl.replay-<other> is being replayed by <other>
+    name = os.path.basename(path)
+    try:
+        if ".replay-" in name:
+            return int(name.rsplit(".replay-", 1)[1])
+        return int(name.split("-")[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True